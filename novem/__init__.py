@@ -1,10 +1,16 @@
+# imported first so the timeline can include the time spent importing novem
+from .timeline import enable_from_env  # isort: skip
 from .claim import Claim
 from .group.org import Org
 from .job import Job
 from .repo import Repo
 from .version import __version__
 from .vis.grid import Grid
+from .vis.handle import VisHandle
 from .vis.mail import Mail
 from .vis.plot import Plot
 
-__all__ = ["Plot", "Mail", "Grid", "Org", "Repo", "Job", "Claim", "__version__"]
+__all__ = ["Plot", "Mail", "Grid", "Org", "Repo", "Job", "Claim", "VisHandle", "__version__"]
+
+# record a timeline of this process if NOVEM_PROFILE is set
+enable_from_env()
@@ -0,0 +1,17 @@
+from .api import AsyncNovemAPI, AsyncProperty, close_clients, get_async_client
+from .job import AsyncJob
+from .shared import AsyncShare
+from .vis import AsyncGrid, AsyncMail, AsyncPlot, AsyncVisAPI
+
+__all__ = [
+    "AsyncNovemAPI",
+    "AsyncProperty",
+    "AsyncVisAPI",
+    "AsyncPlot",
+    "AsyncGrid",
+    "AsyncMail",
+    "AsyncJob",
+    "AsyncShare",
+    "get_async_client",
+    "close_clients",
+]
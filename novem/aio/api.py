@@ -0,0 +1,404 @@
+"""
+asyncio novem api
+
+Mirrors the synchronous api but every network call is a coroutine, so
+hundreds of updates can be issued concurrently with asyncio.gather. Requests
+go through a bounded httpx connection pool shared by all objects on the
+running event loop.
+
+Requests take the same path as those of the synchronous api, see
+novem.api_ref.RequestPipeline, so middleware, hooks, caches, coalescing,
+retries, rate limiting and compression all apply. The pipeline runs in a
+worker thread per request in flight, bounded like the connection pool, and
+hands the request to the httpx client on the event loop.
+
+Requires httpx, install it using 'pip install novem[aio]'.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from ..api_ref import Novem403, Novem404, NovemException, RequestPipeline, resolve_connection
+from ..http import TimeoutArg, Transport, get_metadata, get_ua, write_log_from_config
+from ..http.transport import Headers, Response, from_httpx, httpx_errors, httpx_request
+
+# Import httpx for type checking, not runtime
+if TYPE_CHECKING:
+    import httpx
+else:
+    try:
+        import httpx
+    except ImportError:
+        httpx = None  # type: ignore
+
+DEFAULT_MAX_CONNECTIONS = 20
+
+# (api_root, token, verify, is_cli, max_connections)
+ClientKey = Tuple[str, Optional[str], bool, bool, int]
+
+# httpx clients are bound to the event loop they were first used on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# worker threads running the request pipeline, per max_connections
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_async_client(
+    api_root: str,
+    token: Optional[str],
+    verify: bool = True,
+    is_cli: bool = False,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+) -> "httpx.AsyncClient":
+    """
+    Return the shared client for the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+
+    key: ClientKey = (api_root, token, verify, is_cli, max_connections)
+    if key not in clients:
+        headers = get_ua(is_cli)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        clients[key] = httpx.AsyncClient(
+            headers=headers,
+            verify=verify,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    return clients[key]
+
+
+async def close_clients() -> None:
+    """
+    Close all clients belonging to the running event loop
+    """
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def _executor(max_connections: int) -> ThreadPoolExecutor:
+    # a request holds its thread while it waits for a connection, so more
+    # threads than connections would not make anything faster
+    with _executors_lock:
+        if max_connections not in _executors:
+            _executors[max_connections] = ThreadPoolExecutor(max_connections, thread_name_prefix="novem-aio")
+        return _executors[max_connections]
+
+
+class LoopTransport(Transport):
+    """
+    Sends the requests of the pipeline, running in a worker thread, with an
+    httpx client on the event loop it belongs to
+    """
+
+    def __init__(self, client: "httpx.AsyncClient", loop: asyncio.AbstractEventLoop) -> None:
+        self.client = client
+        self.loop = loop
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Headers] = None,
+        data: Any = None,
+        json: Any = None,
+        timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    ) -> Response:
+        req = httpx_request(self.client, method, url, headers, data, json, timeout)
+
+        start = time.monotonic()
+        with httpx_errors():
+            r = asyncio.run_coroutine_threadsafe(self.client.send(req), self.loop).result()
+
+        return from_httpx(r, url, start)
+
+
+class AsyncNovemAPI(object):
+    """
+    asyncio Novem API class
+
+    The api is thread-offloaded, not native asyncio: each call runs the
+    blocking request pipeline in a worker thread, so at most max_connections
+    requests are in flight at once however many coroutines are gathered.
+
+    * Read config file
+    * Communicate with API_ROOT
+    * Offer utilities for subclasses
+    """
+
+    id: Optional[str] = None
+    _debug: bool = False
+
+    def __init__(self, **kwargs: Any) -> None:
+        if httpx is None:
+            raise ImportError("httpx is required for the asyncio api. Please install it using 'pip install novem[aio]'")
+
+        config, api_root, token = resolve_connection(**kwargs)
+
+        self._config = config
+        self._api_root = api_root
+        self.token = token
+
+        self._verify = not config["ignore_ssl_warn"]
+        self._is_cli = kwargs.get("is_cli", False)
+        self._max_connections = int(kwargs.get("max_connections") or DEFAULT_MAX_CONNECTIONS)
+
+        # an explicit client bypasses the shared pool
+        self._client: Optional[httpx.AsyncClient] = kwargs.get("client")
+
+        # the transport is given per request, it depends on the running loop
+        self._pipeline = RequestPipeline(api_root, token, config, kwargs)
+
+        self._metadata = get_metadata(api_root, token, config, kwargs)
+
+        if kwargs.get("debug"):
+            self._debug = True
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is not None:
+            return self._client
+
+        return get_async_client(
+            self._api_root,
+            self.token,
+            verify=self._verify,
+            is_cli=self._is_cli,
+            max_connections=self._max_connections,
+        )
+
+    async def _request(self, method: str, url: str, timeout: TimeoutArg = None, **kwargs: Any) -> Response:
+        """
+        Perform a http request through the request pipeline, sent with the
+        client of the running loop
+        """
+        if self._debug:
+            print(f"{method}: {url}")
+
+        loop = asyncio.get_running_loop()
+        context = {"transport": LoopTransport(self.client, loop)}
+        call = functools.partial(self._pipeline._request, method, url, timeout=timeout, context=context, **kwargs)
+
+        # the deadline of the calling task applies to the request
+        return await loop.run_in_executor(_executor(self._max_connections), contextvars.copy_context().run, call)
+
+    def _check(self, method: str, url: str, r: Response) -> None:
+        if r.status_code == 404:
+            raise Novem404(url)
+
+        if r.status_code == 403:
+            raise Novem403(url)
+
+        if not r.ok:
+            raise NovemException(f"{method}: {url} failed with {r.status_code}: {r.text}")
+
+    # raw api access relative to the api root, like NovemAPI
+
+    async def read(self, path: str) -> str:
+        url = f"{self._api_root}{path}"
+        r = await self._request("GET", url)
+        self._check("GET", url, r)
+        return r.text
+
+    async def write(self, path: str, value: str) -> None:
+        url = f"{self._api_root}{path}"
+        r = await self._request("POST", url, headers={"Content-type": "text/plain"}, data=value.encode("utf-8"))
+        self._check("POST", url, r)
+
+    async def create(self, path: str) -> None:
+        url = f"{self._api_root}{path}"
+        r = await self._request("PUT", url)
+        if r.status_code != 409:
+            self._check("PUT", url, r)
+
+    async def delete(self, path: str) -> None:
+        url = f"{self._api_root}{path}"
+        r = await self._request("DELETE", url)
+        self._check("DELETE", url, r)
+
+
+class AsyncProperty(object):
+    """
+    A remote value exposed as an awaitable attribute
+
+        name = await plot.name
+        await plot.set(name="new name")
+    """
+
+    def __init__(self, path: str, strip: bool = False, encode: Optional[Callable[[Any], str]] = None) -> None:
+        self.path = path
+        self.strip = strip
+        self.encode = encode
+        self.name = ""
+
+    def __set_name__(self, owner: Any, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Any = None) -> Any:
+        if obj is None:
+            return self
+        return self.read(obj)
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        raise AttributeError(f"{self.name} is read asynchronously, use `await obj.set({self.name}=...)` to update it")
+
+    async def read(self, obj: "AsyncResourceAPI") -> str:
+        value = await obj.api_read(self.path)
+        return value.strip() if self.strip else value
+
+    def write(self, obj: "AsyncResourceAPI", value: Any) -> Awaitable[None]:
+        if self.encode:
+            value = self.encode(value)
+        return obj.api_write(self.path, value)
+
+
+class AsyncResourceAPI(AsyncNovemAPI, ABC):
+    """
+    Base class for async objects living under a fixed api path, e.g.
+    vis/plots/<id> or jobs/<id>
+
+    Writes of the value last written to a path are skipped, see
+    novem.http.elision
+    """
+
+    # paths written every time, e.g. ones that trigger an action
+    _always_write: Tuple[str, ...] = ()
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+
+        self._writes = write_log_from_config(self._api_root, self.token, self._config, kwargs)
+
+        # creation is deferred to the first write, as the constructor can't
+        # await anything
+        self._needs_create = kwargs.get("create", True) is not False
+        self._create_lock: Optional[asyncio.Lock] = None
+
+    @abstractmethod
+    def _path(self, relpath: str) -> str:
+        """
+        Full url of relpath for this object
+        """
+
+    def _read_path(self, relpath: str) -> str:
+        return self._path(relpath)
+
+    async def _ensure_created(self, path: Optional[str] = None) -> None:
+        """
+        Create this object if it is pending creation, before path, relative
+        to the api root, is modified through the raw api if given
+        """
+        if not self._needs_create:
+            return
+
+        if path is not None:
+            own = self._path("")[len(self._api_root) :]
+            if not path.startswith(f"{own}/"):
+                return
+
+        # created lazily so the lock belongs to the running loop
+        if self._create_lock is None:
+            self._create_lock = asyncio.Lock()
+
+        async with self._create_lock:
+            if self._needs_create:
+                await self.api_create("")
+                self._needs_create = False
+
+    async def create(self, path: str) -> None:
+        await self._ensure_created(path)
+        await super().create(path)
+
+    async def write(self, path: str, value: str) -> None:
+        await self._ensure_created(path)
+        await super().write(path, value)
+
+    async def api_read(self, relpath: str, timeout: TimeoutArg = None) -> str:
+        return (await self.api_read_bytes(relpath, timeout=timeout)).decode("utf-8")
+
+    async def api_read_bytes(self, relpath: str, timeout: TimeoutArg = None) -> bytes:
+        url = self._read_path(relpath)
+        r = await self._request("GET", url, timeout=timeout)
+        self._check("GET", url, r)
+
+        if self._writes is not None and url == self._path(relpath):
+            self._writes.verify(url, r.content)
+
+        return r.content
+
+    async def api_write(
+        self, relpath: str, value: Union[str, bytes], timeout: TimeoutArg = None, force: bool = False
+    ) -> None:
+        """
+        force: write even if value is what we last wrote
+        """
+        url = self._path(relpath)
+        data = value if isinstance(value, bytes) else value.encode("utf-8")
+
+        writes = self._writes
+        if writes is not None and not force and relpath not in self._always_write and writes.unchanged(url, data):
+            if self._debug:
+                print(f"POST: {url} (unchanged, skipped)")
+            return
+
+        await self._ensure_created()
+
+        r = await self._request(
+            "POST",
+            url,
+            headers={"Content-type": "text/plain"},
+            data=data,
+            timeout=timeout,
+            # writes to action paths may have been acted on before failing
+            idempotent=relpath not in self._always_write,
+        )
+        self._check("POST", url, r)
+
+        if writes is not None:
+            writes.record(url, data)
+
+    async def api_create(self, relpath: str, timeout: TimeoutArg = None) -> None:
+        url = self._path(relpath)
+        r = await self._request("PUT", url, timeout=timeout)
+
+        # creating objects that already exist is not a problem
+        if r.status_code != 409:
+            self._check("PUT", url, r)
+
+    async def api_delete(self, relpath: str, timeout: TimeoutArg = None) -> None:
+        url = self._path(relpath)
+        r = await self._request("DELETE", url, timeout=timeout)
+        self._check("DELETE", url, r)
+
+        if self._writes is not None:
+            self._writes.discard(url)
+
+    async def set(self, **kwargs: Any) -> None:
+        """
+        Update several properties concurrently
+
+            await plot.set(name="my plot", type="bar", caption="...")
+        """
+        writes = []
+        for k, v in kwargs.items():
+            prop = getattr(type(self), k, None)
+            if not isinstance(prop, AsyncProperty):
+                raise AttributeError(f"{type(self).__name__} has no property {k}")
+            writes.append(prop.write(self, v))
+
+        await self._ensure_created()
+        await asyncio.gather(*writes)
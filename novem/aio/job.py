@@ -0,0 +1,38 @@
+from typing import Any
+
+from .api import AsyncProperty, AsyncResourceAPI
+from .shared import AsyncShare
+
+
+class AsyncJob(AsyncResourceAPI):
+    """
+    asyncio novem job
+    """
+
+    type = AsyncProperty("/config/type", strip=True)
+    name = AsyncProperty("/name", strip=True)
+    description = AsyncProperty("/description")
+    summary = AsyncProperty("/summary")
+    url = AsyncProperty("/url", strip=True)
+    shortname = AsyncProperty("/shortname", strip=True)
+
+    def __init__(self, id: str, **kwargs: Any) -> None:
+        self.id = id
+        super().__init__(**kwargs)
+
+        self.shared = AsyncShare(self, f"jobs/{self.id}")
+
+    def _path(self, relpath: str) -> str:
+        return f"{self._api_root}jobs/{self.id}{relpath}"
+
+    async def ref(self, ref: str) -> str:
+        """
+        Return a fully qualified path to given ref
+        """
+        url = f"{self._api_root}whoami"
+        user = self._metadata.get(url)
+        if user is None:
+            user = await self.read("whoami")
+            self._metadata.put(url, user, persist=True)
+
+        return f"/{user}/{self.id}:{ref}"
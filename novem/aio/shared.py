@@ -0,0 +1,79 @@
+import asyncio
+import json
+from typing import TYPE_CHECKING, List, Union
+
+from novem.exceptions import Novem404
+
+from ..shared import HasShareString, get_share_value
+
+if TYPE_CHECKING:
+    from .api import AsyncNovemAPI
+
+
+class AsyncShare:
+    """
+    asyncio version of NovemShare
+
+    Novem shares are exposed at:
+      f"{api._api_root}{share_path}/shared"
+    """
+
+    def __init__(self, api: "AsyncNovemAPI", share_path: str) -> None:
+        self.api: "AsyncNovemAPI" = api
+        self.share_path = share_path
+
+    async def get(self) -> List[str]:
+        """
+        Get list of all shares currently active
+        """
+        try:
+            s = await self.api.read(f"{self.share_path}/shared")
+            shared = sorted([x["name"] for x in json.loads(s)])
+        except Novem404:
+            shared = []
+
+        return shared
+
+    async def set(self, share: Union[str, HasShareString, List[Union[str, HasShareString]]]) -> None:
+        """
+        replace all shares with the new set
+        """
+        if isinstance(share, (str, HasShareString)):
+            share_value = get_share_value(share)
+            shares = [share_value] if share_value else []
+        else:
+            shares = [get_share_value(s) for s in share if s]
+            shares = [s for s in shares if s]
+
+        # If the list was non-empty but all items resulted in empty strings,
+        # don't change the existing shares
+        if isinstance(share, list) and share and not shares:
+            return
+
+        es = await self.get()
+        rms = set(es) - set(shares)
+        adds = set(shares) - set(es)
+
+        await asyncio.gather(
+            *[self.api.delete(f"{self.share_path}/shared/{r}") for r in rms if r],
+            *[self.api.create(f"{self.share_path}/shared/{a}") for a in adds if a],
+        )
+
+    async def add(self, share: Union[str, HasShareString]) -> None:
+        """
+        Add a new share
+        """
+        share_value = get_share_value(share)
+        if share_value:
+            await self.api.create(f"{self.share_path}/shared/{share_value}")
+
+    async def remove(self, share: Union[str, HasShareString]) -> None:
+        """
+        Remove a share
+        """
+        share_value = get_share_value(share)
+        if share_value:
+            try:
+                await self.api.delete(f"{self.share_path}/shared/{share_value}")
+            except Novem404:
+                pass
@@ -0,0 +1,199 @@
+from typing import Any, List, Union
+
+from novem.exceptions import Novem404
+
+from ..serialize import serialize_csv
+from .api import AsyncProperty, AsyncResourceAPI
+from .shared import AsyncShare
+
+
+def _user_and_id(id: str, kwargs: Any) -> str:
+    # if we have an @ name we will override id and user
+    if id[0] == "@":
+        cand = id[1:].split("~")
+        kwargs["user"] = cand[0]
+        return cand[1]
+
+    return id
+
+
+def _recipients(value: Union[str, List[str]]) -> str:
+    if isinstance(value, list):
+        return "\n".join(value)
+    return "\n".join(value.split(","))
+
+
+class AsyncVisAPI(AsyncResourceAPI):
+    """
+    asyncio version of NovemVisAPI
+    """
+
+    _vispath: str = ""
+    _type: str = ""
+
+    name = AsyncProperty("/name", strip=True)
+    description = AsyncProperty("/description")
+    summary = AsyncProperty("/summary")
+    url = AsyncProperty("/url", strip=True)
+    shortname = AsyncProperty("/shortname", strip=True)
+
+    def __init__(self, id: str, **kwargs: Any) -> None:
+        self.id = _user_and_id(id, kwargs)
+        self.user = kwargs.get("user")
+
+        # we can't create or modify other users vis
+        if self.user:
+            kwargs["create"] = False
+
+        super().__init__(**kwargs)
+
+        self._qpr = None
+        if kwargs.get("qpr"):
+            self._qpr = kwargs["qpr"].replace(",", "&")
+
+        self.shared = AsyncShare(self, f"vis/{self._vispath}/{self.id}")
+
+    def _path(self, relpath: str) -> str:
+        return f"{self._api_root}vis/{self._vispath}/{self.id}{relpath}"
+
+    def _read_path(self, relpath: str) -> str:
+        qpath = self._path(relpath)
+
+        # We can read information from other users, but not perform any
+        # other actions so only the GET method supports the custom user
+        # pathing
+        if self.user:
+            qpath = f"{self._api_root}users/{self.user}/vis/{self._vispath}/{self.id}{relpath}"
+
+        if self._qpr:
+            qpath = f"{qpath}?{self._qpr}"
+
+        return qpath
+
+    async def api_write(self, relpath: str, value: Union[str, bytes], timeout: Any = None, force: bool = False) -> None:
+        if self.user:
+            raise PermissionError(f"you cannot modify another users {self._vispath}")
+        await super().api_write(relpath, value, timeout=timeout, force=force)
+
+    async def files(self, fn: str) -> bytes:
+        return await self.api_read_bytes(f"/files/{fn}")
+
+
+class AsyncPlot(AsyncVisAPI):
+    """
+    asyncio novem plot
+
+        plot = AsyncPlot("my_plot")
+        await plot.set_data(df)
+        await plot.set(type="bar", title="My plot")
+        print(await plot.url)
+    """
+
+    _vispath = "plots"
+    _type = "plot"
+
+    type = AsyncProperty("/config/type", strip=True)
+    caption = AsyncProperty("/config/caption")
+    title = AsyncProperty("/config/title")
+    data = AsyncProperty("/data")
+
+    async def set_data(self, data: Any, **kwargs: Any) -> "AsyncPlot":
+        """
+        Set the data of the plot, either a csv string or an object with a
+        to_csv function, see Plot for float_precision and columns
+        """
+        payload = serialize_csv(data, kwargs.pop("float_precision", None), kwargs.pop("columns", None))
+
+        await self.api_write("/data", payload)
+
+        if kwargs:
+            await self.set(**kwargs)
+
+        return self
+
+    async def __call__(self, data: Any, **kwargs: Any) -> "AsyncPlot":
+        return await self.set_data(data, **kwargs)
+
+
+class AsyncGrid(AsyncVisAPI):
+    """
+    asyncio novem grid
+    """
+
+    _vispath = "grids"
+    _type = "grid"
+
+    mapping = AsyncProperty("/mapping")
+    layout = AsyncProperty("/layout")
+    theme = AsyncProperty("/config/theme")
+    type = AsyncProperty("/config/type")
+
+    async def set(self, **kwargs: Any) -> None:
+        # the layout depends on the mapping, so it has to be written last
+        mapping = kwargs.pop("mapping", None)
+        layout = kwargs.pop("layout", None)
+
+        await super().set(**kwargs)
+        if mapping is not None:
+            await super().set(mapping=mapping)
+        if layout is not None:
+            await super().set(layout=layout)
+
+
+class AsyncMail(AsyncVisAPI):
+    """
+    asyncio novem mail
+    """
+
+    _vispath = "mails"
+    _type = "mail"
+
+    # writing the status sends the mail, repeat sends must always go out
+    _always_write = ("/status",)
+
+    content = AsyncProperty("/content")
+    status = AsyncProperty("/status")
+
+    to = AsyncProperty("/recipients/to", encode=_recipients)
+    cc = AsyncProperty("/recipients/cc", encode=_recipients)
+    bcc = AsyncProperty("/recipients/bcc", encode=_recipients)
+
+    subject = AsyncProperty("/config/subject")
+    theme = AsyncProperty("/config/theme")
+    size = AsyncProperty("/config/size")
+    template = AsyncProperty("/config/template")
+    reply_to = AsyncProperty("/config/reply_to")
+
+    async def set(self, **kwargs: Any) -> None:
+        # content goes last, and status can send the e-mail so it goes
+        # after everything else
+        content = kwargs.pop("content", None)
+        status = kwargs.pop("status", None)
+
+        await super().set(**kwargs)
+        if content is not None:
+            await super().set(content=content)
+        if status is not None:
+            await super().set(status=status)
+
+    async def send(self) -> None:
+        """
+        Send e-mail to recipients, if there are any
+        """
+        rcpts: List[str] = []
+        for prop in ["to", "cc", "bcc"]:
+            try:
+                rcpts.extend(x for x in (await getattr(self, prop)).split("\n") if x)
+            except Novem404:
+                continue
+
+        if not rcpts:
+            return None
+
+        await self.api_write("/status", "sending")
+
+    async def test(self) -> None:
+        """
+        Create a test e-mail
+        """
+        await self.api_write("/status", "testing")
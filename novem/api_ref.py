@@ -1,24 +1,55 @@
 import os
 import sys
-import urllib.request
-from typing import Any, Dict, Optional
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 
 import requests
 
 from novem.utils import API_ROOT
 
+from .http import (
+    Compression,
+    Hook,
+    Middleware,
+    Request,
+    RequestsTransport,
+    RetryPolicy,
+    SingleflightMiddleware,
+    Timeout,
+    TimeoutArg,
+    Transport,
+    build_chain,
+    build_event,
+    caches_from_config,
+    coalesce_enabled,
+    compress,
+    configure_pool_from_config,
+    current_deadline,
+    emit,
+    get_group,
+    get_hooks,
+    get_known,
+    get_metadata,
+    get_middleware,
+    get_transport,
+    get_ua,
+    limiter_from_config,
+    write_log_from_config,
+)
+from .http.transport import Response
+from .timeline import traced
+from .types import Config
 from .utils import get_current_config
-from .version import __version__
 
 did_token_warning = False
 
 
-def get_ua(is_cli: bool) -> Dict[str, str]:
-    name = "NovemCli" if is_cli else "NovemLib"
-    py_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
-    return {
-        "User-Agent": f"{name}/{__version__} Python/{py_version}",
-    }
+def _counted(chunks: Iterator[bytes], context: Dict[str, Any]) -> Iterator[bytes]:
+    context["bytes_sent"] = 0
+    for chunk in chunks:
+        context["bytes_sent"] += len(chunk)
+        yield chunk
 
 
 class NovemException(Exception):
@@ -44,7 +75,201 @@ class Novem401(NovemException):
     pass
 
 
-class NovemAPI(object):
+class NovemTimeout(NovemException):
+    pass
+
+
+class Novem415(NovemException):
+    pass
+
+
+def resolve_connection(**kwargs: Any) -> Tuple[Config, str, Optional[str]]:
+    """
+    Resolve the config, api root and token to use for the given arguments
+
+    Shared between the synchronous and the asyncio api
+    """
+
+    config_status, config = get_current_config(**kwargs)
+
+    # api root should always be supplied in the result
+    api_root = config["api_root"]
+    if not api_root:
+        api_root = os.getenv("NOVEM_API_ROOT") or API_ROOT
+
+    env_token = os.getenv("NOVEM_TOKEN")
+    global did_token_warning
+
+    token: Optional[str] = None
+    if config.get("token", None):
+        assert config["token"]
+        token = config["token"]
+        if env_token is not None and not did_token_warning:
+            did_token_warning = True
+            print("WARN: Both NOVEM_TOKEN and config file token are set. Using config file token.", file=sys.stderr)
+
+    elif env_token is not None:
+        token = env_token
+
+    elif not config_status:
+        print(
+            """\
+Novem config file is missing.  Either specify config file location with
+the config_path parameter, setup a new token using
+$ python -m novem --init
+or set the NOVEM_TOKEN environment variable.\
+"""
+        )
+        sys.exit(0)
+
+    if api_root[-1] != "/":
+        # our code assumes that the api_root ends with a /
+        api_root = f"{api_root}/"
+
+    return (config, api_root, token)
+
+
+class RequestPipeline(object):
+    """
+    The path every request takes, shared between NovemAPI and the asyncio
+    api
+
+    * the middleware chain: user middleware, request coalescing and the
+      response caches
+    * request hooks
+    * retries, rate limiting, timeouts and compression around the transport
+    """
+
+    def __init__(
+        self,
+        api_root: str,
+        token: Optional[str],
+        config: Config,
+        kwargs: Mapping[str, Any],
+        transport: Optional[Transport] = None,
+    ) -> None:
+        self._api_root = api_root
+
+        # requests go through the pooled session unless another transport
+        # (http2, or an in-process wsgi/asgi app) is configured, or one is
+        # given per request in the request context
+        self._transport = transport
+
+        # the session carries these itself, other transports get them
+        # added per request
+        self._headers: Dict[str, Optional[str]] = {**get_ua(kwargs.get("is_cli", False))}
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+
+        self._retry = RetryPolicy.from_config(config, kwargs)
+        self._limiter = limiter_from_config(api_root, config, kwargs)
+        self._timeout = Timeout.from_config(config, kwargs)
+        self._compression = Compression.from_config(config, kwargs)
+
+        # per object middleware, runs inside the global chain
+        self._middleware: List[Middleware] = list(kwargs.get("middleware") or [])
+        self._hooks: List[Hook] = list(kwargs.get("hooks") or [])
+
+        # built in layers run innermost, so that user middleware and hooks
+        # can see what they did
+        self._builtin: List[Middleware] = []
+        if coalesce_enabled(config, kwargs):
+            self._builtin.append(SingleflightMiddleware(get_group(api_root, token)))
+        self._builtin.extend(caches_from_config(api_root, token, config, kwargs))
+
+    def _request(self, method: str, url: str, timeout: TimeoutArg = None, **kwargs: Any) -> Response:
+        """
+        Perform a http request, passing it through the middleware chain
+        before it is sent
+
+        The timeout can be overridden per call, and is always limited by the
+        currently active deadline (if any)
+        """
+
+        request = Request(method, url, timeout=timeout, **kwargs)
+        request.context["api_root"] = self._api_root
+        chain = build_chain(get_middleware() + self._middleware + self._builtin, self._dispatch)
+
+        hooks = get_hooks() + self._hooks
+        if not hooks:
+            return chain(request)
+
+        start = time.monotonic()
+        try:
+            r = chain(request)
+        except Exception as e:
+            emit(hooks, build_event(self._api_root, request, None, time.monotonic() - start, e))
+            raise
+
+        emit(hooks, build_event(self._api_root, request, r, time.monotonic() - start))
+        return r
+
+    def _dispatch(self, request: Request) -> Response:
+        """
+        Send a request through our transport, retrying according to our
+        retry policy
+        """
+
+        method, url = request.method, request.url
+        tmo = Timeout.parse(request.timeout, self._timeout)
+        deadline = current_deadline()
+
+        transport: Optional[Transport] = request.context.get("transport", self._transport)
+        assert transport is not None
+
+        kwargs: Dict[str, Any] = {"headers": request.headers, "data": request.data, "json": request.json}
+        if not isinstance(transport, RequestsTransport):
+            kwargs["headers"] = {**self._headers, **request.headers}
+
+        # bodies produced by an iterator are streamed, and counted as they go
+        streamed = isinstance(request.data, Iterator)
+        if streamed:
+            kwargs["data"] = _counted(request.data, request.context)
+
+        def send() -> Response:
+            if deadline is not None and deadline.expired:
+                raise NovemTimeout(f"{method} {url}: deadline exceeded")
+
+            request.context["attempts"] = request.context.get("attempts", 0) + 1
+            if not streamed:
+                request.context["bytes_sent"] = len(kwargs["data"] or b"")
+
+            kwargs["timeout"] = tmo.clamp(deadline)
+
+            if not self._limiter:
+                return transport.request(method, url, **kwargs)
+
+            # every attempt, including retries, counts towards the limit
+            with self._limiter.slot():
+                return transport.request(method, url, **kwargs)
+
+        # large bodies are compressed if enabled and the server supports it
+        plain: Any = request.data
+        codec = self._compression.choose(self._api_root, plain)
+        if codec:
+            kwargs["data"] = compress(codec, plain)
+            kwargs["headers"] = {**kwargs["headers"], "Content-Encoding": codec}
+
+        try:
+            if streamed:
+                # a streamed body can't be sent twice
+                return send()
+
+            r = self._retry.execute(method, send, deadline=deadline, idempotent=request.idempotent)
+
+            if codec and self._compression.rejected(self._api_root, codec, r):
+                # no support for this encoding, resend the body as is
+                kwargs["data"] = plain
+                kwargs["headers"] = {k: v for k, v in kwargs["headers"].items() if k != "Content-Encoding"}
+                r = self._retry.execute(method, send, deadline=deadline, idempotent=request.idempotent)
+                self._compression.confirm(self._api_root, codec, r)
+
+            return r
+        except requests.Timeout as e:
+            raise NovemTimeout(f"{method} {url}: timed out") from e
+
+
+class NovemAPI(RequestPipeline):
     """
     Novem API class
 
@@ -60,54 +285,27 @@ class NovemAPI(object):
     def __init__(self, **kwargs: Any) -> None:
         """ """
 
-        config_status, config = get_current_config(**kwargs)
+        config, api_root, token = resolve_connection(**kwargs)
 
         self._config = config
-        self._session = requests.Session()
-        self._session.headers.update(get_ua(kwargs.get("is_cli", False)))
-        self._session.proxies = urllib.request.getproxies()
-
-        if self._config["ignore_ssl_warn"]:
-            # supress ssl warnings
-            self._session.verify = False
-            import urllib3
-
-            urllib3.disable_warnings()
-
-        # api root should always be supplied in the result
-        self._api_root = config["api_root"]
-        if not self._api_root:
-            self._api_root = os.getenv("NOVEM_API_ROOT") or API_ROOT
-
-        env_token = os.getenv("NOVEM_TOKEN")
-        global did_token_warning
-
-        if config.get("token", None):
-            assert config["token"]
-            self.token = config["token"]
-            self._session.headers["Authorization"] = f"Bearer {self.token}"
-            if env_token is not None and not did_token_warning:
-                did_token_warning = True
-                print("WARN: Both NOVEM_TOKEN and config file token are set. Using config file token.", file=sys.stderr)
-
-        elif env_token is not None:
-            self.token = env_token
-            self._session.headers["Authorization"] = f"Bearer {self.token}"
-
-        elif not config_status:
-            print(
-                """\
-Novem config file is missing.  Either specify config file location with
-the config_path parameter, setup a new token using
-$ python -m novem --init
-or set the NOVEM_TOKEN environment variable.\
-"""
-            )
-            sys.exit(0)
+        if token is not None:
+            self.token = token
+
+        # sessions are shared between all objects with the same settings so
+        # that we can reuse connections across plots, grids, mails etc
+        configure_pool_from_config(config, kwargs)
+        transport = get_transport(
+            kwargs.get("transport") or config.get("transport"),
+            api_root,
+            token,
+            verify=not config["ignore_ssl_warn"],
+            is_cli=kwargs.get("is_cli", False),
+        )
+        RequestPipeline.__init__(self, api_root, token, config, kwargs, transport)
 
-        if self._api_root[-1] != "/":
-            # our code assumes that the api_root ends with a /
-            self._api_root = f"{self._api_root}/"
+        # objects we have seen on the server, see novem.http.existence
+        self._known = get_known(api_root, token, config, kwargs)
+        self._metadata = get_metadata(api_root, token, config, kwargs)
 
     def _parse_kwargs(self, **kwargs: Any) -> None:
         """
@@ -118,9 +316,11 @@ or set the NOVEM_TOKEN environment variable.\
             self._api_root = kwargs["api_root"]
 
     def create_token(self, params: Dict[str, str]) -> Dict[str, str]:
-        r = requests.post(
+        # token requests are authenticated by username/password only
+        r = self._request(
+            "POST",
             f"{self._api_root}token",
-            headers={"User-Agent": self._session.headers["User-Agent"]},
+            headers={"Authorization": None},
             json=params,
         )
 
@@ -131,10 +331,12 @@ or set the NOVEM_TOKEN environment variable.\
 
         return r.json()
 
-    def delete(self, path: str) -> bool:
+    def delete(self, path: str, timeout: TimeoutArg = None) -> bool:
 
-        r = self._session.delete(
+        r = self._request(
+            "DELETE",
             f"{self._api_root}{path}",
+            timeout=timeout,
         )
 
         if not r.ok:
@@ -144,12 +346,23 @@ or set the NOVEM_TOKEN environment variable.\
             else:
                 print(r.json())
 
+        self._known.discard(f"{self._api_root}{path}")
+        self._metadata.discard(f"{self._api_root}{path}")
+
         return r.ok
 
-    def read(self, path: str) -> str:
+    def _whoami(self) -> str:
+        """
+        The username behind our token, only looked up once
+        """
+        return self._metadata.fetch(f"{self._api_root}whoami", lambda: self.read("whoami"), persist=True)
+
+    def read(self, path: str, timeout: TimeoutArg = None) -> str:
 
-        r = self._session.get(
+        r = self._request(
+            "GET",
             f"{self._api_root}{path}",
+            timeout=timeout,
         )
 
         if not r.ok:
@@ -159,14 +372,16 @@ or set the NOVEM_TOKEN environment variable.\
 
         return r.text
 
-    def write(self, path: str, value: str) -> None:
+    def write(self, path: str, value: str, timeout: TimeoutArg = None) -> None:
 
-        r = self._session.post(
+        r = self._request(
+            "POST",
             f"{self._api_root}{path}",
             headers={
                 "Content-type": "text/plain",
             },
             data=value.encode("utf-8"),
+            timeout=timeout,
         )
 
         if not r.ok:
@@ -176,10 +391,12 @@ or set the NOVEM_TOKEN environment variable.\
             else:
                 print(r.json())
 
-    def create(self, path: str) -> None:
+    def create(self, path: str, timeout: TimeoutArg = None) -> bool:
 
-        r = self._session.put(
+        r = self._request(
+            "PUT",
             f"{self._api_root}{path}",
+            timeout=timeout,
         )
 
         if not r.ok:
@@ -188,3 +405,320 @@ or set the NOVEM_TOKEN environment variable.\
                 raise Novem404(resp["message"])
             else:
                 print(r.json())
+
+        return r.ok
+
+
+class NovemResourceAPI(NovemAPI, ABC):
+    """
+    Base class for objects living under a fixed api path, e.g.
+    vis/plots/<id> or jobs/<id>
+
+    Subclasses provide the path mapping, all requests go through the shared
+    request pipeline in NovemAPI._request
+
+    Objects are created on the server lazily, a request answered with 404
+    creates the object and is then repeated once, unless create=False was
+    given or the object is already known to exist
+
+    Writes of the value last written to a path are skipped, see
+    novem.http.elision
+    """
+
+    _debug: bool = False
+    _needs_create: bool = False
+    _may_create: bool = False
+
+    # paths that trigger an action on every write, and are never elided
+    _always_write: Tuple[str, ...] = ()
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+
+        if "debug" in kwargs and kwargs["debug"]:
+            self._debug = True
+
+        if "create" not in kwargs or kwargs["create"]:
+            self._may_create = True
+            self._needs_create = True
+
+        self._writes = write_log_from_config(self._api_root, getattr(self, "token", None), self._config, kwargs)
+
+    @abstractmethod
+    def _path(self, relpath: str) -> str:
+        """
+        Full url of relpath for this object
+        """
+
+    def _read_path(self, relpath: str) -> str:
+        """
+        Full url used when reading relpath, defaults to _path
+        """
+        return self._path(relpath)
+
+    def _writable(self) -> bool:
+        """
+        Whether we are allowed to modify this object
+        """
+        return True
+
+    def _remember(self) -> None:
+        """
+        Remember that this object exists on the server
+        """
+        self._needs_create = False
+        self._known.add(self._path(""))
+
+    def _create_missing(self, method: str) -> bool:
+        """
+        Create this object after a 404 if it is pending creation, returns
+        True if the request should be repeated
+
+        A failed write to an object we believed to exist is either for a
+        path that doesn't exist below it, or the object has been deleted
+        elsewhere (and the known set is stale). The object itself is checked
+        and only created again in the latter case
+        """
+        url = self._path("")
+        if url in self._known or (not self._needs_create and self._may_create):
+            # exists() forgets the object if it is gone
+            if not self._may_create or method not in ("POST", "PUT") or self.exists():
+                self._needs_create = False
+                return False
+
+            self._needs_create = True
+
+        if not self._needs_create or not self._writable():
+            self._needs_create = False
+            return False
+
+        self.api_create("")
+        return True
+
+    def _ensure_created(self, path: str) -> None:
+        """
+        Create this object before path, relative to the api root, is
+        modified through the raw api if it is pending creation
+        """
+        own = self._path("")[len(self._api_root) :]
+        if path.startswith(f"{own}/") and self._needs_create:
+            if self._path("") in self._known:
+                self._needs_create = False
+            else:
+                self.api_create("")
+
+    def create(self, path: str, timeout: TimeoutArg = None) -> bool:
+        self._ensure_created(path)
+        return super().create(path, timeout=timeout)
+
+    def write(self, path: str, value: str, timeout: TimeoutArg = None) -> None:
+        self._ensure_created(path)
+        super().write(path, value, timeout=timeout)
+
+    def _call(self, method: str, url: str, timeout: TimeoutArg = None, **kwargs: Any) -> Response:
+        """
+        Perform a request for this object, creating it first if needed
+        """
+        if self._debug:
+            print(f"{method}: {url}")
+
+        r = self._request(method, url, timeout=timeout, **kwargs)
+        if r.status_code == 404 and self._create_missing(method):
+            r = self._request(method, url, timeout=timeout, **kwargs)
+
+        if r.ok and self._needs_create:
+            self._remember()
+
+        return r
+
+    def _check(self, method: str, path: str, r: Response) -> None:
+        if r.status_code == 404:
+            raise Novem404(path)
+
+        if r.status_code == 403:
+            raise Novem403(path)
+
+    def _report(self, method: str, path: str, r: Response) -> None:
+        # TODO: verify result and raise exception if not ok
+        print(r)
+        print(f"{method}: {path}")
+        print("body")
+        print("---")
+        print(r.text)
+        print(r.status_code)
+        print("headers")
+        print("---")
+        for k, v in r.headers.items():
+            print(f"   {k}: {v}")
+        print("should raise a general error")
+
+    def exists(self, timeout: TimeoutArg = None) -> bool:
+        """
+        Check if this object exists on the server using a HEAD request
+        """
+        qpath = self._read_path("")
+
+        if self._debug:
+            print(f"HEAD: {qpath}")
+
+        r = self._request("HEAD", qpath, timeout=timeout)
+        if r.status_code == 404:
+            self._known.discard(self._path(""))
+            return False
+
+        self._check("HEAD", qpath, r)
+
+        if r.ok and self._needs_create:
+            self._remember()
+
+        return r.ok
+
+    def _read_fixed(self, relpath: str) -> str:
+        """
+        Read a value that never changes for this object, e.g. /shortname,
+        once per process
+        """
+        return self._metadata.fetch(self._read_path(relpath), lambda: self.api_read(relpath))
+
+    @traced()
+    def api_read(self, relpath: str, timeout: TimeoutArg = None) -> str:
+        """
+        Read the api value located at realtive path
+        """
+        return self.api_read_bytes(relpath, timeout=timeout).decode("utf-8")
+
+    @traced()
+    def api_read_bytes(self, relpath: str, timeout: TimeoutArg = None) -> bytes:
+        qpath = self._read_path(relpath)
+
+        r = self._call("GET", qpath, timeout=timeout)
+        self._check("GET", qpath, r)
+
+        if self._writes is not None and r.ok and qpath == self._path(relpath):
+            self._writes.verify(qpath, r.content)
+
+        return r.content
+
+    @traced()
+    def api_delete(self, relpath: str, timeout: TimeoutArg = None) -> bool:
+        """
+        relpath: relative path to the object baseline, /config/type
+                 for the type file in the config folder
+
+        returns True if the path was deleted
+        """
+        if not self._writable():
+            return False
+
+        path = self._path(relpath)
+
+        if relpath:
+            r = self._call("DELETE", path, timeout=timeout)
+        else:
+            # deleting the object itself should never create it first
+            if self._debug:
+                print(f"DELETE: {path}")
+            r = self._request("DELETE", path, timeout=timeout)
+            self._needs_create = False
+            self._known.discard(path)
+            self._metadata.discard(path)
+
+        self._check("DELETE", path, r)
+
+        if self._writes is not None:
+            self._writes.discard(path)
+
+        if not r.ok:
+            self._report("DELETE", path, r)
+
+        return r.ok
+
+    @traced()
+    def api_create(self, relpath: str, timeout: TimeoutArg = None) -> bool:
+        """
+        relpath: relative path to the object baseline, /config/type
+                 for the type file in the config folder
+
+        returns True if the path was created or already existed
+        """
+        if not self._writable():
+            return False
+
+        path = self._path(relpath)
+
+        if relpath:
+            r = self._call("PUT", path, timeout=timeout)
+        else:
+            if self._debug:
+                print(f"PUT: {path}")
+            r = self._request("PUT", path, timeout=timeout)
+
+        self._check("PUT", path, r)
+
+        if r.status_code == 409:
+            # we will ignore 409 errors
+            # as creating objects that already exist is not a problem
+            if not relpath:
+                self._remember()
+            return True
+
+        if not r.ok:
+            self._report("PUT", path, r)
+        elif not relpath:
+            self._remember()
+
+        return r.ok
+
+    @traced()
+    def api_write(
+        self,
+        relpath: str,
+        value: Union[str, bytes],
+        timeout: TimeoutArg = None,
+        force: bool = False,
+        content_type: str = "text/plain",
+        source: Optional[str] = None,
+    ) -> None:
+        """
+        relpath: relative path to the object baseline, /config/type
+                 for the type file in the config folder
+        value: the value to write to the file, text or utf-8 encoded bytes
+        force: write even if value is what we last wrote
+        content_type: media type of value, raises Novem415 if the server
+                      doesn't accept anything but text for relpath
+        source: fingerprint of what value was produced from, see
+                novem.http.elision
+        """
+        if not self._writable():
+            return
+
+        path = self._path(relpath)
+        data = value if isinstance(value, bytes) else value.encode("utf-8")
+
+        writes = self._writes
+        elide = not force and relpath not in self._always_write
+
+        if writes is not None and elide and writes.unchanged(path, data):
+            if self._debug:
+                print(f"POST: {path} (unchanged, skipped)")
+            return
+
+        r = self._call(
+            "POST",
+            path,
+            headers={"Content-type": content_type},
+            data=data,
+            timeout=timeout,
+            # writes to action paths may have been acted on before failing
+            idempotent=relpath not in self._always_write,
+        )
+        self._check("POST", path, r)
+
+        if r.status_code == 415 and content_type != "text/plain":
+            raise Novem415(f"{path}: {content_type} is not supported")
+
+        if not r.ok:
+            text = value if isinstance(value, str) else value.decode("utf-8", "replace")
+            self._report("POST", f"{path} {text}", r)
+        elif writes is not None:
+            writes.record(path, data, source)
@@ -18,14 +18,16 @@ else:
     from signal import SIG_DFL, SIGPIPE, signal
     import readline  # type: ignore
 
+from .. import timeline
 from ..api_ref import NovemAPI
+from ..http import clear_disk_cache
 from ..utils import cl, colors, get_config_path, get_current_config
 from ..version import __version__
 from .common import grid, mail, plot
 from .config import check_if_profile_exists, update_config
 from .group import group
 from .invite import invite
-from .setup import setup
+from .setup import setup, trace_path
 
 sys.tracebacklimit = 0
 
@@ -300,6 +302,7 @@ def print_short(parser: Any) -> None:
     print("  novem -m              list your mails")
 
 
+@timeline.traced()
 def run_cli_wrapped() -> None:
     colors()
 
@@ -361,6 +364,13 @@ def run_cli_wrapped() -> None:
 
         print()
 
+    if args and args["cache_clear"]:
+        if clear_disk_cache():
+            print("Response cache cleared")
+        else:
+            print("No response cache found")
+        return
+
     # we are getting an init instruction
     if args and args["init"]:
         init_config(args)
@@ -417,6 +427,11 @@ novem --init --profile {args["profile"]}\
 
 
 def run_cli() -> None:
+    # enable the timeline before parsing arguments, so that we record it
+    path = trace_path(sys.argv[1:])
+    if path is not None:
+        timeline.enable(path)
+
     if os.name != "nt":
         signal(SIGPIPE, SIG_DFL)  # supress broken pipe error
     try:
@@ -46,6 +46,7 @@ class VisBase:
                 qpr=args["qpr"],
                 debug=args["debug"],
                 config_profile=args["profile"],
+                no_cache=args["no_cache"],
                 is_cli=True,
             )
 
@@ -59,6 +60,7 @@ class VisBase:
                 qpr=args["qpr"],
                 debug=args["debug"],
                 config_profile=args["profile"],
+                no_cache=args["no_cache"],
                 is_cli=True,
             )
         elif self.type == "grid":
@@ -71,6 +73,7 @@ class VisBase:
                 qpr=args["qpr"],
                 debug=args["debug"],
                 config_profile=args["profile"],
+                no_cache=args["no_cache"],
                 is_cli=True,
             )
         else:
@@ -115,6 +118,11 @@ class VisBase:
 
         vis = self.mk(name=name, user=usr, ignore_ssl=ignore_ssl, create=create, args=args)
 
+        # objects are created lazily, -C should create it right away even if
+        # nothing else is written
+        if create:
+            vis.api_create("")
+
         # this is a data dump instruction, we'll ignore everything else
         if "dump" in args and args["dump"]:
             path = args["dump"]
@@ -5,7 +5,7 @@ from os import path
 from pathlib import Path
 from typing import Optional, Tuple
 
-from ..utils import API_ROOT, get_config_path
+from ..utils import API_ROOT, clear_config_cache, get_config_path
 from ..version import __version__
 
 
@@ -88,6 +88,7 @@ def update_config(
 
     with open(novem_config, "w+") as configfile:
         config.write(configfile)
+    clear_config_cache()
 
     return (True, novem_config)
 
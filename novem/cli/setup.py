@@ -1,7 +1,9 @@
 import argparse as ap
 import shutil
 from enum import Enum
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..timeline import default_trace_path, traced
 
 width = min(120, shutil.get_terminal_size().columns - 2)
 
@@ -17,6 +19,32 @@ def formatter(prog: str) -> ap.RawDescriptionHelpFormatter:
     return ap.RawDescriptionHelpFormatter(prog, width=width)
 
 
+def add_trace_argument(parser: ap.ArgumentParser) -> None:
+    # the path is optional, a bare --trace writes to the default path
+    parser.add_argument(
+        "--trace",
+        metavar=("OUT_PATH"),
+        dest="trace",
+        nargs="?",
+        const=default_trace_path(),
+        required=False,
+        default=None,
+        help=ap.SUPPRESS,
+    )
+
+
+def trace_path(raw_args: List[str]) -> Optional[str]:
+    """
+    The --trace output path, parsed ahead of the other arguments so that
+    parsing those is recorded as well
+    """
+    parser = ap.ArgumentParser(add_help=False)
+    add_trace_argument(parser)
+    known, _ = parser.parse_known_args(raw_args)
+    return known.trace
+
+
+@traced()
 def setup(raw_args: Any = None) -> Tuple[Any, Dict[str, str]]:
     parser = ap.ArgumentParser(
         prog="novem",
@@ -52,6 +80,26 @@ def setup(raw_args: Any = None) -> Tuple[Any, Dict[str, str]]:
         help=ap.SUPPRESS,
     )
 
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        required=False,
+        default=False,
+        help="bypass the response cache for this call",
+    )
+
+    parser.add_argument(
+        "--cache-clear",
+        dest="cache_clear",
+        action="store_true",
+        required=False,
+        default=False,
+        help="remove the persistent response cache",
+    )
+
+    add_trace_argument(parser)
+
     parser.add_argument(
         "--version",
         dest="version",
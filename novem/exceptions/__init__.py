@@ -1,3 +1,3 @@
-from ..api_ref import Novem401, Novem403, Novem404, NovemException
+from ..api_ref import Novem401, Novem403, Novem404, Novem415, NovemException, NovemTimeout
 
-__all__ = ["NovemException", "Novem404", "Novem403", "Novem401"]
+__all__ = ["NovemException", "Novem404", "Novem403", "Novem401", "NovemTimeout", "Novem415"]
@@ -2,20 +2,22 @@ import json
 from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Union
 
 from novem.exceptions import Novem404
+from novem.shared.snapshot import SNAPSHOT_TTL, SnapshotList
 
 if TYPE_CHECKING:
     from novem.group import NovemGroupAPI
 
 
-class Roles:
+class Roles(SnapshotList):
     _role_type: str = "NA"
 
-    def __init__(self, api: "NovemGroupAPI", type: str) -> None:
+    def __init__(self, api: "NovemGroupAPI", type: str, ttl: float = SNAPSHOT_TTL) -> None:
         """Initialize the Roles object"""
+        super().__init__(ttl)
         self.api: "NovemGroupAPI" = api
         self._role_type = type
 
-    def get(self) -> List[str]:
+    def _fetch(self) -> List[str]:
         """Get list of all roles currently active"""
         try:
             s = self.api.api_read(f"/roles/{self._role_type}")
@@ -36,24 +38,27 @@ class Roles:
         rms = set(es) - set(roles)
         adds = set(roles) - set(es)
 
-        # Delete non-empty items
-        for r in filter(None, rms):
-            self.api.api_delete(f"/roles/{self._role_type}/{r}")
+        with self._mutating():
+            # Delete non-empty items
+            for r in filter(None, rms):
+                self._apply(self.api.api_delete(f"/roles/{self._role_type}/{r}"), self._removed, r)
 
-        # Add non-empty items
-        for a in filter(None, adds):
-            self.api.api_create(f"/roles/{self._role_type}/{a}")
+            # Add non-empty items
+            for a in filter(None, adds):
+                self._apply(self.api.api_create(f"/roles/{self._role_type}/{a}"), self._added, a)
 
     def __iadd__(self, share: str) -> "Roles":
         """Add a new share to the plot"""
         if share not in self.get():
-            self.api.api_create(f"/roles/{self._role_type}/{share}")
+            with self._mutating():
+                self._apply(self.api.api_create(f"/roles/{self._role_type}/{share}"), self._added, share)
         return self
 
     def __isub__(self, share: str) -> "Roles":
         """Remove a share from the plot"""
         if share in self.get():
-            self.api.api_delete(f"/roles/{self._role_type}/{share}")
+            with self._mutating():
+                self._apply(self.api.api_delete(f"/roles/{self._role_type}/{share}"), self._removed, share)
         return self
 
     def __eq__(self, other: object) -> bool:
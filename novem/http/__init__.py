@@ -0,0 +1,100 @@
+from .cache import CacheMiddleware, ResponseCache, caches_from_config, clear_caches, get_cache
+from .compression import Compression, compress
+from .diskcache import DiskCache, clear_disk_cache, get_disk_cache
+from .elision import WriteLog, WriteStats, write_log_from_config, write_stats
+from .existence import KnownSet, clear_known, get_known
+from .instrument import (
+    Hook,
+    OpenTelemetryMiddleware,
+    RequestEvent,
+    RequestStats,
+    add_hook,
+    build_event,
+    emit,
+    get_hooks,
+    path_template,
+    remove_hook,
+)
+from .metadata import MetadataCache, clear_metadata, get_metadata
+from .middleware import Handler, Middleware, Request, add_middleware, build_chain, get_middleware, remove_middleware
+from .pool import SessionPool, clear_pool, configure_pool, configure_pool_from_config, get_session, get_ua
+from .ratelimit import RateLimiter, get_limiter, limiter_from_config
+from .retry import NO_RETRY, RetryPolicy
+from .singleflight import Singleflight, SingleflightMiddleware, coalesce_enabled, get_group
+from .timeout import Deadline, Timeout, TimeoutArg, current_deadline, within
+from .transport import (
+    ASGITransport,
+    HTTP2Transport,
+    RequestsTransport,
+    Transport,
+    TransportResponse,
+    WSGITransport,
+    get_transport,
+)
+
+__all__ = [
+    "SessionPool",
+    "get_session",
+    "configure_pool",
+    "configure_pool_from_config",
+    "clear_pool",
+    "get_ua",
+    "RetryPolicy",
+    "NO_RETRY",
+    "RateLimiter",
+    "get_limiter",
+    "limiter_from_config",
+    "Deadline",
+    "Timeout",
+    "TimeoutArg",
+    "current_deadline",
+    "within",
+    "Compression",
+    "compress",
+    "Transport",
+    "TransportResponse",
+    "RequestsTransport",
+    "HTTP2Transport",
+    "WSGITransport",
+    "ASGITransport",
+    "get_transport",
+    "Request",
+    "Handler",
+    "Middleware",
+    "add_middleware",
+    "remove_middleware",
+    "get_middleware",
+    "build_chain",
+    "RequestEvent",
+    "RequestStats",
+    "Hook",
+    "add_hook",
+    "remove_hook",
+    "get_hooks",
+    "build_event",
+    "emit",
+    "path_template",
+    "OpenTelemetryMiddleware",
+    "ResponseCache",
+    "CacheMiddleware",
+    "get_cache",
+    "clear_caches",
+    "caches_from_config",
+    "DiskCache",
+    "get_disk_cache",
+    "clear_disk_cache",
+    "Singleflight",
+    "SingleflightMiddleware",
+    "get_group",
+    "coalesce_enabled",
+    "KnownSet",
+    "get_known",
+    "clear_known",
+    "MetadataCache",
+    "get_metadata",
+    "clear_metadata",
+    "WriteLog",
+    "WriteStats",
+    "write_log_from_config",
+    "write_stats",
+]
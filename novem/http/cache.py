@@ -0,0 +1,295 @@
+"""
+Conditional GET response cache
+
+Responses to GET requests that carry an ETag or Last-Modified validator are
+kept in a size bounded LRU cache. Later reads of the same url revalidate
+with If-None-Match/If-Modified-Since, and a 304 Not Modified answer is
+served from the cache rather than downloading the body again. Writes,
+creates and deletes made through the same cache drop the affected entries.
+
+Responses are revalidated on every read unless the server sends a max-age,
+or a cache_ttl is configured, in which case they are served without asking
+the server until they expire. With a ttl, responses without validators are
+cached as well.
+
+Caches are shared by all objects using the same api_root and token, and can
+be tuned or disabled in the profile:
+
+    [profile:default]
+    cache = false
+    cache_size = 67108864
+    cache_ttl = 5
+
+A persistent cache shared between processes can be added with disk_cache,
+see novem.http.diskcache.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .middleware import Handler, Middleware, Request
+from .transport import Response, TransportResponse
+
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+# methods that modify the resource at the request url
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    content: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    expires: Optional[float] = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires is not None and self.expires > time.time()
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def response(self) -> TransportResponse:
+        return TransportResponse(self.status, self.headers, self.content, url=self.url)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+def url_path(url: str) -> str:
+    return url.split("?")[0].rstrip("/")
+
+
+class ResponseCache(object):
+    """
+    In memory LRU of GET responses bounded by the total size of the bodies
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        size = entry.size
+        if size > self.max_size:
+            return
+
+        with self._lock:
+            old = self._entries.pop(entry.url, None)
+            if old is not None:
+                self.size -= old.size
+
+            self._entries[entry.url] = entry
+            self.size += size
+            self.stats.stores += 1
+
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.stats.evictions += 1
+
+    def invalidate(self, url: str) -> None:
+        """
+        Drop cached responses for url, regardless of query, and everything
+        below it
+        """
+        path = url_path(url)
+        with self._lock:
+            for key in list(self._entries):
+                kp = url_path(key)
+                if kp == path or kp.startswith(f"{path}/"):
+                    self.size -= self._entries.pop(key).size
+                    self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+
+def expires(r: Response, ttl: float) -> Optional[float]:
+    """
+    Until when the response can be used without revalidation, if at all
+    """
+    cc = r.headers.get("Cache-Control", "").lower()
+    if "no-cache" in cc:
+        return None
+
+    m = re.search(r"max-age=(\d+)", cc)
+    if m:
+        ttl = max(ttl, float(m.group(1)))
+
+    return time.time() + ttl if ttl > 0 else None
+
+
+def cacheable(r: Response, expires: Optional[float] = None) -> bool:
+    if r.status_code != 200:
+        return False
+
+    if "no-store" in r.headers.get("Cache-Control", "").lower():
+        return False
+
+    return expires is not None or bool(r.headers.get("ETag") or r.headers.get("Last-Modified"))
+
+
+class CacheMiddleware(object):
+    """
+    Serve GET requests through a response cache
+
+    * cache: a ResponseCache or anything with the same interface
+    * ttl: seconds a response is served without revalidation
+    """
+
+    def __init__(self, cache: Any, ttl: float = 0) -> None:
+        self.cache = cache
+        self.ttl = ttl
+
+    def __call__(self, request: Request, call_next: Handler) -> Response:
+        if request.method in WRITE_METHODS:
+            self.cache.invalidate(request.url)
+            return call_next(request)
+
+        if request.method != "GET" or request.context.get("cache") is False:
+            return call_next(request)
+
+        entry = self.cache.get(request.url)
+        if entry is not None and entry.fresh:
+            request.context["cache"] = "hit"
+            self.cache.record(True)
+            return entry.response()
+
+        if entry is not None:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        r = call_next(request)
+
+        if r.status_code == 304 and entry is not None:
+            request.context["cache"] = "hit"
+            self.cache.record(True)
+            return entry.response()
+
+        # an inner cache might have served this
+        request.context.setdefault("cache", "miss")
+        self.cache.record(False)
+
+        exp = expires(r, self.ttl) if r.status_code == 200 else None
+        if cacheable(r, exp):
+            self.cache.put(
+                CacheEntry(
+                    url=request.url,
+                    status=r.status_code,
+                    headers=dict(r.headers),
+                    content=r.content,
+                    etag=r.headers.get("ETag"),
+                    last_modified=r.headers.get("Last-Modified"),
+                    expires=exp,
+                )
+            )
+
+        return r
+
+
+# caches are shared per (api_root, token digest)
+_caches: Dict[Tuple[str, str], ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(api_root: str, token: Optional[str], max_size: int = DEFAULT_CACHE_SIZE) -> ResponseCache:
+    # responses depend on who is asking, never share them between tokens
+    key = (api_root, hashlib.sha1((token or "").encode("utf-8")).hexdigest())
+
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = ResponseCache(max_size)
+        return _caches[key]
+
+
+def clear_caches() -> None:
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
+        _caches.clear()
+
+
+def caches_from_config(
+    api_root: str, token: Optional[str], config: Mapping[str, Any], kwargs: Mapping[str, Any]
+) -> List[Middleware]:
+    """
+    Construct the cache middleware for an object, outermost first, empty if
+    caching is off
+
+    The cache kwarg can be a bool or a ResponseCache instance, no_cache
+    (the cli --no-cache option) disables all caching
+    """
+    if kwargs.get("no_cache"):
+        return []
+
+    ttl = float(kwargs.get("cache_ttl") or config.get("cache_ttl") or 0)
+
+    if isinstance(kwargs.get("cache"), ResponseCache):
+        return [CacheMiddleware(kwargs["cache"], ttl)]
+
+    enabled = True
+    max_size = DEFAULT_CACHE_SIZE
+    for source in (config, kwargs):
+        if source.get("cache") is not None:
+            enabled = bool(source["cache"])
+        if source.get("cache_size") is not None:
+            max_size = int(source["cache_size"])
+
+    if not enabled:
+        return []
+
+    caches: List[Middleware] = []
+    if max_size > 0:
+        caches.append(CacheMiddleware(get_cache(api_root, token, max_size), ttl))
+
+    disk = kwargs.get("disk_cache", config.get("disk_cache"))
+    if disk:
+        from .diskcache import DEFAULT_DISK_CACHE_SIZE, get_disk_cache
+
+        path = disk if isinstance(disk, str) else None
+        profile = str(config.get("profile") or "")
+        size = int(kwargs.get("disk_cache_size") or config.get("disk_cache_size") or DEFAULT_DISK_CACHE_SIZE)
+        caches.append(CacheMiddleware(get_disk_cache(path, profile, api_root, token, size), ttl))
+
+    return caches
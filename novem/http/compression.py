@@ -0,0 +1,144 @@
+"""
+Request body compression
+
+Large request bodies (typically csv uploads to /data) can be compressed with
+gzip or, if the zstandard package is installed, zstd. Support is discovered
+lazily: the first large upload to an api_root is sent compressed, and if the
+server answers 415 Unsupported Media Type the upload is repeated
+uncompressed. The codec is remembered as rejected for that api_root if the
+uncompressed upload goes through, a 415 for that as well is about the media
+type rather than the encoding. A 415 response may list the encodings the
+server does accept (RFC 7694), in which case that list is trusted, and we
+switch to one of those instead.
+"""
+
+import gzip
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Set
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+CODECS = ["zstd", "gzip"]
+DEFAULT_THRESHOLD = 256 * 1024
+
+# rejected codecs per api_root
+_rejected: Dict[str, Set[str]] = {}
+_rejected_lock = threading.Lock()
+
+
+def available_codecs() -> Set[str]:
+    codecs = {"gzip"}
+    if zstandard is not None:
+        codecs.add("zstd")
+    return codecs
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        # favour speed over ratio, csv compresses well regardless
+        return gzip.compress(data, compresslevel=5)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor().compress(data)
+
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def reset_negotiation(api_root: Optional[str] = None) -> None:
+    """
+    Forget what we learned about server support, for all or one api_root
+    """
+    with _rejected_lock:
+        if api_root is None:
+            _rejected.clear()
+        else:
+            _rejected.pop(api_root, None)
+
+
+@dataclass(frozen=True)
+class Compression:
+    """
+    * codec: preferred codec, gzip or zstd, None disables compression
+    * threshold: minimum body size in bytes before we compress
+    """
+
+    codec: Optional[str] = None
+    threshold: int = DEFAULT_THRESHOLD
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> "Compression":
+        if isinstance(kwargs.get("compression"), Compression):
+            return kwargs["compression"]
+
+        codec: Optional[str] = None
+        threshold = DEFAULT_THRESHOLD
+        for source in (config, kwargs):
+            if source.get("compression") is not None:
+                codec = str(source["compression"]).lower() or None
+            if source.get("compression_threshold") is not None:
+                threshold = int(source["compression_threshold"])
+
+        if codec in ["none", "off", "false", "no"]:
+            codec = None
+
+        # fall back to gzip if zstd is requested but not installed
+        if codec == "zstd" and zstandard is None:
+            codec = "gzip"
+
+        return cls(codec=codec, threshold=threshold)
+
+    def choose(self, api_root: str, data: Any) -> Optional[str]:
+        """
+        Pick the codec to use for this body, if any
+        """
+        if not self.codec or not isinstance(data, bytes) or len(data) < self.threshold:
+            return None
+
+        with _rejected_lock:
+            rejected = set(_rejected.get(api_root, ()))
+
+        for codec in [self.codec] + CODECS:
+            if codec not in rejected and codec in available_codecs():
+                return codec
+
+        return None
+
+    def rejected(self, api_root: str, codec: str, response: Any) -> bool:
+        """
+        Inspect a response to a compressed request, returns True if the
+        server might not have accepted the encoding and the request should
+        be resent uncompressed, see confirm
+        """
+        if response.status_code != 415:
+            return False
+
+        # the server might tell us what it does support
+        accepted = response.headers.get("Accept-Encoding")
+        if accepted is None:
+            # the encoding or the media type, the resend will tell
+            return True
+
+        supported = {x.split(";")[0].strip().lower() for x in accepted.split(",")}
+        if codec in supported:
+            # the encoding is fine, it's the body that was refused
+            return False
+
+        with _rejected_lock:
+            _rejected.setdefault(api_root, set()).update(c for c in CODECS if c not in supported)
+
+        return True
+
+    def confirm(self, api_root: str, codec: str, response: Any) -> None:
+        """
+        Inspect the response to the uncompressed resend of a request that
+        was rejected, the codec is remembered as rejected for api_root if the
+        server accepted the resend
+        """
+        if response.status_code == 415:
+            return
+
+        with _rejected_lock:
+            _rejected.setdefault(api_root, set()).add(codec)
@@ -0,0 +1,278 @@
+"""
+Persistent response cache
+
+A SQLite backed store for the response cache, kept in the novem config
+folder so that cached responses survive between processes, e.g. repeated
+cli invocations from a script. Entries are scoped by profile and token,
+evicted least recently used first when the database grows beyond its size
+limit, and the database runs in WAL mode so that many processes can read
+and write it concurrently.
+
+Enable it in the profile or per object, and combine it with a ttl to skip
+revalidation entirely for a while:
+
+    [profile:default]
+    disk_cache = true
+    cache_ttl = 10
+
+Clear it with `novem --cache-clear`, or bypass all caching for a single cli
+call with --no-cache. Any database error is treated as a cache miss.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from ..utils import get_config_path
+from .cache import CacheEntry, CacheStats, url_path
+
+DEFAULT_DISK_CACHE_SIZE = 256 * 1024 * 1024
+DISK_CACHE_NAME = "cache.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires REAL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (scope, url)
+);
+CREATE INDEX IF NOT EXISTS entries_path ON entries (scope, path);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def connect(path: str, schema: str) -> sqlite3.Connection:
+    """
+    Open the cache database at path, creating the tables in schema
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(schema)
+    return conn
+
+
+def default_disk_cache_path() -> str:
+    novem_dir, _ = get_config_path()
+    return os.path.join(novem_dir, DISK_CACHE_NAME)
+
+
+class DiskCache(object):
+    """
+    A view of the cache database for one scope, with the ResponseCache
+    interface
+    """
+
+    def __init__(self, path: str, scope: str, max_size: int = DEFAULT_DISK_CACHE_SIZE) -> None:
+        self.path = path
+        self.scope = scope
+        self.max_size = max_size
+        self.stats = CacheStats()
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # running estimate of the database size, loaded on the first put and
+        # grown by every put after. Replaced and invalidated entries, and
+        # entries of other scopes and processes, make it drift, so the real
+        # size is only summed up once the estimate passes the limit
+        self._size: Optional[int] = None
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, SCHEMA)
+        return conn
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT status, headers, content, etag, last_modified, expires FROM entries WHERE scope=? AND url=?",
+                (self.scope, url),
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute("UPDATE entries SET accessed=? WHERE scope=? AND url=?", (time.time(), self.scope, url))
+        except sqlite3.Error:
+            return None
+
+        status, headers, content, etag, last_modified, expires = row
+        return CacheEntry(
+            url=url,
+            status=status,
+            headers=json.loads(headers),
+            content=content,
+            etag=etag,
+            last_modified=last_modified,
+            expires=expires,
+        )
+
+    def put(self, entry: CacheEntry) -> None:
+        size = entry.size
+        if size > self.max_size:
+            return
+
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.scope,
+                    entry.url,
+                    url_path(entry.url),
+                    entry.status,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.expires,
+                    size,
+                    time.time(),
+                ),
+            )
+            self.stats.stores += 1
+            if self._grow(conn, size) > self.max_size:
+                self._evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _grow(self, conn: sqlite3.Connection, size: int) -> int:
+        with self._lock:
+            if self._size is None:
+                # includes the entry just stored
+                (self._size,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            else:
+                self._size += size
+            return self._size
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_size:
+            with self._lock:
+                self._size = total
+            return
+
+        # drop the least recently used entries, across all scopes, until we
+        # are at 90% of the limit to avoid evicting on every write
+        excess = total - int(self.max_size * 0.9)
+        rows = conn.execute("SELECT scope, url, size FROM entries ORDER BY accessed").fetchall()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for scope, url, size in rows:
+                if excess <= 0:
+                    break
+                conn.execute("DELETE FROM entries WHERE scope=? AND url=?", (scope, url))
+                excess -= size
+                total -= size
+                self.stats.evictions += 1
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._size = total
+
+    def invalidate(self, url: str) -> None:
+        path = url_path(url)
+        try:
+            cur = self._conn().execute(
+                "DELETE FROM entries WHERE scope=? AND (path=? OR substr(path, 1, ?)=?)",
+                (self.scope, path, len(path) + 1, f"{path}/"),
+            )
+            self.stats.invalidations += max(cur.rowcount, 0)
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        try:
+            self._conn().execute("DELETE FROM entries WHERE scope=?", (self.scope,))
+        except sqlite3.Error:
+            pass
+
+        with self._lock:
+            self._size = None
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+    def __len__(self) -> int:
+        try:
+            (count,) = self._conn().execute("SELECT COUNT(*) FROM entries WHERE scope=?", (self.scope,)).fetchone()
+            return int(count)
+        except sqlite3.Error:
+            return 0
+
+
+_disk_caches: Dict[Tuple[str, str], DiskCache] = {}
+_disk_caches_lock = threading.Lock()
+
+
+def get_disk_cache(
+    path: Optional[str],
+    profile: str,
+    api_root: str,
+    token: Optional[str],
+    max_size: int = DEFAULT_DISK_CACHE_SIZE,
+) -> DiskCache:
+    """
+    Return the disk cache for the given profile and credentials, path
+    defaults to cache.sqlite in the novem config folder
+    """
+    path = path or default_disk_cache_path()
+    digest = hashlib.sha1(f"{api_root}\n{token or ''}".encode("utf-8")).hexdigest()[:16]
+    scope = f"{profile}:{digest}"
+
+    with _disk_caches_lock:
+        key = (path, scope)
+        if key not in _disk_caches:
+            _disk_caches[key] = DiskCache(path, scope, max_size)
+        return _disk_caches[key]
+
+
+def clear_disk_cache(path: Optional[str] = None) -> bool:
+    """
+    Remove the cache database, returns False if there was none
+    """
+    path = path or default_disk_cache_path()
+
+    with _disk_caches_lock:
+        _disk_caches.clear()
+
+    # known objects, metadata and written digests are kept in the same database
+    from .elision import clear_write_stores
+    from .existence import clear_known
+    from .metadata import clear_metadata
+
+    clear_known()
+    clear_metadata()
+    clear_write_stores()
+
+    found = False
+    for fn in [path, f"{path}-wal", f"{path}-shm"]:
+        if os.path.exists(fn):
+            os.remove(fn)
+            found = True
+
+    return found
@@ -0,0 +1,250 @@
+"""
+Write elision
+
+Every object remembers a digest of the last value it successfully wrote to
+each path, and skips writes of the same value again. Pipelines that re-run
+and rewrite the same configuration therefore only send what changed, and
+don't trigger needless re-renders on the server.
+
+Digests can also be persisted per profile in the disk cache database, so
+that unchanged writes are skipped across runs:
+
+    [profile:default]
+    persist_writes = true
+
+Writes can also record a fingerprint of the source the value was produced
+from, e.g. of the DataFrame behind a plot's /data. A later write from a
+source with the same fingerprint is skipped before the value is produced
+at all, see unchanged_source.
+
+Note that a persisted digest can't know about changes made elsewhere (e.g.
+in the web ui), pass force=True to api_write to always send a value, or set
+elide_writes = false to disable elision entirely. Totals of written and
+elided requests are available from write_stats().
+"""
+
+import hashlib
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS writes (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (scope, url)
+);
+CREATE TABLE IF NOT EXISTS write_sources (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (scope, url)
+);
+"""
+
+
+@dataclass
+class WriteStats:
+    written: int = 0
+    elided: int = 0
+
+
+_totals = WriteStats()
+_totals_lock = threading.Lock()
+
+
+def write_stats() -> WriteStats:
+    """
+    Writes sent and elided by all objects in this process
+    """
+    with _totals_lock:
+        return WriteStats(_totals.written, _totals.elided)
+
+
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class DiskWriteStore(object):
+    """
+    Persisted digests of written values, shared between processes
+    """
+
+    def __init__(self, path: str, scope: str) -> None:
+        self.path = path
+        self.scope = scope
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            from .diskcache import connect
+
+            conn = self._local.conn = connect(self.path, SCHEMA)
+        return conn
+
+    def get(self, url: str) -> Optional[str]:
+        sql = "SELECT digest FROM writes WHERE scope=? AND url=?"
+        try:
+            row = self._conn().execute(sql, (self.scope, url)).fetchone()
+        except sqlite3.Error:
+            return None
+        return None if row is None else str(row[0])
+
+    def get_source(self, url: str) -> Optional[str]:
+        sql = "SELECT fingerprint FROM write_sources WHERE scope=? AND url=?"
+        try:
+            row = self._conn().execute(sql, (self.scope, url)).fetchone()
+        except sqlite3.Error:
+            return None
+        return None if row is None else str(row[0])
+
+    def put(self, url: str, value: str, source: Optional[str] = None) -> None:
+        try:
+            conn = self._conn()
+            conn.execute("INSERT OR REPLACE INTO writes VALUES (?, ?, ?)", (self.scope, url, value))
+            if source is None:
+                conn.execute("DELETE FROM write_sources WHERE scope=? AND url=?", (self.scope, url))
+            else:
+                conn.execute("INSERT OR REPLACE INTO write_sources VALUES (?, ?, ?)", (self.scope, url, source))
+        except sqlite3.Error:
+            pass
+
+    def discard(self, url: str) -> None:
+        try:
+            for table in ("writes", "write_sources"):
+                self._conn().execute(
+                    f"DELETE FROM {table} WHERE scope=? AND (url=? OR substr(url, 1, ?)=?)",
+                    (self.scope, url, len(url) + 1, f"{url}/"),
+                )
+        except sqlite3.Error:
+            pass
+
+
+class WriteLog(object):
+    """
+    Digests of the last value written to each url of an object
+    """
+
+    def __init__(self, store: Optional[DiskWriteStore] = None) -> None:
+        self.store = store
+        self.stats = WriteStats()
+        self._digests: Dict[str, str] = {}
+        self._sources: Dict[str, str] = {}
+
+    def _get(self, url: str) -> Optional[str]:
+        if url in self._digests:
+            return self._digests[url]
+        if self.store is not None:
+            return self.store.get(url)
+        return None
+
+    def _get_source(self, url: str) -> Optional[str]:
+        if url in self._sources:
+            return self._sources[url]
+        if self.store is not None and url not in self._digests:
+            return self.store.get_source(url)
+        return None
+
+    def _elided(self) -> None:
+        self.stats.elided += 1
+        with _totals_lock:
+            _totals.elided += 1
+
+    def unchanged(self, url: str, data: bytes) -> bool:
+        """
+        Whether data is what we last wrote to url, counted as elided if so
+        """
+        same = self._get(url) == digest(data)
+        if same:
+            self._elided()
+        return same
+
+    def unchanged_source(self, url: str, source: str) -> bool:
+        """
+        Whether our last write to url was produced from a source with this
+        fingerprint, counted as elided if so
+        """
+        same = self._get_source(url) == source and self._get(url) is not None
+        if same:
+            self._elided()
+        return same
+
+    def record(self, url: str, data: bytes, source: Optional[str] = None) -> None:
+        """
+        Remember a successful write of data to url, produced from a source
+        with the given fingerprint if any
+        """
+        value = digest(data)
+        self._digests[url] = value
+        if source is None:
+            self._sources.pop(url, None)
+        else:
+            self._sources[url] = source
+        if self.store is not None:
+            self.store.put(url, value, source)
+
+        self.stats.written += 1
+        with _totals_lock:
+            _totals.written += 1
+
+    def verify(self, url: str, data: bytes) -> None:
+        """
+        Forget our digest for url if the server holds something else
+        """
+        known = self._get(url)
+        if known is not None and known != digest(data):
+            self.discard(url)
+
+    def discard(self, url: str) -> None:
+        url = url.rstrip("/")
+        self._digests = {k: v for k, v in self._digests.items() if k != url and not k.startswith(f"{url}/")}
+        self._sources = {k: v for k, v in self._sources.items() if k != url and not k.startswith(f"{url}/")}
+        if self.store is not None:
+            self.store.discard(url)
+
+
+_stores: Dict[Tuple[str, str], DiskWriteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def write_log_from_config(
+    api_root: str, token: Optional[str], config: Mapping[str, Any], kwargs: Mapping[str, Any]
+) -> Optional[WriteLog]:
+    """
+    Construct the write log for an object, None if elision is disabled
+
+    persist_writes can be a bool or the path of the database, it defaults to
+    the disk cache database
+    """
+    enabled = True
+    for source in (config, kwargs):
+        if source.get("elide_writes") is not None:
+            enabled = bool(source["elide_writes"])
+
+    if not enabled:
+        return None
+
+    persist = kwargs.get("persist_writes", config.get("persist_writes"))
+    if not persist:
+        return WriteLog()
+
+    from .diskcache import default_disk_cache_path
+
+    path = persist if isinstance(persist, str) else default_disk_cache_path()
+    creds = hashlib.sha1(f"{api_root}\n{token or ''}".encode("utf-8")).hexdigest()[:16]
+    scope = f"{config.get('profile') or ''}:{creds}"
+
+    with _stores_lock:
+        key = (path, scope)
+        if key not in _stores:
+            _stores[key] = DiskWriteStore(path, scope)
+        return WriteLog(_stores[key])
+
+
+def clear_write_stores() -> None:
+    with _stores_lock:
+        _stores.clear()
@@ -0,0 +1,181 @@
+"""
+Known resources
+
+Plots, grids, mails, jobs, repos and groups are no longer created on the
+server when they are constructed. Instead the first write is sent as is and
+the object is only created (and the write repeated) if the server answers
+404. Objects that have been seen to exist are remembered per api_root and
+token, so later instances with the same id skip the create fallback.
+
+When the disk cache is enabled the known objects are persisted in the same
+database, shared between processes:
+
+    [profile:default]
+    disk_cache = true
+"""
+
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, Mapping, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS known (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (scope, url)
+);
+"""
+
+
+class KnownSet(object):
+    """
+    Urls of objects known to exist on the server
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._urls: Set[str] = set()
+        # known urls below each path, so that discard only touches those
+        self._children: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def _parents(url: str) -> Iterator[str]:
+        parts = url.split("/")
+        for i in range(1, len(parts)):
+            yield "/".join(parts[:i])
+
+    def add(self, url: str) -> None:
+        with self._lock:
+            if url in self._urls:
+                return
+            self._urls.add(url)
+            for parent in self._parents(url):
+                self._children.setdefault(parent, set()).add(url)
+
+    def _remove(self, url: str) -> None:
+        self._urls.discard(url)
+        for parent in self._parents(url):
+            children = self._children.get(parent)
+            if children is not None:
+                children.discard(url)
+                if not children:
+                    del self._children[parent]
+
+    def discard(self, url: str) -> None:
+        url = url.rstrip("/")
+        with self._lock:
+            for child in list(self._children.get(url, ())):
+                self._remove(child)
+            if url in self._urls:
+                self._remove(url)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._urls.clear()
+            self._children.clear()
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+class DiskKnownSet(KnownSet):
+    """
+    A KnownSet backed by a table in the disk cache database, the in memory
+    set acts as a read through layer in front of it
+    """
+
+    def __init__(self, path: str, scope: str) -> None:
+        super().__init__()
+        self.path = path
+        self.scope = scope
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            from .diskcache import connect
+
+            conn = self._local.conn = connect(self.path, SCHEMA)
+        return conn
+
+    def add(self, url: str) -> None:
+        super().add(url)
+        try:
+            self._conn().execute("INSERT OR IGNORE INTO known VALUES (?, ?)", (self.scope, url))
+        except sqlite3.Error:
+            pass
+
+    def discard(self, url: str) -> None:
+        super().discard(url)
+        url = url.rstrip("/")
+        try:
+            self._conn().execute(
+                "DELETE FROM known WHERE scope=? AND (url=? OR substr(url, 1, ?)=?)",
+                (self.scope, url, len(url) + 1, f"{url}/"),
+            )
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        super().clear()
+        try:
+            self._conn().execute("DELETE FROM known WHERE scope=?", (self.scope,))
+        except sqlite3.Error:
+            pass
+
+    def __contains__(self, url: object) -> bool:
+        if super().__contains__(url):
+            return True
+
+        try:
+            row = self._conn().execute("SELECT 1 FROM known WHERE scope=? AND url=?", (self.scope, url)).fetchone()
+        except sqlite3.Error:
+            return False
+
+        if row is not None:
+            super().add(str(url))
+        return row is not None
+
+
+_known: Dict[Tuple[str, ...], KnownSet] = {}
+_known_lock = threading.Lock()
+
+
+def get_known(api_root: str, token: Optional[str], config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> KnownSet:
+    """
+    Return the known set for the given credentials, persisted if the disk
+    cache is enabled
+    """
+    digest = hashlib.sha1(f"{api_root}\n{token or ''}".encode("utf-8")).hexdigest()[:16]
+
+    disk = kwargs.get("disk_cache", config.get("disk_cache"))
+    if not disk or kwargs.get("no_cache"):
+        key: Tuple[str, ...] = (digest,)
+        with _known_lock:
+            if key not in _known:
+                _known[key] = KnownSet()
+            return _known[key]
+
+    from .diskcache import default_disk_cache_path
+
+    path = disk if isinstance(disk, str) else default_disk_cache_path()
+    scope = f"{config.get('profile') or ''}:{digest}"
+
+    key = (path, scope)
+    with _known_lock:
+        if key not in _known:
+            _known[key] = DiskKnownSet(path, scope)
+        return _known[key]
+
+
+def clear_known() -> None:
+    """
+    Forget all objects known to exist in this process
+    """
+    with _known_lock:
+        _known.clear()
@@ -0,0 +1,288 @@
+"""
+Request instrumentation
+
+Every api call can be reported to hooks as a RequestEvent, carrying the
+method, the resource path template (e.g. vis/plots/{id}/config/type),
+status, bytes sent and received, timings, number of retries and whether it
+was served from a cache:
+
+    stats = RequestStats()
+    add_hook(stats)
+    ...
+    print(stats.report())
+
+Hooks registered with add_hook see all objects, a list passed as the hooks=
+argument applies to a single object. No events are built when there are no
+hooks.
+
+requests does not expose the dns and connect phases of a request, so the
+timings are limited to the time until the response headers arrived (ttfb)
+and the total time including retries and middleware.
+
+OpenTelemetryMiddleware creates a client span for every call and propagates
+the trace context (traceparent) to the server, it requires the
+opentelemetry-api package.
+"""
+
+import bisect
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .middleware import Handler, Request
+from .transport import Response
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import propagate, trace  # type: ignore
+except ImportError:
+    propagate = None
+    trace = None
+
+# collections where the next path segment identifies an object
+ID_SEGMENTS = {
+    "plots": "{id}",
+    "grids": "{id}",
+    "mails": "{id}",
+    "docs": "{id}",
+    "jobs": "{id}",
+    "repos": "{id}",
+    "orgs": "{org}",
+    "groups": "{group}",
+    "users": "{user}",
+    "files": "{file}",
+}
+
+# latency histogram bucket upper bounds in seconds, the last bucket is open
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def path_template(api_root: str, url: str) -> str:
+    """
+    Strip the api root and query from url and replace object ids with
+    placeholders so calls can be grouped by endpoint
+    """
+    path = url[len(api_root) :] if url.startswith(api_root) else url
+    path = path.split("?")[0]
+
+    parts = path.split("/")
+    for i in range(1, len(parts)):
+        if parts[i] and parts[i - 1] in ID_SEGMENTS:
+            parts[i] = ID_SEGMENTS[parts[i - 1]]
+
+    return re.sub(r"/+$", "", "/".join(parts)) or "/"
+
+
+@dataclass
+class RequestEvent:
+    """
+    A completed api call
+
+    * path: path template relative to the api root
+    * ttfb: time until the response headers arrived, last attempt only
+    * total: wall time for the call including retries and middleware
+    * retries: number of attempts beyond the first
+    * cache: "hit" or "miss" when a cache handled the request
+    * error: the exception raised, if the call failed
+    """
+
+    method: str
+    url: str
+    path: str
+    status: Optional[int] = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    ttfb: Optional[float] = None
+    total: float = 0.0
+    retries: int = 0
+    cache: Optional[str] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+Hook = Callable[[RequestEvent], None]
+
+_hooks: List[Hook] = []
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: Hook) -> None:
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def get_hooks() -> List[Hook]:
+    with _hooks_lock:
+        return list(_hooks)
+
+
+def build_event(
+    api_root: str,
+    request: Request,
+    response: Optional[Response],
+    total: float,
+    error: Optional[BaseException] = None,
+) -> RequestEvent:
+    ctx = request.context
+
+    ev = RequestEvent(
+        method=request.method,
+        url=request.url,
+        path=path_template(api_root, request.url),
+        bytes_sent=ctx.get("bytes_sent", 0),
+        total=total,
+        retries=max(ctx.get("attempts", 1) - 1, 0),
+        cache=ctx.get("cache"),
+        error=error,
+    )
+
+    if response is not None:
+        ev.status = response.status_code
+        ev.bytes_received = len(response.content or b"")
+        elapsed = getattr(response, "elapsed", None)
+        if elapsed is not None:
+            ev.ttfb = elapsed.total_seconds()
+
+    return ev
+
+
+def emit(hooks: List[Hook], event: RequestEvent) -> None:
+    for hook in hooks:
+        # a broken hook must not fail the call, or hide the error it failed with
+        try:
+            hook(event)
+        except Exception:
+            logger.exception("request hook %r failed", hook)
+
+
+@dataclass
+class EndpointStats:
+    count: int = 0
+    errors: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """
+        Approximate percentile, the upper bound of the bucket holding it
+        """
+        if not self.count:
+            return 0.0
+
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+
+        return self.max
+
+
+class RequestStats(object):
+    """
+    Aggregates request events per endpoint, use as a hook
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        with self._lock:
+            st = self.endpoints.setdefault(event.endpoint, EndpointStats())
+            st.count += 1
+            st.retries += event.retries
+            st.bytes_sent += event.bytes_sent
+            st.bytes_received += event.bytes_received
+            st.total += event.total
+            st.max = max(st.max, event.total)
+            st.buckets[bisect.bisect_left(BUCKETS, event.total)] += 1
+
+            if event.error is not None or (event.status or 0) >= 400:
+                st.errors += 1
+            if event.cache == "hit":
+                st.cache_hits += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
+
+    def summary(self) -> List[Tuple[str, EndpointStats]]:
+        """
+        Endpoints ordered by total time spent, slowest first
+        """
+        with self._lock:
+            return sorted(self.endpoints.items(), key=lambda x: -x[1].total)
+
+    def report(self) -> str:
+        rows = [
+            f"{'endpoint':<48} {'calls':>6} {'err':>4} {'retry':>5} {'total':>8} "
+            f"{'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7}"
+        ]
+        for name, st in self.summary():
+            rows.append(
+                f"{name:<48} {st.count:>6} {st.errors:>4} {st.retries:>5} {st.total:>8.3f} "
+                f"{st.mean:>7.3f} {st.percentile(50):>7.3f} {st.percentile(95):>7.3f} {st.percentile(99):>7.3f}"
+            )
+        return "\n".join(rows)
+
+
+class OpenTelemetryMiddleware(object):
+    """
+    Emit a client span per api call and propagate the trace context
+
+        add_middleware(OpenTelemetryMiddleware(), index=0)
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        if trace is None:
+            raise ImportError(
+                "opentelemetry is required for tracing. Please install it using 'pip install opentelemetry-api'."
+            )
+
+        self.tracer = tracer or trace.get_tracer("novem")
+
+    def __call__(self, request: Request, call_next: Handler) -> Response:
+        url = request.url.split("?")[0]
+        name = f"{request.method} {path_template(request.context.get('api_root', ''), url)}"
+
+        with self.tracer.start_as_current_span(name, kind=trace.SpanKind.CLIENT) as span:
+            span.set_attribute("http.method", request.method)
+            span.set_attribute("http.url", url)
+
+            carrier: Dict[str, str] = {}
+            propagate.inject(carrier)
+            request.headers.update(carrier)
+
+            r = call_next(request)
+
+            span.set_attribute("http.status_code", r.status_code)
+            span.set_attribute("novem.retries", max(request.context.get("attempts", 1) - 1, 0))
+            if request.context.get("cache"):
+                span.set_attribute("novem.cache", request.context["cache"])
+            if r.status_code >= 400:
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+
+            return r
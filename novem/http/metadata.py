@@ -0,0 +1,176 @@
+"""
+Immutable metadata
+
+Some values never change for a given object and token, like the shortname
+and url of a vis or the username behind a token (whoami). They are read
+once and kept per api_root and token for the lifetime of the process, so
+e.g. a mail embedding 40 plots does not look up 40 shortnames on every
+build. Entries below an object are dropped when it is deleted.
+
+The username is also persisted in the disk cache database when the disk
+cache is enabled.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (scope, url)
+);
+"""
+
+
+class MetadataCache(object):
+    """
+    Values that never change, keyed by their full url
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[str]:
+        return self._values.get(url)
+
+    def put(self, url: str, value: str, persist: bool = False) -> None:
+        with self._lock:
+            self._values[url] = value
+
+    def fetch(self, url: str, read: Callable[[], str], persist: bool = False) -> str:
+        """
+        Return the value for url, calling read to get it the first time
+        """
+        value = self.get(url)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = read()
+        self.put(url, value, persist)
+        return value
+
+    def discard(self, url: str) -> None:
+        url = url.rstrip("/")
+        with self._lock:
+            self._values = {k: v for k, v in self._values.items() if k != url and not k.startswith(f"{url}/")}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class DiskMetadataCache(MetadataCache):
+    """
+    A MetadataCache that also keeps persisted values in the disk cache
+    database
+    """
+
+    def __init__(self, path: str, scope: str) -> None:
+        super().__init__()
+        self.path = path
+        self.scope = scope
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            from .diskcache import connect
+
+            conn = self._local.conn = connect(self.path, SCHEMA)
+        return conn
+
+    def get(self, url: str) -> Optional[str]:
+        value = super().get(url)
+        if value is not None:
+            return value
+
+        sql = "SELECT value FROM metadata WHERE scope=? AND url=?"
+        try:
+            row = self._conn().execute(sql, (self.scope, url)).fetchone()
+        except sqlite3.Error:
+            return None
+
+        if row is None:
+            return None
+
+        super().put(url, row[0])
+        return str(row[0])
+
+    def put(self, url: str, value: str, persist: bool = False) -> None:
+        super().put(url, value)
+        if not persist:
+            return
+
+        try:
+            self._conn().execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)", (self.scope, url, value))
+        except sqlite3.Error:
+            pass
+
+    def discard(self, url: str) -> None:
+        super().discard(url)
+        url = url.rstrip("/")
+        try:
+            self._conn().execute(
+                "DELETE FROM metadata WHERE scope=? AND (url=? OR substr(url, 1, ?)=?)",
+                (self.scope, url, len(url) + 1, f"{url}/"),
+            )
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        super().clear()
+        try:
+            self._conn().execute("DELETE FROM metadata WHERE scope=?", (self.scope,))
+        except sqlite3.Error:
+            pass
+
+
+_metadata: Dict[Tuple[str, ...], MetadataCache] = {}
+_metadata_lock = threading.Lock()
+
+
+def get_metadata(
+    api_root: str, token: Optional[str], config: Mapping[str, Any], kwargs: Mapping[str, Any]
+) -> MetadataCache:
+    """
+    Return the metadata cache for the given credentials, persisted if the
+    disk cache is enabled
+    """
+    digest = hashlib.sha1(f"{api_root}\n{token or ''}".encode("utf-8")).hexdigest()[:16]
+
+    disk = kwargs.get("disk_cache", config.get("disk_cache"))
+    if not disk or kwargs.get("no_cache"):
+        key: Tuple[str, ...] = (digest,)
+        with _metadata_lock:
+            if key not in _metadata:
+                _metadata[key] = MetadataCache()
+            return _metadata[key]
+
+    from .diskcache import default_disk_cache_path
+
+    path = disk if isinstance(disk, str) else default_disk_cache_path()
+    scope = f"{config.get('profile') or ''}:{digest}"
+
+    key = (path, scope)
+    with _metadata_lock:
+        if key not in _metadata:
+            _metadata[key] = DiskMetadataCache(path, scope)
+        return _metadata[key]
+
+
+def clear_metadata() -> None:
+    """
+    Forget all metadata kept in this process
+    """
+    with _metadata_lock:
+        _metadata.clear()
@@ -0,0 +1,97 @@
+"""
+Request middleware
+
+Every api call made by NovemAPI passes through an ordered chain of
+middleware before it reaches the transport. A middleware is a callable
+taking the request and the next handler in the chain:
+
+    def log_requests(request: Request, call_next: Handler) -> Response:
+        print(request.method, request.url)
+        response = call_next(request)
+        print(response.status_code)
+        return response
+
+    add_middleware(log_requests)
+
+It can inspect or modify the request, answer it without calling the next
+handler (e.g. from a cache), or inspect and replace the response. The first
+middleware in the chain is the outermost one. Retries, rate limiting,
+timeouts and compression happen after the chain, so a middleware sees one
+call per logical request.
+
+Middleware registered with add_middleware applies to all objects, a list
+passed as the middleware= argument applies to a single object and runs
+inside the global chain.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .timeout import TimeoutArg
+from .transport import Response
+
+
+@dataclass
+class Request:
+    """
+    A pending api request
+
+    * idempotent: the request can safely be repeated whatever its method,
+      e.g. a POST writing a whole value, and is retried like a PUT
+    * context: free form values for middleware to communicate with each
+      other, e.g. to mark a response as served from a cache
+    """
+
+    method: str
+    url: str
+    headers: Dict[str, Optional[str]] = field(default_factory=dict)
+    data: Any = None
+    json: Any = None
+    timeout: TimeoutArg = None
+    idempotent: bool = False
+    context: Dict[str, Any] = field(default_factory=dict)
+
+
+Handler = Callable[[Request], Response]
+Middleware = Callable[[Request, Handler], Response]
+
+_middleware: List[Middleware] = []
+_middleware_lock = threading.Lock()
+
+
+def add_middleware(middleware: Middleware, index: Optional[int] = None) -> None:
+    """
+    Add a middleware to the global chain, at the end (innermost) unless an
+    index is given
+    """
+    with _middleware_lock:
+        if index is None:
+            _middleware.append(middleware)
+        else:
+            _middleware.insert(index, middleware)
+
+
+def remove_middleware(middleware: Middleware) -> None:
+    with _middleware_lock:
+        if middleware in _middleware:
+            _middleware.remove(middleware)
+
+
+def get_middleware() -> List[Middleware]:
+    with _middleware_lock:
+        return list(_middleware)
+
+
+def build_chain(middleware: Sequence[Middleware], handler: Handler) -> Handler:
+    """
+    Wrap handler in the given middleware, the first one being outermost
+    """
+
+    def wrap(mw: Middleware, call_next: Handler) -> Handler:
+        return lambda request: mw(request, call_next)
+
+    for mw in reversed(middleware):
+        handler = wrap(mw, handler)
+
+    return handler
@@ -0,0 +1,181 @@
+"""
+Process wide http session pool
+
+Every NovemAPI instance that talks to the same api_root with the same
+credentials and ssl settings shares a single requests.Session, and with it
+a single urllib3 connection pool. This means we only pay for the TCP and TLS
+handshake once per host instead of once per Plot/Grid/Mail/Job object.
+
+The number of connections kept per host and how long an unused session is
+kept can be set with pool_size and pool_idle_timeout in the profile.
+"""
+
+import sys
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..version import __version__
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+# (api_root, token, verify, is_cli)
+SessionKey = Tuple[str, Optional[str], bool, bool]
+
+
+def get_ua(is_cli: bool) -> Dict[str, str]:
+    name = "NovemCli" if is_cli else "NovemLib"
+    py_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+    return {
+        "User-Agent": f"{name}/{__version__} Python/{py_version}",
+    }
+
+
+@dataclass
+class _PoolEntry:
+    session: requests.Session
+    last_used: float
+
+
+class SessionPool:
+    """
+    Thread safe pool of sessions keyed by (api_root, token, verify, is_cli)
+
+    * pool_size: number of connections kept alive per host
+    * idle_timeout: seconds a session can go unused before it is closed
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._entries: Dict[SessionKey, _PoolEntry] = {}
+        self._proxies: Optional[Dict[str, str]] = None
+
+    def configure(self, pool_size: Optional[int] = None, idle_timeout: Optional[float] = None) -> None:
+        """
+        Update the pool settings
+
+        Changing the pool size drops all existing sessions so that new ones
+        are created with the new adapter settings.
+        """
+        with self._lock:
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+
+            if pool_size is not None and pool_size != self.pool_size:
+                self.pool_size = pool_size
+                self._close_all()
+
+    def get(self, api_root: str, token: Optional[str], verify: bool = True, is_cli: bool = False) -> requests.Session:
+        """
+        Return the shared session for the given settings, creating it if needed
+        """
+        key: SessionKey = (api_root, token, verify, is_cli)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _PoolEntry(session=self._make_session(token, verify, is_cli), last_used=now)
+                self._entries[key] = entry
+
+            entry.last_used = now
+            return entry.session
+
+    def evict_idle(self) -> int:
+        """
+        Close sessions that have been idle for longer than idle_timeout
+        """
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def clear(self) -> None:
+        """
+        Close and forget every pooled session
+        """
+        with self._lock:
+            self._close_all()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _make_session(self, token: Optional[str], verify: bool, is_cli: bool) -> requests.Session:
+        session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        session.headers.update(get_ua(is_cli))
+
+        # looking up proxies is surprisingly expensive, only do it once
+        if self._proxies is None:
+            self._proxies = urllib.request.getproxies()
+        session.proxies = dict(self._proxies)
+
+        if not verify:
+            # supress ssl warnings
+            session.verify = False
+            import urllib3
+
+            urllib3.disable_warnings()
+
+        if token:
+            session.headers["Authorization"] = f"Bearer {token}"
+
+        return session
+
+    def _evict_idle(self, now: float) -> int:
+        stale = [k for k, e in self._entries.items() if now - e.last_used > self.idle_timeout]
+        for k in stale:
+            # objects still holding on to the session can keep using it, the
+            # connections will simply be re-established on the next request
+            self._entries.pop(k).session.close()
+
+        return len(stale)
+
+    def _close_all(self) -> None:
+        for entry in self._entries.values():
+            entry.session.close()
+        self._entries = {}
+
+
+_pool = SessionPool()
+
+
+def get_session(api_root: str, token: Optional[str], verify: bool = True, is_cli: bool = False) -> requests.Session:
+    return _pool.get(api_root, token, verify=verify, is_cli=is_cli)
+
+
+def configure_pool(pool_size: Optional[int] = None, idle_timeout: Optional[float] = None) -> None:
+    _pool.configure(pool_size=pool_size, idle_timeout=idle_timeout)
+
+
+def configure_pool_from_config(config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> None:
+    """
+    Apply pool_size and pool_idle_timeout of the profile or kwargs, the pool
+    is shared by the whole process so the last setting applied wins
+    """
+    pool_size: Optional[int] = None
+    idle_timeout: Optional[float] = None
+    for source in (config, kwargs):
+        if source.get("pool_size") is not None:
+            pool_size = int(source["pool_size"])
+        if source.get("pool_idle_timeout") is not None:
+            idle_timeout = float(source["pool_idle_timeout"])
+
+    configure_pool(pool_size=pool_size, idle_timeout=idle_timeout)
+
+
+def clear_pool() -> None:
+    _pool.clear()
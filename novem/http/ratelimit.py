@@ -0,0 +1,225 @@
+"""
+Client side rate limiting
+
+A token bucket limits the number of requests per second and a set of slots
+limits the number of requests in flight. Limiters are shared per api_root
+between all threads in the process, and can optionally be coordinated between
+processes on the same machine through lock files in the novem config folder.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, Mapping, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # no cross process coordination on windows, we fall back to in memory
+    fcntl = None  # type: ignore
+
+from ..utils import get_config_path
+
+# how long to wait between polls for a free cross process slot
+SLOT_POLL_INTERVAL = 0.01
+
+
+class RateLimiter:
+    """
+    Token bucket with an optional bound on concurrent requests
+
+    * rate: sustained requests per second, None for unlimited
+    * burst: bucket size, defaults to one second worth of requests
+    * max_in_flight: maximum concurrent requests, None for unlimited
+    * lock_path: path prefix for lock files, enables cross process limiting
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        lock_path: Optional[str] = None,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self.max_in_flight = max_in_flight
+        self.lock_path = lock_path if fcntl is not None else None
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        if max_in_flight:
+            self._slots = threading.BoundedSemaphore(max_in_flight)
+
+        if self.lock_path:
+            os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Wait for a free slot and a token, hold the slot for the duration
+        of the block
+        """
+        if self._slots:
+            self._slots.acquire()
+
+        fh = None
+        try:
+            if self.max_in_flight and self.lock_path:
+                fh = self._acquire_shared_slot()
+
+            self.wait()
+            yield
+        finally:
+            if fh:
+                fh.close()  # also releases the lock
+            if self._slots:
+                self._slots.release()
+
+    def wait(self) -> None:
+        """
+        Block until a token is available and take it
+        """
+        if not self.rate:
+            return
+
+        while True:
+            if self.lock_path:
+                delay = self._take_shared()
+            else:
+                delay = self._take_local()
+
+            if delay <= 0:
+                return
+
+            time.sleep(delay)
+
+    def _take_local(self) -> float:
+        assert self.rate
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+
+            return (1 - self._tokens) / self.rate
+
+    def _take_shared(self) -> float:
+        # the bucket state lives in a small file guarded by flock, we use
+        # wall clock time as monotonic clocks are not comparable between
+        # processes
+        assert self.rate and self.lock_path
+        with self._lock, open(f"{self.lock_path}.bucket", "a+b") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+
+            fh.seek(0)
+            raw = fh.read()
+            now = time.time()
+            if len(raw) == 16:
+                tokens, updated = struct.unpack("dd", raw)
+            else:
+                tokens, updated = self.burst, now
+
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+
+            delay = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                delay = (1 - tokens) / self.rate
+
+            fh.seek(0)
+            fh.truncate()
+            fh.write(struct.pack("dd", tokens, now))
+            fh.flush()
+
+            return delay
+
+    def _acquire_shared_slot(self) -> IO[Any]:
+        assert self.max_in_flight and self.lock_path
+        while True:
+            for i in range(self.max_in_flight):
+                fh = open(f"{self.lock_path}.slot{i}", "a+b")
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fh
+                except OSError:
+                    fh.close()
+
+            time.sleep(SLOT_POLL_INTERVAL)
+
+
+LimiterKey = Tuple[str, Optional[float], Optional[float], Optional[int], bool]
+
+_limiters: Dict[LimiterKey, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(
+    api_root: str,
+    rate: Optional[float] = None,
+    burst: Optional[float] = None,
+    max_in_flight: Optional[int] = None,
+    shared: bool = False,
+) -> Optional[RateLimiter]:
+    """
+    Return the process wide limiter for api_root, None if unlimited
+    """
+    if not rate and not max_in_flight:
+        return None
+
+    key: LimiterKey = (api_root, rate, burst, max_in_flight, shared)
+
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            lock_path = None
+            if shared:
+                novem_dir, _ = get_config_path()
+                name = hashlib.sha1(api_root.encode("utf-8")).hexdigest()[:16]
+                lock_path = os.path.join(novem_dir, "locks", name)
+
+            limiter = RateLimiter(rate=rate, burst=burst, max_in_flight=max_in_flight, lock_path=lock_path)
+            _limiters[key] = limiter
+
+        return limiter
+
+
+def limiter_from_config(api_root: str, config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> Optional[RateLimiter]:
+    """
+    Resolve the limiter for an object, kwargs take precedence over the
+    profile config
+    """
+    if isinstance(kwargs.get("rate_limiter"), RateLimiter):
+        return kwargs["rate_limiter"]
+
+    opts: Dict[str, Any] = {}
+    for source in (config, kwargs):
+        for k in ["rate_limit", "rate_burst", "max_in_flight", "rate_limit_shared"]:
+            if source.get(k) is not None:
+                opts[k] = source[k]
+
+    def as_bool(v: Any) -> bool:
+        if isinstance(v, str):
+            return v.lower() in ["1", "yes", "true", "on"]
+        return bool(v)
+
+    def opt(k: str, conv: Any) -> Any:
+        return conv(opts[k]) if k in opts else None
+
+    return get_limiter(
+        api_root,
+        rate=opt("rate_limit", float),
+        burst=opt("rate_burst", float),
+        max_in_flight=opt("max_in_flight", int),
+        shared=as_bool(opts.get("rate_limit_shared", False)),
+    )
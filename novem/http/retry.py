@@ -0,0 +1,189 @@
+"""
+Retry policy for novem api calls
+
+Failed requests are retried with exponential backoff and jitter, honoring any
+Retry-After header sent by the server. Only idempotent methods are retried on
+server errors and connection failures, but any method is retried on a 429 as
+the server rejected the request without acting on it. Requests that are
+idempotent despite their method, like the POSTs writing a whole value to an
+object path, are marked as such and retried regardless of the method.
+"""
+
+import email.utils
+import random
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, FrozenSet, Mapping, Optional, Tuple, Type, TypeVar
+
+import requests
+
+from .timeout import Deadline
+
+DEFAULT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+DEFAULT_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# statuses where the server guarantees that the request was not processed
+UNPROCESSED_STATUSES = frozenset({429})
+
+R = TypeVar("R")
+
+
+def _parse_methods(value: Any) -> FrozenSet[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return frozenset(x.strip().upper() for x in value if x.strip())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Describes how and when a request should be retried
+
+    * retries: maximum number of retries, 0 disables retrying
+    * backoff: base delay in seconds, doubled for every attempt
+    * backoff_max: upper bound for a single delay
+    * jitter: random fraction of the delay added to spread out clients
+    * max_time: cap on the total time spent on one request including retries
+    * methods: methods considered idempotent and safe to retry
+    * statuses: response statuses that warrant a retry
+    * respect_retry_after: use the servers Retry-After header when present
+    """
+
+    retries: int = 3
+    backoff: float = 0.5
+    backoff_max: float = 30.0
+    jitter: float = 0.5
+    max_time: float = 60.0
+    methods: FrozenSet[str] = field(default=DEFAULT_METHODS)
+    statuses: FrozenSet[int] = field(default=DEFAULT_STATUSES)
+    respect_retry_after: bool = True
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> "RetryPolicy":
+        """
+        Construct a policy from the profile config, object kwargs take
+        precedence over the config file
+        """
+
+        if isinstance(kwargs.get("retry"), RetryPolicy):
+            return kwargs["retry"]
+
+        policy = cls()
+        for source in (config, kwargs):
+            if source.get("retries") is not None:
+                policy = replace(policy, retries=int(source["retries"]))
+            if source.get("retry_backoff") is not None:
+                policy = replace(policy, backoff=float(source["retry_backoff"]))
+            if source.get("retry_max_time") is not None:
+                policy = replace(policy, max_time=float(source["retry_max_time"]))
+            if source.get("retry_methods") is not None:
+                policy = replace(policy, methods=_parse_methods(source["retry_methods"]))
+
+        return policy
+
+    def is_retryable(self, method: str, status: int, idempotent: bool = False) -> bool:
+        if status not in self.statuses:
+            return False
+
+        return status in UNPROCESSED_STATUSES or idempotent or method.upper() in self.methods
+
+    def delay(self, attempt: int, response: Any = None) -> float:
+        """
+        Seconds to wait before the given (zero indexed) retry attempt
+        """
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+
+        delay = min(self.backoff_max, self.backoff * (2**attempt))
+        return delay + random.uniform(0, delay * self.jitter)
+
+    def next_delay(
+        self,
+        method: str,
+        attempt: int,
+        start: float,
+        deadline: Optional[Deadline],
+        response: Any = None,
+        idempotent: bool = False,
+    ) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None if we should give up. The
+        response is None if the attempt failed with a connection error.
+        """
+        if attempt >= self.retries:
+            return None
+
+        if response is None:
+            if not idempotent and method.upper() not in self.methods:
+                return None
+        elif not self.is_retryable(method, response.status_code, idempotent):
+            return None
+
+        delay = self.delay(attempt, response)
+
+        if deadline is not None and delay >= deadline.remaining():
+            return None
+
+        if time.monotonic() - start + delay > self.max_time:
+            return None
+
+        return delay
+
+    def execute(
+        self,
+        method: str,
+        send: Callable[[], R],
+        sleep: Callable[[float], None] = time.sleep,
+        deadline: Optional[Deadline] = None,
+        errors: Tuple[Type[Exception], ...] = (requests.ConnectionError,),
+        idempotent: bool = False,
+    ) -> R:
+        """
+        Invoke send until it succeeds, the policy is exhausted or the time
+        budget is spent. The last response is returned, and the last
+        connection error is raised if we never got a response.
+
+        idempotent: the request can be repeated whatever its method
+        """
+        start = time.monotonic()
+        attempt = 0
+
+        while True:
+            try:
+                r = send()
+            except errors:
+                delay = self.next_delay(method, attempt, start, deadline, idempotent=idempotent)
+                if delay is None:
+                    raise
+            else:
+                delay = self.next_delay(method, attempt, start, deadline, r, idempotent)
+                if delay is None:
+                    return r
+
+            sleep(delay)
+            attempt += 1
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After is either a number of seconds or a http date
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, when.timestamp() - time.time())
+
+
+NO_RETRY = RetryPolicy(retries=0)
@@ -0,0 +1,118 @@
+"""
+Request coalescing
+
+When several threads issue the same GET at the same time, only the first one
+goes to the network and the others wait for and share its response. The
+asyncio api runs its requests in worker threads, so concurrent tasks are
+coalesced the same way. Groups are shared per api_root and token, and count how many calls
+were served this way:
+
+    get_group(api_root, token).stats.deduplicated
+
+Coalescing is on by default, set coalesce = false in the profile or pass
+coalesce=False to an object to disable it.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple, TypeVar
+
+from .middleware import Handler, Request
+from .transport import Response
+
+R = TypeVar("R")
+
+
+@dataclass
+class FlightStats:
+    calls: int = 0
+    deduplicated: int = 0
+
+
+class _Call(object):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Singleflight(object):
+    """
+    Run at most one call per key at a time, concurrent callers with the same
+    key get the result of the call in flight
+    """
+
+    def __init__(self) -> None:
+        self.stats = FlightStats()
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], R]) -> R:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.stats.calls += 1
+            else:
+                self.stats.deduplicated += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore
+
+        try:
+            call.result = fn()
+            return call.result  # type: ignore
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def flight_key(request: Request) -> Hashable:
+    headers = tuple(sorted((k.lower(), v) for k, v in request.headers.items()))
+    return (request.url, headers)
+
+
+class SingleflightMiddleware(object):
+    """
+    Coalesce identical concurrent GET requests
+    """
+
+    def __init__(self, group: Singleflight) -> None:
+        self.group = group
+
+    def __call__(self, request: Request, call_next: Handler) -> Response:
+        if request.method != "GET":
+            return call_next(request)
+
+        return self.group.do(flight_key(request), lambda: call_next(request))
+
+
+_groups: Dict[Tuple[str, str], Singleflight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(api_root: str, token: Optional[str]) -> Singleflight:
+    # never share responses between tokens
+    key = (api_root, hashlib.sha1((token or "").encode("utf-8")).hexdigest())
+
+    with _groups_lock:
+        if key not in _groups:
+            _groups[key] = Singleflight()
+        return _groups[key]
+
+
+def coalesce_enabled(config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> bool:
+    enabled = True
+    for source in (config, kwargs):
+        if source.get("coalesce") is not None:
+            enabled = bool(source["coalesce"])
+    return enabled
@@ -0,0 +1,141 @@
+"""
+Request timeouts and operation deadlines
+
+Every request gets a connect and a read timeout, configurable per profile,
+per object and per call. On top of that a Deadline can be used to put a time
+budget on a whole operation, e.g. Plot.run() or Mail.send(); all requests made
+while the deadline is active have their timeouts clamped to the remaining
+budget and fail fast once it is spent.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Mapping, Optional, Tuple, Union
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+
+
+class Deadline:
+    """
+    A point in time by which an operation has to complete
+
+    Can be passed explicitly or activated for a block of code:
+
+        with Deadline(30):
+            plot.run()
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self._tokens: List[Token[Optional["Deadline"]]] = []
+
+    @classmethod
+    def ensure(cls, value: Union["Deadline", float, None]) -> Optional["Deadline"]:
+        """
+        Accept a deadline, a number of seconds or None
+        """
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(float(value))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def __enter__(self) -> "Deadline":
+        # nested deadlines can only ever shorten the budget
+        outer = current_deadline()
+        active = self if outer is None or outer.expires > self.expires else outer
+        self._tokens.append(_deadline.set(active))
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        _deadline.reset(self._tokens.pop())
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f})"
+
+
+_deadline: ContextVar[Optional[Deadline]] = ContextVar("novem_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+@contextmanager
+def within(deadline: Union[Deadline, float, None]) -> Iterator[Optional[Deadline]]:
+    """
+    Activate the deadline (or number of seconds) for the block, a no-op if
+    None is supplied
+    """
+    d = Deadline.ensure(deadline)
+    if d is None:
+        yield None
+        return
+
+    with d:
+        yield d
+
+
+TimeoutArg = Union["Timeout", float, Tuple[Optional[float], Optional[float]], None]
+
+
+@dataclass(frozen=True)
+class Timeout:
+    """
+    Connect and read timeouts in seconds, None disables the timeout
+    """
+
+    connect: Optional[float] = DEFAULT_CONNECT_TIMEOUT
+    read: Optional[float] = DEFAULT_READ_TIMEOUT
+
+    @classmethod
+    def parse(cls, value: TimeoutArg, base: Optional["Timeout"] = None) -> "Timeout":
+        """
+        Accept a Timeout, a single number for both or a (connect, read) tuple
+        """
+        if value is None:
+            return base or cls()
+        if isinstance(value, Timeout):
+            return value
+        if isinstance(value, tuple):
+            return cls(connect=value[0], read=value[1])
+        return cls(connect=float(value), read=float(value))
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> "Timeout":
+        """
+        Profile config first, then object kwargs
+        """
+        timeout = cls()
+        for source in (config, kwargs):
+            if source.get("timeout") is not None:
+                timeout = cls.parse(source["timeout"])
+            if source.get("connect_timeout") is not None:
+                timeout = cls(connect=float(source["connect_timeout"]), read=timeout.read)
+            if source.get("read_timeout") is not None:
+                timeout = cls(connect=timeout.connect, read=float(source["read_timeout"]))
+
+        return timeout
+
+    def clamp(self, deadline: Optional[Deadline]) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Return a requests compatible timeout tuple limited by the deadline
+        """
+        if deadline is None:
+            return (self.connect, self.read)
+
+        remaining = deadline.remaining()
+
+        def lim(v: Optional[float]) -> float:
+            return remaining if v is None else min(v, remaining)
+
+        return (lim(self.connect), lim(self.read))
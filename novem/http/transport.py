@@ -0,0 +1,418 @@
+"""
+Pluggable transports
+
+All requests made by NovemAPI go through a Transport. Three backends are
+available:
+
+* RequestsTransport: the default, a pooled requests.Session
+* HTTP2Transport: httpx with HTTP/2, multiplexing many small requests over a
+  single connection (requires 'pip install httpx[http2]')
+* WSGITransport/ASGITransport: dispatch requests straight into a local
+  WSGI/ASGI application without touching the network, useful for testing
+  and for measuring client overhead in isolation
+
+Transports return responses with the subset of the requests.Response
+interface used by the library (status_code, ok, headers, content, text,
+json()), and raise requests exceptions for connection errors and timeouts.
+"""
+
+import asyncio
+import concurrent.futures
+import io
+import json as jsonlib
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .pool import get_session, get_ua
+
+# Import httpx for type checking, not runtime
+if TYPE_CHECKING:
+    import httpx
+else:
+    try:
+        import httpx
+    except ImportError:
+        httpx = None  # type: ignore
+
+Headers = Mapping[str, Optional[str]]
+
+
+class TransportResponse(object):
+    """
+    Minimal stand in for requests.Response returned by non requests transports
+    """
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes, url: str = "") -> None:
+        self.status_code = status_code
+        self.headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(headers)
+        self.content = content
+        self.url = url
+        self.elapsed = timedelta(0)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"<Response [{self.status_code}]>"
+
+
+Response = Union[requests.Response, TransportResponse]
+
+
+def _prepare_body(data: Any, json: Any, headers: Dict[str, str]) -> bytes:
+    if json is not None:
+        headers.setdefault("Content-Type", "application/json")
+        return jsonlib.dumps(json).encode("utf-8")
+    if data is None:
+        return b""
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if isinstance(data, bytes):
+        return data
+    # iterables of chunks
+    return b"".join(data)
+
+
+def _clean_headers(headers: Optional[Headers]) -> Dict[str, str]:
+    # a None value means "drop this header", like in requests
+    return {k: v for k, v in (headers or {}).items() if v is not None}
+
+
+def httpx_request(
+    client: Union["httpx.Client", "httpx.AsyncClient"],
+    method: str,
+    url: str,
+    headers: Optional[Headers],
+    data: Any,
+    json: Any,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]],
+) -> "httpx.Request":
+    """
+    Build an httpx request from the arguments of Transport.request
+    """
+    hdrs = _clean_headers(headers)
+    dropped = [k for k, v in (headers or {}).items() if v is None]
+
+    body = _prepare_body(data, json, hdrs)
+
+    tmo = httpx.Timeout(None)
+    if timeout is not None:
+        connect, read = timeout
+        tmo = httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+
+    req = client.build_request(method, url, headers=hdrs, content=body or None, timeout=tmo)
+    for k in dropped:
+        req.headers.pop(k, None)
+
+    return req
+
+
+@contextmanager
+def httpx_errors() -> Iterator[None]:
+    """
+    Raise httpx errors as the requests exceptions the library handles
+    """
+    try:
+        yield
+    except httpx.ConnectTimeout as e:
+        raise requests.ConnectTimeout(str(e)) from e
+    except httpx.TimeoutException as e:
+        raise requests.ReadTimeout(str(e)) from e
+    except httpx.TransportError as e:
+        raise requests.ConnectionError(str(e)) from e
+
+
+def from_httpx(r: "httpx.Response", url: str, start: float) -> TransportResponse:
+    res = TransportResponse(r.status_code, r.headers, r.content, url=url)
+    res.elapsed = timedelta(seconds=time.monotonic() - start)
+    return res
+
+
+class Transport(ABC):
+    """
+    Base transport, subclasses implement request
+    """
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Headers] = None,
+        data: Any = None,
+        json: Any = None,
+        timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    ) -> Response: ...
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    def __init__(self, session: requests.Session) -> None:
+        self.session = session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Headers] = None,
+        data: Any = None,
+        json: Any = None,
+        timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    ) -> Response:
+        return self.session.request(method, url, headers=headers, data=data, json=json, timeout=timeout)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """
+    HTTP/2 transport built on httpx, all requests to a host are multiplexed
+    over a single connection
+    """
+
+    def __init__(
+        self,
+        headers: Optional[Headers] = None,
+        verify: bool = True,
+        client: Optional["httpx.Client"] = None,
+    ) -> None:
+        if httpx is None:
+            raise ImportError("httpx is required for http2. Please install it using 'pip install httpx[http2]'.")
+
+        self.client = client or httpx.Client(http2=True, headers=_clean_headers(headers), verify=verify)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Headers] = None,
+        data: Any = None,
+        json: Any = None,
+        timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    ) -> Response:
+        req = httpx_request(self.client, method, url, headers, data, json, timeout)
+
+        start = time.monotonic()
+        with httpx_errors():
+            r = self.client.send(req)
+
+        return from_httpx(r, url, start)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+WSGIApp = Callable[[Dict[str, Any], Callable[..., Any]], Iterable[bytes]]
+
+
+class WSGITransport(Transport):
+    """
+    Dispatch requests directly into a WSGI application
+    """
+
+    def __init__(self, app: WSGIApp) -> None:
+        self.app = app
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Headers] = None,
+        data: Any = None,
+        json: Any = None,
+        timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    ) -> Response:
+        hdrs = _clean_headers(headers)
+        body = _prepare_body(data, json, hdrs)
+        parts = urlsplit(url)
+
+        environ: Dict[str, Any] = {
+            "REQUEST_METHOD": method.upper(),
+            "SCRIPT_NAME": "",
+            "PATH_INFO": unquote(parts.path),
+            "QUERY_STRING": parts.query,
+            "SERVER_NAME": parts.hostname or "localhost",
+            "SERVER_PORT": str(parts.port or (443 if parts.scheme == "https" else 80)),
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": parts.scheme or "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+
+        for k, v in hdrs.items():
+            key = k.upper().replace("-", "_")
+            if key == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = v
+            elif key != "CONTENT_LENGTH":
+                environ[f"HTTP_{key}"] = v
+
+        status: List[str] = []
+        response_headers: List[Tuple[str, str]] = []
+
+        def start_response(st: str, hd: List[Tuple[str, str]], exc_info: Any = None) -> Callable[[bytes], None]:
+            status[:] = [st]
+            response_headers[:] = hd
+            return lambda _: None
+
+        result = self.app(environ, start_response)
+        try:
+            content = b"".join(result)
+        finally:
+            close = getattr(result, "close", None)
+            if close:
+                close()
+
+        return TransportResponse(int(status[0].split(" ")[0]), dict(response_headers), content, url=url)
+
+
+class ASGITransport(Transport):
+    """
+    Dispatch requests directly into an ASGI application
+
+    The application runs on a private event loop in a background thread, so
+    state kept by the app persists between requests and the transport can be
+    used from synchronous code regardless of any running loop.
+    """
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self.app = app
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Headers] = None,
+        data: Any = None,
+        json: Any = None,
+        timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    ) -> Response:
+        hdrs = _clean_headers(headers)
+        body = _prepare_body(data, json, hdrs)
+
+        fut = asyncio.run_coroutine_threadsafe(self._call(method, url, hdrs, body), self._get_loop())
+        try:
+            return fut.result(timeout[1] if timeout else None)
+        except concurrent.futures.TimeoutError:
+            # raise what requests would so timeouts are handled the same way
+            fut.cancel()
+            raise requests.ReadTimeout(f"{method} {url} timed out")
+
+    async def _call(self, method: str, url: str, headers: Dict[str, str], body: bytes) -> Response:
+        parts = urlsplit(url)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": parts.scheme or "http",
+            "path": unquote(parts.path),
+            "raw_path": parts.path.encode("latin-1"),
+            "query_string": parts.query.encode("latin-1"),
+            "root_path": "",
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+            "server": (parts.hostname or "localhost", parts.port or 80),
+            "client": ("127.0.0.1", 0),
+        }
+
+        received = False
+        status = 500
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal received
+            if received:
+                return {"type": "http.disconnect"}
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for k, v in message.get("headers", []):
+                    response_headers[k.decode("latin-1")] = v.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+
+        return TransportResponse(status, response_headers, b"".join(chunks), url=url)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+
+# http2 transports are shared like sessions, keyed by
+# (api_root, token, verify, is_cli)
+_http2: Dict[Tuple[str, Optional[str], bool, bool], HTTP2Transport] = {}
+_http2_lock = threading.Lock()
+
+
+def get_transport(
+    kind: Union[str, Transport, None],
+    api_root: str,
+    token: Optional[str],
+    verify: bool = True,
+    is_cli: bool = False,
+) -> Transport:
+    """
+    Resolve a transport instance from a name ("requests" or "http2") or
+    return the supplied transport as is
+    """
+    if isinstance(kind, Transport):
+        return kind
+
+    if kind in [None, "", "requests", "http1"]:
+        return RequestsTransport(get_session(api_root, token, verify=verify, is_cli=is_cli))
+
+    if kind in ["http2", "h2"]:
+        key = (api_root, token, verify, is_cli)
+        with _http2_lock:
+            if key not in _http2:
+                headers: Dict[str, Optional[str]] = {**get_ua(is_cli)}
+                if token:
+                    headers["Authorization"] = f"Bearer {token}"
+                _http2[key] = HTTP2Transport(headers=headers, verify=verify)
+            return _http2[key]
+
+    raise ValueError(f"Unknown transport: {kind}")
@@ -1,8 +1,6 @@
 from typing import Any, Optional
 
-from novem.exceptions import Novem403, Novem404
-
-from ..api_ref import NovemAPI
+from ..api_ref import NovemResourceAPI
 from ..shared import NovemShare
 from .config import NovemRepoConfig
 
@@ -11,23 +9,14 @@ from .config import NovemRepoConfig
 """
 
 
-class NovemRepoAPI(NovemAPI):
+class NovemRepoAPI(NovemResourceAPI):
     config: Optional[NovemRepoConfig]
     shared: Optional[NovemShare]
     id: str
 
-    _debug: bool = False
-
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
 
-        if "debug" in kwargs and kwargs["debug"]:
-            self._debug = True
-
-        if "create" not in kwargs or kwargs["create"]:
-            # create when used as an api unless specifically told not to
-            self.api_create("")
-
         self.config = NovemRepoConfig(self)
         self.shared = NovemShare(self, f"repos/{self.id}")
 
@@ -66,133 +55,8 @@ class NovemRepoAPI(NovemAPI):
         else:
             super().__setattr__(name, value)
 
-    def api_read(self, relpath: str) -> str:
-        """
-        Read the api value located at realtive path
-        """
-
-        qpath = f"{self._api_root}repos/{self.id}{relpath}"
-
-        if self._debug:
-            print(f"GET: {qpath}")
-
-        r = self._session.get(qpath)
-
-        # verify result and raise exception if not ok
-        if r.status_code == 404:
-            raise Novem404(qpath)
-
-        if r.status_code == 403:
-            raise Novem403
-
-        return r.content.decode("utf-8")
-
-    def api_delete(self, relpath: str) -> None:
-        """
-        relpath: relative path to the plot baseline /config/type
-                 for the type file in the config folder
-        value: the value to write to the file
-        """
-
-        path = f"{self._api_root}repos/{self.id}{relpath}"
-
-        if self._debug:
-            print(f"DELETE: {path}")
-
-        r = self._session.delete(path)
-
-        if r.status_code == 404:
-            raise Novem404(path)
-
-        if r.status_code == 403:
-            raise Novem403
-
-        # TODO: verify result and raise exception if not ok
-        if not r.ok:
-            print(r)
-            print(f"DELETE: {path}")
-            print("body")
-            print("---")
-            print(r.text)
-            print("headers")
-            print("---")
-            print(r.headers)
-            print("should raise an error")
-
-    def api_create(self, relpath: str) -> None:
-        """
-        relpath: relative path to the plot baseline /config/type
-                 for the type file in the config folder
-        value: the value to write to the file
-        """
-
-        path = f"{self._api_root}repos/{self.id}{relpath}"
-
-        if self._debug:
-            print(f"PUT: {path}")
-
-        r = self._session.put(path)
-
-        if r.status_code == 404:
-            raise Novem404(path)
-
-        if r.status_code == 403:
-            raise Novem403(path)
-
-        if r.status_code == 409:
-            # we will ignore 409 errors
-            # as creating objects that already exist is not a problem
-            return
-
-        # TODO: verify result and raise exception if not ok
-        if not r.ok:
-            print(r)
-            print(f"PUT: {path}")
-            print("body")
-            print("---")
-            print(r.text)
-            print("headers")
-            print("---")
-            print(r.headers)
-            print("should raise a general error")
-
-    def api_write(self, relpath: str, value: str) -> None:
-        """
-        relpath: relative path to the plot baseline /config/type
-                 for the type file in the config folder
-        value: the value to write to the file
-        """
-
-        path = f"{self._api_root}repos/{self.id}{relpath}"
-
-        if self._debug:
-            print(f"POST: {path}")
-
-        r = self._session.post(
-            path,
-            headers={"Content-type": "text/plain"},
-            data=value.encode("utf-8"),
-        )
-
-        if r.status_code == 404:
-            raise Novem404(path)
-
-        if r.status_code == 403:
-            raise Novem403
-
-        # TODO: verify result and raise exception if not ok
-        if not r.ok:
-            print(r)
-            print(f"POST: {path} {value}")
-            print("body")
-            print("---")
-            print(r.text)
-            print(r.status_code)
-            print("headers")
-            print("---")
-            for k, v in r.headers.items():
-                print(f"   {k}: {v}")
-            print("should raise a general error")
+    def _path(self, relpath: str) -> str:
+        return f"{self._api_root}repos/{self.id}{relpath}"
 
     # chainable utility function for setting values
     def w(self, key: str, value: str) -> Any:
@@ -221,7 +85,7 @@ class NovemRepoAPI(NovemAPI):
 
         So input of "tag:v0.0.2" give "@user/repo:tag:v0.0.2"
         """
-        user = self.read("whoami")
+        user = self._whoami()
 
         return f"/{user}/{self.id}:{ref}"
 
@@ -269,11 +133,11 @@ class NovemRepoAPI(NovemAPI):
 
     @property
     def url(self) -> str:
-        return self.api_read("/url").strip()
+        return self._read_fixed("/url").strip()
 
     @property
     def shortname(self) -> str:
-        return self.api_read("/shortname").strip()
+        return self._read_fixed("/shortname").strip()
 
 
 class Repo(NovemRepoAPI):
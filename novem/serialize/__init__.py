@@ -0,0 +1,4 @@
+from .csv import to_csv_bytes
+from .registry import Serializer, get_serializer, register, serialize_csv, unregister
+
+__all__ = ["to_csv_bytes", "serialize_csv", "Serializer", "register", "unregister", "get_serializer"]
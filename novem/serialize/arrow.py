@@ -0,0 +1,186 @@
+"""
+Binary data uploads
+
+CSV is the format every server understands, but when pyarrow is installed
+plot data can be sent as Arrow IPC or Parquet instead, which is several
+times smaller and much cheaper to produce and parse. The formats a server
+accepts are discovered once per api_root, from the Accept-Post header of
+an OPTIONS request to a /data endpoint. A server that answers a binary
+upload with 415 Unsupported Media Type gets CSV from then on.
+
+The format can also be fixed per profile:
+
+    [profile:default]
+    data_format = csv   # auto (default), csv, arrow or parquet
+
+pyarrow Tables are accepted as plot data directly, without going through
+pandas, and are written as CSV by pyarrow if the server wants CSV.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Mapping, Optional, Set
+
+try:
+    import pyarrow as pa  # type: ignore
+except ImportError:
+    pa = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None  # type: ignore
+
+ARROW = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+# data_format settings to media type, in order of preference
+FORMATS = {"arrow": ARROW, "parquet": PARQUET}
+
+# media types accepted per api_root
+_accepted: Dict[str, FrozenSet[str]] = {}
+_accepted_lock = threading.Lock()
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def reset_negotiation(api_root: Optional[str] = None) -> None:
+    """
+    Forget which formats servers accept, for all or one api_root
+    """
+    with _accepted_lock:
+        if api_root is None:
+            _accepted.clear()
+        else:
+            _accepted.pop(api_root, None)
+
+
+def parse_accept_post(header: Optional[str]) -> Set[str]:
+    if not header:
+        return set()
+    return {x.split(";")[0].strip().lower() for x in header.split(",") if x.strip()}
+
+
+def accepted_formats(api_root: str, probe: Callable[[], Optional[str]]) -> FrozenSet[str]:
+    """
+    The media types the server at api_root accepts for plot data, probe
+    returns the Accept-Post header ("" if there is none) or None if the
+    server gave no real answer, only real answers are remembered
+    """
+    with _accepted_lock:
+        if api_root in _accepted:
+            return _accepted[api_root]
+
+    header = probe()
+    accepted = frozenset(parse_accept_post(header))
+    if header is None:
+        # ask again on the next write
+        return accepted
+    with _accepted_lock:
+        return _accepted.setdefault(api_root, accepted)
+
+
+def reject_format(api_root: str, media_type: str) -> None:
+    """
+    Remember that the server at api_root refused data as media_type
+    """
+    with _accepted_lock:
+        _accepted[api_root] = _accepted.get(api_root, frozenset()) - {media_type}
+
+
+def data_format_from_config(config: Mapping[str, Any], kwargs: Mapping[str, Any]) -> str:
+    fmt = "auto"
+    for source in (config, kwargs):
+        if source.get("data_format"):
+            fmt = str(source["data_format"]).lower()
+
+    if fmt not in ("auto", "csv", *FORMATS):
+        raise ValueError(f"Unsupported data format: {fmt}, expected auto, csv, {', '.join(FORMATS)}")
+
+    return fmt
+
+
+def choose_format(fmt: str, probe: Callable[[], FrozenSet[str]]) -> Optional[str]:
+    """
+    The media type to send data as given the data_format setting, None for
+    CSV. probe is only called if the server has to be asked
+    """
+    if fmt == "csv" or not available():
+        return None
+
+    if fmt in FORMATS:
+        return FORMATS[fmt]
+
+    accepted = probe()
+    for media_type in FORMATS.values():
+        if media_type in accepted:
+            return media_type
+
+    return None
+
+
+def is_table(data: Any) -> bool:
+    return pa is not None and isinstance(data, pa.Table)
+
+
+def to_table(data: Any) -> Any:
+    """
+    data as an Arrow Table, None if it can't be converted
+    """
+    if pa is None:
+        return None
+
+    if isinstance(data, pa.Table):
+        return data
+
+    if pd is not None and isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data)
+
+    if type(data).__module__.startswith("polars.") and hasattr(data, "to_arrow"):
+        # zero copy for polars frames
+        return data.to_arrow()
+
+    return None
+
+
+def encode_table(table: Any, media_type: str) -> bytes:
+    sink = pa.BufferOutputStream()
+
+    if media_type == ARROW:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif media_type == PARQUET:
+        import pyarrow.parquet as pq  # type: ignore
+
+        pq.write_table(table, sink)
+    else:
+        raise ValueError(f"Unsupported data media type: {media_type}")
+
+    return bytes(sink.getvalue().to_pybytes())
+
+
+def table_to_csv(table: Any, float_precision: Any = None) -> bytes:
+    """
+    CSV bytes of an Arrow table, written by pyarrow unless floats need a
+    fixed precision
+    """
+    if float_precision is not None:
+        from .csv import columns_to_csv
+
+        return columns_to_csv(
+            table.column_names,
+            [
+                (col.to_numpy(), float_precision if isinstance(float_precision, int) else float_precision.get(name))
+                for name, col in zip(table.column_names, table.columns)
+            ],
+        )
+
+    import pyarrow.csv  # type: ignore
+
+    sink = pa.BufferOutputStream()
+    pyarrow.csv.write_csv(table, sink)
+    return bytes(sink.getvalue().to_pybytes())
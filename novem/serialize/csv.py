@@ -0,0 +1,294 @@
+"""
+CSV serialization
+
+Plot data used to be sent as the string returned by DataFrame.to_csv(),
+which was then encoded again before being written. to_csv_bytes produces
+the same text, but formats one column at a time (missing values and
+datetimes are handled on whole numpy arrays) and encodes the rows in
+chunks straight into a bytes buffer, so peak memory stays close to the
+size of the payload.
+
+Floats can be written with a fixed number of decimals, either for every
+column or per column:
+
+    to_csv_bytes(df, float_precision={"price": 2, "ratio": 4})
+
+Frames the fast path doesn't understand (multi level labels, categorical,
+timezone aware or period columns, ...) are serialized by pandas.
+
+numpy arrays and lists of records are written the same way, without
+going through pandas, see novem.serialize.registry.
+"""
+
+import os
+from io import BytesIO
+from itertools import zip_longest
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None  # type: ignore
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None  # type: ignore
+
+# rows encoded at a time, bounds the size of the intermediate strings
+CHUNK_ROWS = 65536
+
+Precision = Union[int, Mapping[Any, int], None]
+
+# datetime resolutions to try, coarsest first, pandas writes the coarsest
+# one that represents every value exactly
+DATETIME_UNITS = ["D", "s", "ms", "us"]
+
+
+# the csv module quotes fields holding the delimiter, the quote character or
+# any character of the line terminator, pandas uses os.linesep for the latter
+QUOTED_CHARS = frozenset(',"' + os.linesep)
+
+
+def _quote(values: List[str]) -> List[str]:
+    """
+    Quote fields the way the csv module does with QUOTE_MINIMAL
+    """
+    return ['"' + v.replace('"', '""') + '"' if not QUOTED_CHARS.isdisjoint(v) else v for v in values]
+
+
+def _label(label: Any) -> str:
+    """
+    A column label as pandas writes it, missing labels are left empty
+    """
+    if pd is not None:
+        missing = pd.api.types.is_scalar(label) and pd.isna(label)
+    else:
+        missing = label is None or (isinstance(label, float) and label != label)
+    return "" if missing else str(label)
+
+
+def _isna(values: "np.ndarray") -> "np.ndarray":
+    if pd is not None:
+        return pd.isna(values)
+    return np.array([v is None or v != v for v in values.tolist()], dtype=bool)
+
+
+def _blank(out: List[str], missing: "np.ndarray") -> List[str]:
+    for i in np.flatnonzero(missing).tolist():
+        out[i] = ""
+    return out
+
+
+def _format_datetime(values: "np.ndarray") -> List[str]:
+    missing = np.isnat(values)
+    present = values[~missing]
+
+    unit = np.datetime_data(values.dtype)[0]
+    for name in DATETIME_UNITS:
+        if (present.astype(f"datetime64[{name}]") == present).all():
+            unit = name
+            break
+
+    out = np.datetime_as_string(values, unit=unit)  # type: ignore
+    if unit != "D":
+        # pandas separates date and time with a space, dates only are
+        # written without a time
+        out = np.char.replace(out, "T", " ")
+
+    return _blank(out.tolist(), missing)
+
+
+def _format(values: "np.ndarray", precision: Optional[int]) -> List[str]:
+    """
+    Format a column as strings
+    """
+    kind = values.dtype.kind
+
+    if kind == "f":
+        if precision is not None:
+            out = list(map(f"%.{precision}f".__mod__, values.tolist()))
+        elif values.dtype == np.float64:
+            # the shortest repr, same as pandas
+            out = list(map(repr, values.tolist()))
+        else:
+            # python floats would show the rounding error of smaller types
+            out = values.astype(str).tolist()
+        return _blank(out, np.isnan(values))
+
+    if kind in "iub":
+        return list(map(str, values.tolist()))
+
+    if kind == "M":
+        return _format_datetime(values)
+
+    return _quote(_blank(list(map(str, values.tolist())), _isna(values)))
+
+
+def _column_values(col: Any) -> Optional["np.ndarray"]:
+    """
+    The numpy values of an index or series, None for types the fast path
+    doesn't handle
+    """
+    dtype = col.dtype
+    if isinstance(dtype, np.dtype):
+        return np.asarray(col) if dtype.kind in "fiubMOU" else None
+
+    # the pandas string dtype, other extension types go through pandas
+    if isinstance(dtype, pd.StringDtype):
+        return np.asarray(col, dtype=object)
+
+    return None
+
+
+def _precision_for(label: Any, float_precision: Precision) -> Optional[int]:
+    if float_precision is None or isinstance(float_precision, int):
+        return float_precision
+    return float_precision.get(label)
+
+
+def _pandas_csv(df: "pd.DataFrame", float_precision: Precision) -> bytes:
+    if isinstance(float_precision, int):
+        return df.to_csv(float_format=f"%.{float_precision}f").encode("utf-8")
+
+    if float_precision:
+        df = df.copy()
+        for label, precision in float_precision.items():
+            if label in df.columns and df[label].dtype.kind == "f":
+                fmt = f"%.{precision}f"
+                df[label] = df[label].map(lambda v: "" if v != v else fmt % v)
+
+    return df.to_csv().encode("utf-8")
+
+
+def to_csv_bytes(df: "pd.DataFrame", float_precision: Precision = None) -> bytes:
+    """
+    Serialize a DataFrame to the bytes of df.to_csv()
+
+    float_precision: number of decimals for float columns, either one for
+                     all columns or a mapping of column label to decimals
+    """
+    if (
+        isinstance(df.index, pd.MultiIndex)
+        or isinstance(df.columns, pd.MultiIndex)
+        or not len(df.columns)
+        or not df.columns.is_unique
+    ):
+        return _pandas_csv(df, float_precision)
+
+    index = _column_values(df.index)
+    if index is None:
+        return _pandas_csv(df, float_precision)
+
+    columns: List[Tuple["np.ndarray", Optional[int]]] = [(index, None)]
+    for i, label in enumerate(df.columns):
+        values = _column_values(df.iloc[:, i])
+        if values is None:
+            return _pandas_csv(df, float_precision)
+        columns.append((values, _precision_for(label, float_precision)))
+
+    labels = ["" if df.index.name is None else str(df.index.name)]
+    labels += [_label(label) for label in df.columns]
+    return columns_to_csv(labels, columns)
+
+
+def columns_to_csv(labels: Sequence[str], columns: Sequence[Tuple["np.ndarray", Optional[int]]]) -> bytes:
+    """
+    CSV bytes of equally long columns, each with its float precision
+    """
+    eol = os.linesep
+    buf = BytesIO()
+    buf.write((",".join(_quote(list(labels))) + eol).encode("utf-8"))
+
+    rows = len(columns[0][0]) if columns else 0
+    for start in range(0, rows, CHUNK_ROWS):
+        fields = [_format(values[start : start + CHUNK_ROWS], precision) for values, precision in columns]
+        lines = list(map(",".join, zip(*fields)))
+        lines.append("")
+        buf.write(eol.join(lines).encode("utf-8"))
+
+    return buf.getvalue()
+
+
+def ndarray_to_csv(
+    arr: "np.ndarray", float_precision: Precision = None, columns: Optional[Sequence[Any]] = None
+) -> bytes:
+    """
+    CSV bytes of a 2-D array, or a structured array, columns labels the
+    columns of a 2-D array, they are numbered otherwise
+    """
+    if arr.dtype.names:
+        labels: List[Any] = list(columns or arr.dtype.names)
+        values = [arr[name] for name in arr.dtype.names]
+    elif arr.ndim in (1, 2):
+        if arr.ndim == 1:
+            arr = arr.reshape(-1, 1)
+        labels = list(columns if columns is not None else range(arr.shape[1]))
+        values = [arr[:, i] for i in range(arr.shape[1])]
+    else:
+        raise ValueError(f"Expected a 1-D or 2-D array, got {arr.ndim} dimensions")
+
+    if len(labels) != len(values):
+        raise ValueError(f"Got {len(labels)} column labels for {len(values)} columns")
+
+    return columns_to_csv(
+        [_label(label) for label in labels],
+        [(v, _precision_for(label, float_precision)) for label, v in zip(labels, values)],
+    )
+
+
+def _cell(value: Any, precision: Optional[int]) -> str:
+    if value is None:
+        return ""
+
+    if isinstance(value, float):
+        if value != value:
+            return ""
+        return repr(value) if precision is None else f"%.{precision}f" % value
+
+    return str(value)
+
+
+def records_to_csv(
+    records: Sequence[Any], float_precision: Precision = None, columns: Optional[Sequence[Any]] = None
+) -> bytes:
+    """
+    CSV bytes of a list of dicts, or of tuples
+
+    Dicts are labelled by their keys, in order of appearance, tuples by
+    columns, the fields of a named tuple or their position
+    """
+    rows: Sequence[Sequence[Any]]
+
+    if all(isinstance(r, Mapping) for r in records):
+        if columns is None:
+            # the keys of all records, in the order we first see them
+            columns = list({k: None for r in records for k in r})
+        rows = [[r.get(k) for k in columns] for r in records]
+    elif all(isinstance(r, (tuple, list)) for r in records):
+        if columns is None:
+            fields = getattr(records[0], "_fields", None) if records else None
+            columns = list(fields or range(max((len(r) for r in records), default=0)))
+        rows = records
+    else:
+        raise TypeError("Expected a list of dicts or a list of tuples")
+
+    precisions = [_precision_for(label, float_precision) for label in columns]
+
+    eol = os.linesep
+    buf = BytesIO()
+    buf.write((",".join(_quote([_label(label) for label in columns])) + eol).encode("utf-8"))
+
+    for start in range(0, len(rows), CHUNK_ROWS):
+        lines = [
+            ",".join(_quote([_cell(v, p) for v, p in zip_longest(row, precisions)]))
+            for row in rows[start : start + CHUNK_ROWS]
+        ]
+        lines.append("")
+        buf.write(eol.join(lines).encode("utf-8"))
+
+    return buf.getvalue()
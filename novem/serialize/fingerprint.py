@@ -0,0 +1,50 @@
+"""
+DataFrame fingerprints
+
+Serializing a large frame costs far more than hashing it, so plots keep a
+fingerprint of the frame behind their last /data write and skip both the
+serialization and the upload when it hasn't changed, see
+novem.http.elision.
+
+The fingerprint covers the values (pandas.util.hash_pandas_object, index
+included), the shape, dtypes, labels and the options the data is
+serialized with.
+"""
+
+import hashlib
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None  # type: ignore
+
+
+def fingerprint(data: Any, *options: Any) -> Optional[str]:
+    """
+    Fingerprint of a DataFrame and the options it is serialized with, None
+    for anything else or frames that can't be hashed
+    """
+    if pd is None or not isinstance(data, pd.DataFrame):
+        return None
+
+    try:
+        values = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    except TypeError:
+        # unhashable cells, e.g. lists or dicts
+        return None
+
+    h = hashlib.blake2b(values.tobytes(), digest_size=16)
+    layout = (
+        data.shape,
+        [str(dtype) for dtype in data.dtypes],
+        list(data.columns),
+        str(data.index.dtype),
+        list(data.index.names),
+        options,
+    )
+    h.update(repr(layout).encode("utf-8"))
+    return h.hexdigest()
@@ -0,0 +1,148 @@
+"""
+Serializer registry
+
+Plot data is turned into CSV by the serializer registered for its type,
+looked up along the type's mro. Built in are pandas DataFrames, numpy
+arrays, lists of dicts or tuples, polars DataFrames and pyarrow Tables,
+none of which go through a pandas conversion. Other types are registered
+with:
+
+    def serialize(data, float_precision=None, columns=None) -> bytes:
+        ...
+
+    novem.serialize.register(MyFrame, serialize)
+
+Serializers are called with the float_precision and columns given to the
+plot, and return the CSV as bytes. Objects without a serializer fall back
+to their to_csv function, or str().
+"""
+
+import sys
+import threading
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .arrow import table_to_csv
+from .csv import Precision, ndarray_to_csv, records_to_csv, to_csv_bytes
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None  # type: ignore
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None  # type: ignore
+
+Serializer = Callable[..., bytes]
+
+_serializers: Dict[type, Serializer] = {}
+_lock = threading.Lock()
+
+
+def _dataframe_to_csv(df: Any, float_precision: Precision = None, columns: Optional[Sequence[Any]] = None) -> bytes:
+    return to_csv_bytes(df, float_precision)
+
+
+def _polars_to_csv(df: Any, float_precision: Precision = None, columns: Optional[Sequence[Any]] = None) -> bytes:
+    import polars as pl  # type: ignore
+
+    if isinstance(float_precision, Mapping):
+        # polars only takes one precision, format the others ourselves
+        df = df.with_columns(
+            pl.col(label).map_elements(lambda v, fmt=f"%.{p}f": fmt % v, return_dtype=pl.String)
+            for label, p in float_precision.items()
+            if label in df.columns and df.schema[label].is_float()
+        )
+        float_precision = None
+
+    buf = BytesIO()
+    df.write_csv(buf, float_precision=float_precision)
+    return buf.getvalue()
+
+
+def _list_to_csv(data: List[Any], float_precision: Precision = None, columns: Optional[Sequence[Any]] = None) -> bytes:
+    if all(isinstance(r, Mapping) for r in data) or all(isinstance(r, (tuple, list)) for r in data):
+        return records_to_csv(data, float_precision, columns)
+
+    # not a table, written like objects without a serializer
+    return str(data).encode("utf-8")
+
+
+def _table_to_csv(table: Any, float_precision: Precision = None, columns: Optional[Sequence[Any]] = None) -> bytes:
+    return table_to_csv(table, float_precision)
+
+
+# serializers for types of optional packages, registered once the package
+# has been imported (data of such a type can't exist before that)
+_lazy: List[Tuple[str, str, Serializer]] = [
+    ("polars", "DataFrame", _polars_to_csv),
+    ("pyarrow", "Table", _table_to_csv),
+]
+
+
+def register(cls: type, serializer: Serializer) -> None:
+    """
+    Serialize data of type cls, or a subclass, with serializer
+    """
+    with _lock:
+        _serializers[cls] = serializer
+
+
+def unregister(cls: type) -> None:
+    with _lock:
+        _serializers.pop(cls, None)
+
+
+def get_serializer(data: Any) -> Optional[Serializer]:
+    """
+    The serializer for data, None if its type has none
+    """
+    with _lock:
+        for module, name, serializer in list(_lazy):
+            cls = getattr(sys.modules.get(module), name, None)
+            if cls is not None:
+                _serializers.setdefault(cls, serializer)
+                _lazy.remove((module, name, serializer))
+
+        for cls in type(data).__mro__:
+            if cls in _serializers:
+                return _serializers[cls]
+
+    return None
+
+
+def serialize_csv(data: Any, float_precision: Precision = None, columns: Optional[Sequence[Any]] = None) -> bytes:
+    """
+    The CSV bytes of data, using the serializer registered for its type,
+    its to_csv function or str(), in that order
+    """
+    if isinstance(data, bytes):
+        return data
+
+    if isinstance(data, str):
+        return data.encode("utf-8")
+
+    serializer = get_serializer(data)
+    if serializer is not None:
+        return serializer(data, float_precision=float_precision, columns=columns)
+
+    to_csv = getattr(data, "to_csv", None)
+    if callable(to_csv):
+        return str(to_csv()).encode("utf-8")
+
+    return str(data).encode("utf-8")
+
+
+if pd is not None:
+    register(pd.DataFrame, _dataframe_to_csv)
+
+if np is not None:
+    register(np.ndarray, ndarray_to_csv)
+
+register(list, _list_to_csv)
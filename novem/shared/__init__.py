@@ -5,6 +5,8 @@ from typing_extensions import Protocol, runtime_checkable
 
 from novem.exceptions import Novem404
 
+from .snapshot import SNAPSHOT_TTL, SnapshotList
+
 if TYPE_CHECKING:
     from ..api_ref import NovemAPI
 
@@ -26,20 +28,24 @@ def get_share_value(share_item: Union[str, HasShareString]) -> str:
     return share_item.get_share_string()
 
 
-class NovemShare:
+class NovemShare(SnapshotList):
     """
     Novem share
 
     Novem shares are exposed at:
       f"{api._api_root}{share_path}/shared"
+
+    The list of shares is read once and reused for ttl seconds, call
+    refresh() to read it again
     """
 
-    def __init__(self, api: "NovemAPI", share_path: str) -> None:
+    def __init__(self, api: "NovemAPI", share_path: str, ttl: float = SNAPSHOT_TTL) -> None:
         """Initialize the Share object"""
+        super().__init__(ttl)
         self.api: "NovemAPI" = api
         self.share_path = share_path
 
-    def get(self) -> List[str]:
+    def _fetch(self) -> List[str]:
         """
         Get list of all shares currently active
         """
@@ -80,15 +86,16 @@ class NovemShare:
         rms = set(es) - set(shares)
         adds = set(shares) - set(es)
 
-        # Delete non-empty items
-        for r in filter(None, rms):
-            path = f"{self.share_path}/shared/{r}"
-            self.api.delete(path)
+        with self._mutating():
+            # Delete non-empty items
+            for r in filter(None, rms):
+                path = f"{self.share_path}/shared/{r}"
+                self._apply(self.api.delete(path), self._removed, r)
 
-        # Add non-empty items
-        for a in filter(None, adds):
-            path = f"{self.share_path}/shared/{a}"
-            self.api.create(path)
+            # Add non-empty items
+            for a in filter(None, adds):
+                path = f"{self.share_path}/shared/{a}"
+                self._apply(self.api.create(path), self._added, a)
 
     def __iadd__(self, share: Union[str, HasShareString]) -> "NovemShare":
         """
@@ -100,7 +107,8 @@ class NovemShare:
         share_value = get_share_value(share)
         if share_value and share_value not in self.get():
             path = f"{self.share_path}/shared/{share_value}"
-            self.api.create(path)
+            with self._mutating():
+                self._apply(self.api.create(path), self._added, share_value)
         return self
 
     def __isub__(self, share: Union[str, HasShareString]) -> "NovemShare":
@@ -113,7 +121,8 @@ class NovemShare:
         share_value = get_share_value(share)
         if share_value and share_value in self.get():
             path = f"{self.share_path}/shared/{share_value}"
-            self.api.delete(path)
+            with self._mutating():
+                self._apply(self.api.delete(path), self._removed, share_value)
         return self
 
     def __eq__(self, other: object) -> bool:
@@ -0,0 +1,66 @@
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+# seconds a fetched list is reused before it is read again
+SNAPSHOT_TTL = 30.0
+
+
+class SnapshotList(ABC):
+    """
+    A list of names read from the api, kept as a snapshot that is read again
+    after ttl seconds or on refresh(), and updated locally by our own
+    changes
+    """
+
+    def __init__(self, ttl: float = SNAPSHOT_TTL) -> None:
+        self.ttl = ttl
+        self._snapshot: Optional[List[str]] = None
+        self._fetched: float = 0.0
+
+    @abstractmethod
+    def _fetch(self) -> List[str]: ...
+
+    def refresh(self) -> List[str]:
+        """
+        Read the list from the api
+        """
+        self._snapshot = self._fetch()
+        self._fetched = time.monotonic()
+        return list(self._snapshot)
+
+    def invalidate(self) -> None:
+        """
+        Drop the snapshot, the next access reads the api
+        """
+        self._snapshot = None
+
+    def get(self) -> List[str]:
+        if self._snapshot is None or time.monotonic() - self._fetched > self.ttl:
+            return self.refresh()
+        return list(self._snapshot)
+
+    def _added(self, name: str) -> None:
+        if self._snapshot is not None and name not in self._snapshot:
+            self._snapshot = sorted(self._snapshot + [name])
+
+    def _removed(self, name: str) -> None:
+        if self._snapshot is not None:
+            self._snapshot = [x for x in self._snapshot if x != name]
+
+    def _apply(self, ok: bool, update: Callable[[str], None], name: str) -> None:
+        # a change the server refused leaves its state unknown to us
+        if ok:
+            update(name)
+        else:
+            self.invalidate()
+
+    @contextmanager
+    def _mutating(self) -> Iterator[None]:
+        # if a change fails half way we no longer know the server state
+        try:
+            yield
+        except BaseException:
+            self.invalidate()
+            raise
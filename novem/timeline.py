@@ -0,0 +1,197 @@
+"""
+Timeline profiling
+
+Records a timeline of phases (cli setup, config parsing, data serialization,
+api calls) and http requests, and writes it in the Chrome trace event format
+when the process exits. Open the result in chrome://tracing or
+https://ui.perfetto.dev.
+
+Enable it by setting NOVEM_PROFILE to the output path (or to 1 for
+novem-trace-<pid>.json in the working directory), with the --trace
+[<path>] cli option, or from code:
+
+    from novem import timeline
+    timeline.enable("publish.json")
+
+Recording is off by default and the instrumented functions only pay for a
+global lookup when it is.
+"""
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar, cast
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ENV_VAR = "NOVEM_PROFILE"
+
+# this module is the first one imported by novem
+IMPORT_START = time.perf_counter()
+
+
+class Timeline(object):
+    """
+    A collection of trace events
+    """
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, cat: str, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Add a complete event, start and end are time.perf_counter values
+        """
+        ev = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            ev["args"] = args
+
+        with self._lock:
+            self.events.append(ev)
+
+    @contextlib.contextmanager
+    def span(self, name: str, cat: str = "phase", **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, cat, start, time.perf_counter(), args)
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            events = sorted(self.events, key=lambda x: x["ts"])
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f)
+
+
+_timeline: Optional[Timeline] = None
+_path: Optional[str] = None
+
+
+def _http_event(event: Any) -> None:
+    # a request hook, see novem.http.instrument
+    tl = _timeline
+    if tl is None:
+        return
+
+    end = time.perf_counter()
+    args = {
+        "url": event.url,
+        "status": event.status,
+        "bytes_sent": event.bytes_sent,
+        "bytes_received": event.bytes_received,
+        "retries": event.retries,
+    }
+    if event.cache:
+        args["cache"] = event.cache
+
+    tl.add(event.endpoint, "http", end - event.total, end, args)
+
+
+def _write() -> None:
+    if _timeline is not None and _path:
+        _timeline.write(_path)
+
+
+def default_trace_path() -> str:
+    return f"novem-trace-{os.getpid()}.json"
+
+
+def enable(path: Optional[str] = None) -> Timeline:
+    """
+    Start recording, the timeline is written to path on exit
+    """
+    global _timeline, _path
+
+    from .http import add_hook
+
+    if _timeline is None:
+        _timeline = Timeline()
+        add_hook(_http_event)
+        atexit.register(_write)
+
+    _path = path
+    return _timeline
+
+
+def disable() -> Optional[Timeline]:
+    """
+    Stop recording and return what we recorded so far
+    """
+    global _timeline, _path
+
+    from .http import remove_hook
+
+    tl = _timeline
+    _timeline = None
+    _path = None
+    remove_hook(_http_event)
+    atexit.unregister(_write)
+
+    return tl
+
+
+def enabled() -> bool:
+    return _timeline is not None
+
+
+def span(name: str, cat: str = "phase", **args: Any) -> "contextlib.AbstractContextManager[None]":
+    """
+    Record the enclosed block if the timeline is enabled
+    """
+    if _timeline is None:
+        return contextlib.nullcontext()
+    return _timeline.span(name, cat, **args)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Record every call to the decorated function if the timeline is enabled
+    """
+
+    def decorator(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _timeline is None:
+                return fn(*args, **kwargs)
+            with _timeline.span(label):
+                return fn(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def enable_from_env() -> None:
+    """
+    Enable recording if NOVEM_PROFILE is set, called once novem is imported
+    """
+    value = os.getenv(ENV_VAR)
+    if not value or value in ["0", "false", "no"]:
+        return
+
+    if value in ["1", "true", "yes"]:
+        value = default_trace_path()
+
+    tl = enable(value)
+    tl.add("import novem", "phase", IMPORT_START, time.perf_counter())
@@ -10,5 +10,30 @@ Config = TypedDict(
         "api_root": str,
         "ignore_ssl_warn": bool,
         "profile": NotRequired[str],
+        # request tuning, see novem.http
+        "retries": NotRequired[int],
+        "retry_backoff": NotRequired[float],
+        "retry_max_time": NotRequired[float],
+        "retry_methods": NotRequired[str],
+        "rate_limit": NotRequired[float],
+        "rate_burst": NotRequired[float],
+        "max_in_flight": NotRequired[int],
+        "rate_limit_shared": NotRequired[bool],
+        "connect_timeout": NotRequired[float],
+        "read_timeout": NotRequired[float],
+        "compression": NotRequired[str],
+        "compression_threshold": NotRequired[int],
+        "transport": NotRequired[str],
+        "pool_size": NotRequired[int],
+        "pool_idle_timeout": NotRequired[float],
+        "cache": NotRequired[bool],
+        "cache_size": NotRequired[int],
+        "cache_ttl": NotRequired[float],
+        "disk_cache": NotRequired[bool],
+        "disk_cache_size": NotRequired[int],
+        "coalesce": NotRequired[bool],
+        "elide_writes": NotRequired[bool],
+        "persist_writes": NotRequired[bool],
+        "data_format": NotRequired[str],
     },
 )
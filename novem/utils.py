@@ -5,14 +5,17 @@ import platform
 import re
 import select
 import sys
+import threading
 import unicodedata
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, cast
 
 from packaging.version import InvalidVersion, Version
 
 from novem.types import Config
 
+from .timeline import traced
+
 API_ROOT = "https://api.novem.io/v1/"
 NOVEM_PATH = "novem"
 NOVEM_NAME = "novem.conf"
@@ -117,6 +120,35 @@ def get_config_path() -> Tuple[str, str]:
     return (novem_dir, novem_config)
 
 
+# (path, file signature, profile, api_root, token, ignore_ssl)
+ConfigKey = Tuple[str, Optional[Tuple[int, int, int]], Optional[str], Optional[str], Optional[str], bool]
+
+# resolved configs, reused as long as the config file is unchanged
+_configs: Dict[ConfigKey, Tuple[bool, Config]] = {}
+_configs_lock = threading.Lock()
+
+# config files we have checked for migrations in this process
+_migrated: Set[str] = set()
+
+
+def clear_config_cache() -> None:
+    """
+    Forget all resolved configs, the next lookup reads the file again
+    """
+    with _configs_lock:
+        _configs.clear()
+        _migrated.clear()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+@traced()
 def get_current_config(
     **kwargs: Any,
 ) -> Tuple[bool, Config]:
@@ -128,8 +160,45 @@ def get_current_config(
     current profile
     current token
     current api_root
+
+    Results are cached per config file, profile and overrides until the
+    file is modified
     """
 
+    if kwargs.get("token", False) or "ignore_config" in kwargs:
+        return _resolve_config("", kwargs)
+
+    # config path can be supplied as an option, if it is use that
+    if "config_path" not in kwargs or not kwargs["config_path"]:
+        (novem_dir, config_path) = get_config_path()
+    else:
+        config_path = kwargs["config_path"]
+
+    overrides = (
+        kwargs.get("config_profile") or None,
+        kwargs.get("api_root") or None,
+        kwargs.get("token") or None,
+        bool(kwargs.get("ignore_ssl", False)),
+    )
+
+    key: ConfigKey = (config_path, _file_signature(config_path), *overrides)
+    with _configs_lock:
+        cached = _configs.get(key)
+
+    if cached is None:
+        cached = _resolve_config(config_path, kwargs)
+
+        # a migration rewrites the file, so sign it again
+        key = (config_path, _file_signature(config_path), *overrides)
+        with _configs_lock:
+            _configs[key] = cached
+
+    # callers are free to modify their copy
+    status, co = cached
+    return status, co.copy()
+
+
+def _resolve_config(config_path: str, kwargs: Dict[str, Any]) -> Tuple[bool, Config]:
     co = Config(
         {
             "token": kwargs.get("token", None),
@@ -141,12 +210,6 @@ def get_current_config(
     if kwargs.get("token", False) or "ignore_config" in kwargs:
         return True, co
 
-    # config path can be supplied as an option, if it is use that
-    if "config_path" not in kwargs or not kwargs["config_path"]:
-        (novem_dir, config_path) = get_config_path()
-    else:
-        config_path = kwargs["config_path"]
-
     config = configparser.ConfigParser()
     config.read(config_path)
 
@@ -162,7 +225,11 @@ def get_current_config(
         return (False, co)
 
     else:
-        migrate_config_04_to_05(config_path, config, co)
+        with _configs_lock:
+            migrate = config_path not in _migrated
+            _migrated.add(config_path)
+        if migrate:
+            migrate_config_04_to_05(config_path, config, co)
 
     # override profile
     profile = kwargs.get("config_profile") or profile
@@ -179,6 +246,56 @@ def get_current_config(
         if "ignore_ssl_warn" in uc:
             co["ignore_ssl_warn"] = uc.getboolean("ignore_ssl_warn")
 
+        # optional request tuning
+        if "retries" in uc:
+            co["retries"] = int(uc["retries"])
+        if "retry_backoff" in uc:
+            co["retry_backoff"] = float(uc["retry_backoff"])
+        if "retry_max_time" in uc:
+            co["retry_max_time"] = float(uc["retry_max_time"])
+        if "retry_methods" in uc:
+            co["retry_methods"] = uc["retry_methods"]
+        if "rate_limit" in uc:
+            co["rate_limit"] = float(uc["rate_limit"])
+        if "rate_burst" in uc:
+            co["rate_burst"] = float(uc["rate_burst"])
+        if "max_in_flight" in uc:
+            co["max_in_flight"] = int(uc["max_in_flight"])
+        if "rate_limit_shared" in uc:
+            co["rate_limit_shared"] = uc.getboolean("rate_limit_shared", False)
+        if "connect_timeout" in uc:
+            co["connect_timeout"] = float(uc["connect_timeout"])
+        if "read_timeout" in uc:
+            co["read_timeout"] = float(uc["read_timeout"])
+        if "compression" in uc:
+            co["compression"] = uc["compression"]
+        if "compression_threshold" in uc:
+            co["compression_threshold"] = int(uc["compression_threshold"])
+        if "transport" in uc:
+            co["transport"] = uc["transport"]
+        if "pool_size" in uc:
+            co["pool_size"] = int(uc["pool_size"])
+        if "pool_idle_timeout" in uc:
+            co["pool_idle_timeout"] = float(uc["pool_idle_timeout"])
+        if "cache" in uc:
+            co["cache"] = uc.getboolean("cache", True)
+        if "cache_size" in uc:
+            co["cache_size"] = int(uc["cache_size"])
+        if "cache_ttl" in uc:
+            co["cache_ttl"] = float(uc["cache_ttl"])
+        if "disk_cache" in uc:
+            co["disk_cache"] = uc.getboolean("disk_cache", False)
+        if "disk_cache_size" in uc:
+            co["disk_cache_size"] = int(uc["disk_cache_size"])
+        if "coalesce" in uc:
+            co["coalesce"] = uc.getboolean("coalesce", True)
+        if "elide_writes" in uc:
+            co["elide_writes"] = uc.getboolean("elide_writes", True)
+        if "persist_writes" in uc:
+            co["persist_writes"] = uc.getboolean("persist_writes", False)
+        if "data_format" in uc:
+            co["data_format"] = uc["data_format"]
+
     except KeyError:
         return (True, co)
 
@@ -193,6 +310,7 @@ def get_current_config(
     return (True, co)
 
 
+@traced()
 def pretty_format(values: List[Dict[str, str]], order: List[Dict[str, Any]]) -> str:
     """
     Constructs a pretty print table of the values in values
@@ -332,6 +450,7 @@ def pretty_format_inner(values: List[Dict[str, str]], order: List[Dict[str, Any]
     return los
 
 
+@traced()
 def data_on_stdin() -> Optional[str]:
     """
     identify if there is data waiting on sys.stdin
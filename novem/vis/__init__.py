@@ -1,38 +1,31 @@
 import os
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from novem.exceptions import Novem403, Novem404
-
-from ..api_ref import NovemAPI
+from ..api_ref import NovemResourceAPI
+from ..http import Deadline, within
 from ..shared import NovemShare
 from ..utils import cl
 from ..utils import colors as clrs
 from .files import NovemFiles
 
 
-class NovemVisAPI(NovemAPI):
+class NovemVisAPI(NovemResourceAPI):
     shared: NovemShare
     files: Optional[NovemFiles] = None
 
     _vispath: Optional[str] = None
-    _debug: bool = False
 
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
 
         self.user = None
 
-        if "debug" in kwargs and kwargs["debug"]:
-            self._debug = True
-
-        if "create" not in kwargs or kwargs["create"]:
-            # let's create our plot if -C specified, always
-            # create when used as an api unless specifically told not to
-            self.api_create("")
-
         if "user" in kwargs and kwargs["user"]:
+            # we can never create another users vis
             self.user = kwargs["user"]
+            self._needs_create = False
+            self._may_create = False
 
         if "qpr" in kwargs and kwargs["qpr"]:
             self._qpr = kwargs["qpr"].replace(",", "&")
@@ -46,7 +39,7 @@ class NovemVisAPI(NovemAPI):
         else:
             super().__setattr__(name, value)
 
-    def api_dump(self, outpath: str) -> None:
+    def api_dump(self, outpath: str, deadline: Union[Deadline, float, None] = None) -> None:
         """
         Iterate over current id and dump output to supplied path
         """
@@ -61,7 +54,7 @@ class NovemVisAPI(NovemAPI):
             qp = f"{qpath}{path}"
             fp = f"{outpath}{path}"
             # print(f"QP: {qp}")
-            req = self._session.get(qp)
+            req = self._request("GET", qp)
 
             if not req.ok:
                 return None
@@ -87,7 +80,8 @@ class NovemVisAPI(NovemAPI):
                 rec_tree(f'{path}/{r["name"]}')
 
         # start recurison
-        rec_tree("")
+        with within(deadline):
+            rec_tree("")
 
     def api_tree(self, colors: bool = False, relpath: str = "/") -> str:
         """
@@ -119,7 +113,7 @@ class NovemVisAPI(NovemAPI):
         # create util function
         def rec_tree(path: str, level: int = 0, last: List[bool] = [False]) -> Tuple[List[str], str]:
             qp = f"{qpath}{path}"
-            req = self._session.get(qp)
+            req = self._request("GET", qp)
 
             if not req.ok:
                 return ([], "")
@@ -199,12 +193,11 @@ class NovemVisAPI(NovemAPI):
 
         return tr[:-1]  # strip trailing newline
 
-    def api_read(self, relpath: str) -> str:
-        """
-        Read the api value located at realtive path
-        """
+    def _path(self, relpath: str) -> str:
+        return f"{self._api_root}vis/{self._vispath}/{self.id}{relpath}"
 
-        qpath = f"{self._api_root}vis/{self._vispath}/{self.id}{relpath}"
+    def _read_path(self, relpath: str) -> str:
+        qpath = self._path(relpath)
 
         # We can read information from other users, but not perform any
         # other actions so only the GET method supports the custom user
@@ -215,161 +208,14 @@ class NovemVisAPI(NovemAPI):
         if self._qpr and len(self._qpr):
             qpath = f"{qpath}?{self._qpr}"
 
-        if self._debug:
-            print(f"GET: {qpath}")
-
-        r = self._session.get(qpath)
-
-        # TODO: verify result and raise exception if not ok
-        if r.status_code == 404:
-            raise Novem404(qpath)
-
-        if r.status_code == 403:
-            raise Novem403
-
-        return r.content.decode("utf-8")
-
-    def api_read_bytes(self, relpath: str) -> bytes:
-        qpath = f"{self._api_root}vis/{self._vispath}/{self.id}{relpath}"
-
-        # We can read information from other users, but not perform any
-        # other actions so only the GET method supports the custom user
-        # pathing
-        if self.user:
-            qpath = f"{self._api_root}users/{self.user}/vis/" f"{self._vispath}/{self.id}{relpath}"
-
-        if self._qpr and len(self._qpr):
-            qpath = f"{qpath}?{self._qpr}"
-
-        if self._debug:
-            print(f"GET: {qpath}")
-
-        r = self._session.get(qpath)
-
-        # TODO: verify result and raise exception if not ok
-        if r.status_code == 404:
-            raise Novem404(qpath)
-
-        if r.status_code == 403:
-            raise Novem403
+        return qpath
 
-        return r.content
-
-    def api_delete(self, relpath: str) -> None:
-        """
-        relpath: relative path to the plot baseline /config/type
-                 for the type file in the config folder
-        value: the value to write to the file
-        """
+    def _writable(self) -> bool:
         if self.user:
             print(f"you cannot modify another users {self._vispath}")
-            return
-
-        path = f"{self._api_root}vis/{self._vispath}/{self.id}{relpath}"
-
-        if self._debug:
-            print(f"DELETE: {path}")
-
-        r = self._session.delete(path)
-
-        if r.status_code == 404:
-            raise Novem404(path)
+            return False
 
-        if r.status_code == 403:
-            raise Novem403
-
-        # TODO: verify result and raise exception if not ok
-        if not r.ok:
-            print(r)
-            print(f"DELETE: {path}")
-            print("body")
-            print("---")
-            print(r.text)
-            print("headers")
-            print("---")
-            print(r.headers)
-            print("should raise an error")
-
-    def api_create(self, relpath: str) -> None:
-        """
-        relpath: relative path to the plot baseline /config/type
-                 for the type file in the config folder
-        value: the value to write to the file
-        """
-        if self.user:
-            print(f"you cannot modify another users {self._vispath}")
-            return
-
-        path = f"{self._api_root}vis/{self._vispath}/{self.id}{relpath}"
-
-        if self._debug:
-            print(f"PUT: {path}")
-
-        r = self._session.put(path)
-
-        if r.status_code == 404:
-            raise Novem404(path)
-
-        if r.status_code == 403:
-            raise Novem403(path)
-
-        if r.status_code == 409:
-            # we will ignore 409 errors
-            # as creating objects that already exist is not a problem
-            return
-
-        # TODO: verify result and raise exception if not ok
-        if not r.ok:
-            print(r)
-            print(f"PUT: {path}")
-            print("body")
-            print("---")
-            print(r.text)
-            print("headers")
-            print("---")
-            print(r.headers)
-            print("should raise a general error")
-
-    def api_write(self, relpath: str, value: str) -> None:
-        """
-        relpath: relative path to the plot baseline /config/type
-                 for the type file in the config folder
-        value: the value to write to the file
-        """
-        if self.user:
-            print(f"you cannot modify another users {self._vispath}")
-            return
-
-        path = f"{self._api_root}vis/{self._vispath}/{self.id}{relpath}"
-
-        if self._debug:
-            print(f"POST: {path}")
-
-        r = self._session.post(
-            path,
-            headers={"Content-type": "text/plain"},
-            data=value.encode("utf-8"),
-        )
-
-        if r.status_code == 404:
-            raise Novem404(path)
-
-        if r.status_code == 403:
-            raise Novem403
-
-        # TODO: verify result and raise exception if not ok
-        if not r.ok:
-            print(r)
-            print(f"POST: {path} {value}")
-            print("body")
-            print("---")
-            print(r.text)
-            print(r.status_code)
-            print("headers")
-            print("---")
-            for k, v in r.headers.items():
-                print(f"   {k}: {v}")
-            print("should raise a general error")
+        return True
 
     @property
     def log(self) -> None:
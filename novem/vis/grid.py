@@ -112,11 +112,11 @@ class Grid(NovemVisAPI):
 
     @property
     def url(self) -> str:
-        return self.api_read("/url").strip()
+        return self._read_fixed("/url").strip()
 
     @property
     def shortname(self) -> str:
-        return self.api_read("/shortname").strip()
+        return self._read_fixed("/shortname").strip()
 
     ###
     # Important attributes that cause render
@@ -0,0 +1,204 @@
+"""
+Lightweight vis references
+
+A VisHandle only stores the id, owner and type of a plot, grid or mail. It
+holds no session or sub objects and makes no requests, so registries of
+tens of thousands of visualisations are cheap to build and keep around.
+
+Promote a handle to the full object when you need it:
+
+    h = VisHandle("sales", "plot")
+    h.promote().name = "Sales"
+
+or operate on many handles at once, sharing one connection pool:
+
+    names = read_many(handles, "/name")
+"""
+
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, TypeVar
+
+from ..api_ref import Novem403, Novem404, NovemAPI, NovemException, NovemResourceAPI
+from ..http.transport import Response
+from . import NovemVisAPI
+
+T = TypeVar("T")
+
+# handle type to the api path fragment
+VIS_PATHS = {"plot": "plots", "grid": "grids", "mail": "mails"}
+
+DEFAULT_WORKERS = 8
+
+
+class VisHandle(object):
+    """
+    Reference to a plot, grid or mail, "@user~id" refers to a vis owned by
+    another user
+    """
+
+    __slots__ = ("id", "user", "type")
+
+    def __init__(self, id: str, type: str = "plot", user: Optional[str] = None) -> None:
+        if type not in VIS_PATHS:
+            raise ValueError(f"unknown vis type {type!r}, expected one of {', '.join(VIS_PATHS)}")
+
+        if not id:
+            raise ValueError("vis id cannot be empty")
+
+        if id[0] == "@":
+            user, id = id[1:].split("~", 1)
+
+        self.id = id
+        self.user = user
+        self.type = type
+
+    @property
+    def path(self) -> str:
+        """
+        Path of the vis relative to the api root
+        """
+        path = f"vis/{VIS_PATHS[self.type]}/{self.id}"
+        if self.user:
+            path = f"users/{self.user}/{path}"
+        return path
+
+    def promote(self, **kwargs: Any) -> NovemVisAPI:
+        """
+        Construct the full Plot, Grid or Mail object for this handle, kwargs
+        are passed on to the constructor
+        """
+        cls = _vis_class(self.type)
+        if self.user:
+            kwargs["user"] = self.user
+
+        return cls(self.id, **kwargs)  # type: ignore
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VisHandle):
+            return NotImplemented
+        return (self.id, self.user, self.type) == (other.id, other.user, other.type)
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.user, self.type))
+
+    def __repr__(self) -> str:
+        name = f"@{self.user}~{self.id}" if self.user else self.id
+        return f"VisHandle({name!r}, {self.type!r})"
+
+
+def _vis_class(type: str) -> Type[NovemVisAPI]:
+    from .grid import Grid
+    from .mail import Mail
+    from .plot import Plot
+
+    return {"plot": Plot, "grid": Grid, "mail": Mail}[type]  # type: ignore
+
+
+class _HandleAPI(NovemResourceAPI):
+    """
+    Resource api for the vis of a handle, so bulk writes take the same path
+    as those of the full objects
+    """
+
+    def __init__(self, handle: Optional[VisHandle] = None, **kwargs: Any) -> None:
+        self._handle = handle
+        # the vis have to exist already
+        super().__init__(**{**kwargs, "create": False})
+
+    def bind(self, handle: VisHandle) -> "_HandleAPI":
+        """
+        Copy for handle sharing the connection, caches and write log
+        """
+        api = copy.copy(self)
+        api._handle = handle
+        api._always_write = _vis_class(handle.type)._always_write
+        return api
+
+    def _path(self, relpath: str) -> str:
+        assert self._handle is not None
+        return f"{self._api_root}{self._handle.path}{relpath}"
+
+    def _report(self, method: str, path: str, r: Response) -> None:
+        raise NovemException(f"{path}: {r.status_code} {r.text}")
+
+
+def _check(url: str, r: Response) -> None:
+    if r.status_code == 404:
+        raise Novem404(url)
+    if r.status_code == 403:
+        raise Novem403(url)
+    if not r.ok:
+        raise NovemException(f"{url}: {r.status_code} {r.text}")
+
+
+def _each(
+    handles: Iterable[VisHandle], fn: Callable[[VisHandle], T], max_workers: int = DEFAULT_WORKERS
+) -> Dict[VisHandle, T]:
+    hs: List[VisHandle] = list(handles)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(hs, pool.map(fn, hs)))
+
+
+def read_many(
+    handles: Iterable[VisHandle], relpath: str, max_workers: int = DEFAULT_WORKERS, **kwargs: Any
+) -> Dict[VisHandle, Optional[str]]:
+    """
+    Read relpath, e.g. "/name", of every handle concurrently, missing
+    values are returned as None
+
+    kwargs are the usual connection options (config_profile, token etc.)
+    """
+    api = NovemAPI(**kwargs)
+
+    def read(h: VisHandle) -> Optional[str]:
+        url = f"{api._api_root}{h.path}{relpath}"
+        r = api._request("GET", url)
+        if r.status_code == 404:
+            return None
+        _check(url, r)
+        return r.text
+
+    return _each(handles, read, max_workers)
+
+
+def write_many(
+    handles: Iterable[VisHandle], relpath: str, value: str, max_workers: int = DEFAULT_WORKERS, **kwargs: Any
+) -> None:
+    """
+    Write value to relpath of every handle concurrently, the vis have to
+    exist already
+    """
+    api = _HandleAPI(**kwargs)
+
+    def write(h: VisHandle) -> None:
+        if h.user:
+            raise NovemException(f"you cannot modify another users {VIS_PATHS[h.type]}")
+
+        api.bind(h).api_write(relpath, value)
+
+    _each(handles, write, max_workers)
+
+
+def delete_many(
+    handles: Iterable[VisHandle], max_workers: int = DEFAULT_WORKERS, **kwargs: Any
+) -> Dict[VisHandle, bool]:
+    """
+    Delete every handle concurrently, returns whether each vis existed
+    """
+    api = NovemAPI(**kwargs)
+
+    def delete(h: VisHandle) -> bool:
+        if h.user:
+            raise NovemException(f"you cannot modify another users {VIS_PATHS[h.type]}")
+
+        url = f"{api._api_root}{h.path}"
+        r = api._request("DELETE", url)
+        if r.status_code == 404:
+            return False
+        _check(url, r)
+        api._known.discard(url)
+        api._metadata.discard(url)
+        return True
+
+    return _each(handles, delete, max_workers)
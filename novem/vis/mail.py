@@ -5,6 +5,7 @@ from typing import Any, List, Optional, Union
 from novem.exceptions import Novem404
 from novem.vis import NovemVisAPI
 
+from ..http import Deadline, within
 from .mail_sections import NovemEmailSection, PreviewSection
 
 
@@ -13,6 +14,9 @@ class Mail(NovemVisAPI):
     Novem mail class
     """
 
+    # writing the status sends the mail, repeat sends must always go out
+    _always_write = ("/status",)
+
     def __init__(self, id: str, **kwargs: Any) -> None:
         """
         :id mail name, duplicate entry will update the mail
@@ -152,35 +156,38 @@ class Mail(NovemVisAPI):
 
         return None
 
-    def send(self) -> None:
+    def send(self, deadline: Union[Deadline, float, None] = None) -> None:
         """
         Send e-mail to recipients
+
+        :deadline optional time budget in seconds for the whole operation
         """
-        # check if there are any recipients registered
-        try:
-            to = self.to
-        except Novem404:
-            to = ""
+        with within(deadline):
+            # check if there are any recipients registered
+            try:
+                to = self.to
+            except Novem404:
+                to = ""
 
-        try:
-            cc = self.cc
-        except Novem404:
-            cc = ""
+            try:
+                cc = self.cc
+            except Novem404:
+                cc = ""
 
-        try:
-            bcc = self.bcc
-        except Novem404:
-            bcc = ""
+            try:
+                bcc = self.bcc
+            except Novem404:
+                bcc = ""
 
-        reps = f"{to}\n{cc}\n{bcc}".split("\n")
-        reps = [x for x in reps if x != ""]
+            reps = f"{to}\n{cc}\n{bcc}".split("\n")
+            reps = [x for x in reps if x != ""]
 
-        if len(reps) == 0:
-            # print("No recipients registered, e-mail won't be sent")
-            return None
+            if len(reps) == 0:
+                # print("No recipients registered, e-mail won't be sent")
+                return None
 
-        self.render()
-        return self.api_write("/status", "sending")
+            self.render()
+            return self.api_write("/status", "sending")
 
     def _send(self) -> None:
         return self.api_write("/status", "sending")
@@ -220,11 +227,11 @@ class Mail(NovemVisAPI):
 
     @property
     def url(self) -> str:
-        return self.api_read("/url").strip()
+        return self._read_fixed("/url").strip()
 
     @property
     def shortname(self) -> str:
-        return self.api_read("/shortname").strip()
+        return self._read_fixed("/shortname").strip()
 
     ###
     # Important attributes that cause render and sending
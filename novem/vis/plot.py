@@ -1,8 +1,24 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
 from io import StringIO
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
 
 from novem.vis import NovemVisAPI
 
+from ..exceptions import Novem404, Novem415, NovemException
+from ..http import Deadline, within
+from ..serialize import get_serializer, serialize_csv
+from ..serialize.arrow import (
+    accepted_formats,
+    choose_format,
+    data_format_from_config,
+    encode_table,
+    reject_format,
+    to_table,
+)
+from ..serialize.csv import Precision
+from ..serialize.fingerprint import fingerprint
+from ..timeline import traced
 from .cell import NovemCellConfig
 from .colors import NovemColors
 from .custom import NovemCustom
@@ -17,6 +33,49 @@ else:
     except ImportError:
         pd = None  # type: ignore
 
+# top level entries included in a snapshot, besides the files at the root
+SNAPSHOT_DIRS = ["config"]
+
+# top level files left out of a snapshot as they can be large or change on
+# their own
+SNAPSHOT_SKIP = ["data", "log"]
+
+SNAPSHOT_WORKERS = 8
+
+
+def _partitions(data: Any) -> Iterator[Any]:
+    """
+    The chunks of data, computing dask style partitions one at a time
+    """
+    parts = getattr(data, "partitions", None)
+    count = getattr(data, "npartitions", None)
+    if parts is not None and count is not None:
+        for i in range(count):
+            part = parts[i]
+            compute = getattr(part, "compute", None)
+            yield compute() if callable(compute) else part
+    elif isinstance(data, (str, bytes)) or (get_serializer(data) is not None and not isinstance(data, list)):
+        # a single frame
+        yield data
+    else:
+        yield from data
+
+
+def _csv_chunks(chunks: Iterable[Any], precision: Precision, columns: Optional[Sequence[Any]]) -> Iterator[bytes]:
+    """
+    The CSV of every chunk, with the header of the first one only
+    """
+    header: Optional[bytes] = None
+    for chunk in chunks:
+        payload = serialize_csv(chunk, precision, columns)
+        if header is None:
+            header = payload[: payload.find(b"\n") + 1]
+            yield payload
+        elif payload.startswith(header):
+            yield payload[len(header) :]
+        else:
+            raise ValueError("All chunks need the same columns as the first one")
+
 
 class Plot(NovemVisAPI):
     """
@@ -54,6 +113,9 @@ class Plot(NovemVisAPI):
         # store pending updates when plot is frozen
         self._pending: Dict[str, str] = {}
 
+        # values fetched by prefetch, served instead of reading the api
+        self._snapshot: Optional[Dict[str, str]] = None
+
         self.colors = NovemColors(self)
         self.custom = NovemCustom(self)
         self.cell = NovemCellConfig(self)
@@ -61,29 +123,36 @@ class Plot(NovemVisAPI):
 
         super().__init__(**kwargs)
 
+        # csv, or a binary format if available, see novem.serialize.arrow
+        self._data_format = data_format_from_config(self._config, kwargs)
+
         self._parse_kwargs(**kwargs)
 
+    @traced()
     def _set_data(self, data: Any, **kwargs: Any) -> Any:
         """
         Set's the data of the plot
 
         The parameter either needs to be a text string
-        of CSV formatted text or an object with a to_csv
-        function.
+        of CSV formatted text, a type with a registered
+        serializer (pandas, polars, numpy, arrow, list of
+        records, see novem.serialize) or an object with a
+        to_csv function. columns labels the columns of numpy
+        arrays and lists of tuples.
+
+        Pass float_precision to write floats of a DataFrame
+        with a fixed number of decimals, either for all columns
+        or as a mapping of column to decimals. It only applies
+        to data sent as CSV.
         """
 
-        raw_str: str = ""
-        to_csv = getattr(data, "to_csv", None)
-
-        if callable(to_csv):
-            # if data has a callable csv funciton we'll
-            # assume it's a pandas dataframe
-            raw_str = data.to_csv()
-        else:
-            raw_str = str(data)
+        precision = kwargs.pop("float_precision", None)
+        columns = kwargs.pop("columns", None)
 
-        # invoke server write
-        self._write("/data", raw_str)
+        # frames we sent last time are neither serialized nor sent again
+        source = None if self._freeze else fingerprint(data, precision)
+        if source is None or not self._unchanged_data(source):
+            self._send_data(data, precision, columns, source)
 
         # also update our chart varibales
         self._parse_kwargs(**kwargs)
@@ -96,6 +165,120 @@ class Plot(NovemVisAPI):
     def __call__(self, data: Any, **kwargs: Any) -> Any:
         return self._set_data(data, **kwargs)
 
+    @traced()
+    def set_data_chunks(self, chunks: Any, **kwargs: Any) -> Any:
+        """
+        Set the data of the plot from an iterable of frames, or a dask style
+        object with partitions, holding only one of them in memory at a time
+
+        The CSV header of the first chunk is sent once, followed by the rows
+        of every chunk, in one request with chunked transfer encoding. All
+        chunks need the same columns. float_precision and columns apply as
+        when setting data.
+        """
+        if self._freeze:
+            raise NovemException("Chunked data can't be sent to a frozen plot")
+
+        if not self._writable():
+            return self
+
+        precision = kwargs.pop("float_precision", None)
+        columns = kwargs.pop("columns", None)
+
+        # the body can't be repeated, so the plot has to exist up front
+        path = self._path("/data")
+        self._ensure_created(path[len(self._api_root) :])
+
+        if self._debug:
+            print(f"POST: {path} (chunked)")
+
+        body = _csv_chunks(_partitions(chunks), precision, columns)
+        r = self._request("POST", path, headers={"Content-type": "text/plain"}, data=body)
+        self._check("POST", path, r)
+
+        if not r.ok:
+            self._report("POST", f"{path} (chunked)", r)
+        elif self._needs_create:
+            self._remember()
+
+        # we don't keep a digest of streamed data
+        if self._writes is not None:
+            self._writes.discard(path)
+        if self._snapshot is not None:
+            self._snapshot.pop("/data", None)
+
+        self._parse_kwargs(**kwargs)
+        return self
+
+    def _probe_formats(self) -> Optional[str]:
+        """
+        Ask the server which media types it accepts for data
+        """
+        r = self._request("OPTIONS", self._path("/data"))
+        if r.ok:
+            return r.headers.get("Accept-Post", "")
+        # 405 is an answer, OPTIONS is not supported so neither is binary data
+        return "" if r.status_code == 405 else None
+
+    def _data_media_type(self) -> Optional[str]:
+        """
+        The binary media type to send data as, None for CSV
+        """
+        return choose_format(self._data_format, lambda: accepted_formats(self._api_root, self._probe_formats))
+
+    def _send_data(
+        self, data: Any, precision: Precision, columns: Optional[Sequence[Any]], source: Optional[str]
+    ) -> None:
+        if self._write_columnar(data, source):
+            return
+
+        payload = serialize_csv(data, precision, columns)
+
+        # invoke server write, the payload is sent as is rather than
+        # decoded and encoded again
+        if self._freeze:
+            self._pending["/data"] = payload.decode("utf-8")
+        else:
+            self.api_write("/data", payload, source=source)
+            if self._snapshot is not None:
+                self._snapshot.pop("/data", None)
+
+    def _unchanged_data(self, source: str) -> bool:
+        """
+        Whether our data was last written from a frame with this fingerprint
+        """
+        path = self._path("/data")
+        if self._writes is None or not self._writes.unchanged_source(path, source):
+            return False
+
+        if self._debug:
+            print(f"POST: {path} (unchanged source, skipped)")
+        return True
+
+    def _write_columnar(self, data: Any, source: Optional[str] = None) -> bool:
+        """
+        Send data in a binary columnar format if both we and the server
+        support it, returns False if it should be sent as CSV instead
+        """
+        if self._freeze:
+            # pending writes are kept as text
+            return False
+
+        media_type = self._data_media_type()
+        table = to_table(data) if media_type else None
+        if media_type is None or table is None:
+            return False
+
+        try:
+            self.api_write("/data", encode_table(table, media_type), content_type=media_type, source=source)
+        except Novem415:
+            reject_format(self._api_root, media_type)
+            return False
+
+        if self._snapshot is not None:
+            self._snapshot.pop("/data", None)
+        return True
+
     def _parse_kwargs(self, **kwargs: Any) -> None:
 
         # first let our super do it's thing
@@ -128,6 +311,9 @@ class Plot(NovemVisAPI):
             if path in self._pending:
                 return self._pending[path]
 
+        if self._snapshot is not None and path in self._snapshot:
+            return self._snapshot[path]
+
         return self.api_read(path)
 
     def _write(self, path: str, value: str) -> None:
@@ -135,6 +321,73 @@ class Plot(NovemVisAPI):
             self._pending[path] = value
         else:
             self.api_write(path, value)
+            if self._snapshot is not None:
+                self._snapshot[path] = value
+
+    ###
+    # Snapshots
+    ###
+
+    def _list_dir(self, path: str) -> List[Dict[str, str]]:
+        r = self._call("GET", self._read_path(f"{path}/"))
+        if not r.ok:
+            return []
+
+        nodes: List[Dict[str, str]] = r.json()
+        return [x for x in nodes if x["type"] not in ["system_file", "system_dir"]]
+
+    def _snapshot_paths(self, pool: Executor) -> List[str]:
+        # walk the tree one level at a time, listing each level concurrently
+        files: List[str] = []
+        level = [""]
+        while level:
+            below: List[str] = []
+            for path, nodes in zip(level, pool.map(self._list_dir, level)):
+                for node in nodes:
+                    name = node["name"]
+                    if node["type"] == "dir" and (path or name in SNAPSHOT_DIRS):
+                        below.append(f"{path}/{name}")
+                    elif node["type"] != "dir" and (path or name not in SNAPSHOT_SKIP):
+                        files.append(f"{path}/{name}")
+            level = below
+
+        return files
+
+    def _prefetch_one(self, path: str) -> Optional[str]:
+        try:
+            return self.api_read(path)
+        except Novem404:
+            return None
+
+    def prefetch(self, paths: Optional[Iterable[str]] = None, max_workers: int = SNAPSHOT_WORKERS) -> None:
+        """
+        Fetch the given paths, or the top level files and the config tree,
+        concurrently and serve reads from them until the next prefetch
+
+        :paths relative paths to fetch, e.g. ["/config/type", "/name"]
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            if paths is None:
+                paths = self._snapshot_paths(pool)
+
+            paths = list(paths)
+            values = pool.map(self._prefetch_one, paths)
+            self._snapshot = {p: v for p, v in zip(paths, values) if v is not None}
+
+    @contextmanager
+    def snapshot(self, paths: Optional[Iterable[str]] = None) -> Iterator["Plot"]:
+        """
+        Prefetch the plot and serve reads from the snapshot within the
+        context
+
+            with plot.snapshot():
+                print(plot.type, plot.title, plot.config.legend.position)
+        """
+        self.prefetch(paths)
+        try:
+            yield self
+        finally:
+            self._snapshot = None
 
     # we'll implement generic properties common across all plots here
     @property
@@ -181,11 +434,11 @@ class Plot(NovemVisAPI):
 
     @property
     def url(self) -> str:
-        return self._read("/url").strip()
+        return self._read_fixed("/url").strip()
 
     @property
     def shortname(self) -> str:
-        return self._read("/shortname").strip()
+        return self._read_fixed("/shortname").strip()
 
     ###
     # Interactive utility functions
@@ -290,10 +543,13 @@ class Plot(NovemVisAPI):
     def freeze(self) -> None:
         self._freeze = True
 
-    def run(self) -> None:
-        # push pending updates to server
-        for path, value in self._pending.items():
-            self.api_write(path, value)
+    def run(self, deadline: Union[Deadline, float, None] = None) -> None:
+        # push pending updates to server, optionally within a time budget
+        with within(deadline):
+            for path, value in self._pending.items():
+                self.api_write(path, value)
+                if self._snapshot is not None:
+                    self._snapshot[path] = value
 
         self._freeze = False
 
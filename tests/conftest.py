@@ -4,6 +4,8 @@ import sys
 import pytest
 
 from novem.cli import run_cli
+from novem.http import clear_metadata
+from novem.utils import clear_config_cache
 
 
 class CliExit(RuntimeError):
@@ -12,6 +14,17 @@ class CliExit(RuntimeError):
         self.code = code
 
 
+@pytest.fixture(autouse=True)
+def fresh_config():
+    # tests write different config files to the same (fake) path, and mock
+    # different metadata for the same objects
+    clear_config_cache()
+    clear_metadata()
+    yield
+    clear_config_cache()
+    clear_metadata()
+
+
 @pytest.fixture
 def cli(capsys, monkeypatch):
     # captreus sys
@@ -0,0 +1,224 @@
+import asyncio
+import json
+
+import pytest
+
+from novem.exceptions import Novem404, NovemException, NovemTimeout
+
+httpx = pytest.importorskip("httpx")
+
+from novem.aio import AsyncGrid, AsyncJob, AsyncMail, AsyncPlot, close_clients  # noqa: E402
+from novem.http import Deadline, RetryPolicy  # noqa: E402
+
+
+class FakeServer:
+    """
+    Minimal in memory stand in for the novem api
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.calls = []
+
+    def __call__(self, request):
+        path = request.url.path.replace("/v1/", "", 1)
+        self.calls.append((request.method, path))
+
+        if request.method == "PUT":
+            if path in self.files:
+                return httpx.Response(409)
+            self.files[path] = ""
+            return httpx.Response(201)
+
+        if request.method == "POST":
+            self.files[path] = request.content.decode("utf-8")
+            return httpx.Response(200)
+
+        if request.method == "DELETE":
+            self.files.pop(path, None)
+            return httpx.Response(200)
+
+        if path.endswith("/shared"):
+            prefix = f"{path}/"
+            shares = [{"name": k[len(prefix) :]} for k in self.files if k.startswith(prefix)]
+            return httpx.Response(200, text=json.dumps(shares))
+
+        if path not in self.files:
+            return httpx.Response(404)
+
+        return httpx.Response(200, text=self.files[path])
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self))
+
+
+def test_plot_reads_and_writes():
+    server = FakeServer()
+
+    async def run():
+        p = AsyncPlot("aio_plot", token="aio-token", client=server.client())
+
+        class Frame:
+            def to_csv(self):
+                return "a,b\n1,2\n"
+
+        await p.set_data(Frame(), type="bar", title="A title")
+        assert await p.type == "bar"
+        assert await p.title == "A title"
+        assert await p.data == "a,b\n1,2\n"
+
+        with pytest.raises(AttributeError):
+            p.name = "not like this"
+
+    asyncio.run(run())
+
+    # the plot is created once, on the first write
+    assert [c for c in server.calls if c[0] == "PUT"] == [("PUT", "vis/plots/aio_plot")]
+
+
+def test_concurrent_updates():
+    server = FakeServer()
+
+    async def run():
+        client = server.client()
+        plots = [AsyncPlot(f"p{i}", token="aio-token", client=client) for i in range(50)]
+        await asyncio.gather(*[p.set(name=f"name {i}", caption="c") for i, p in enumerate(plots)])
+        return await asyncio.gather(*[p.name for p in plots])
+
+    names = asyncio.run(run())
+    assert names == [f"name {i}" for i in range(50)]
+
+
+def test_shares():
+    server = FakeServer()
+
+    async def run():
+        p = AsyncPlot("aio_plot", token="aio-token", client=server.client())
+        await p.shared.set(["public", "@user~group"])
+        assert await p.shared.get() == ["@user~group", "public"]
+
+        await p.shared.remove("public")
+        await p.shared.add("+org~group")
+        assert await p.shared.get() == ["+org~group", "@user~group"]
+
+    asyncio.run(run())
+
+    # the plot is created before its first share
+    puts = [c for c in server.calls if c[0] == "PUT"]
+    assert puts[0] == ("PUT", "vis/plots/aio_plot")
+    assert puts.count(("PUT", "vis/plots/aio_plot")) == 1
+
+
+def test_grid_mail_and_job():
+    server = FakeServer()
+
+    async def run():
+        client = server.client()
+
+        g = AsyncGrid("aio_grid", token="aio-token", client=client)
+        await g.set(layout="a b", mapping="a => /u/p/a")
+        assert server.calls[-1] == ("POST", "vis/grids/aio_grid/layout")
+
+        m = AsyncMail("aio_mail", token="aio-token", client=client)
+        await m.set(to=["a@novem.io", "b@novem.io"], subject="hi")
+        assert await m.to == "a@novem.io\nb@novem.io"
+        await m.send()
+        assert await m.status == "sending"
+
+        j = AsyncJob("aio_job", token="aio-token", client=client)
+        await j.set(name="job")
+        assert await j.name == "job"
+
+        with pytest.raises(Novem404):
+            await j.description
+
+    asyncio.run(run())
+
+
+def test_retries_server_errors():
+    responses = [503, 503, 200]
+
+    def handler(request):
+        return httpx.Response(responses.pop(0), text="bar")
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        p = AsyncPlot("aio_plot", token="aio-token", client=client, retry=RetryPolicy(backoff=0, jitter=0))
+        return await p.type
+
+    assert asyncio.run(run()) == "bar"
+    assert responses == []
+
+
+def test_shared_client_per_loop():
+    async def run():
+        a = AsyncPlot("a", token="aio-token")
+        b = AsyncPlot("b", token="aio-token")
+        same = a.client is b.client
+        await close_clients()
+        return same
+
+    assert asyncio.run(run())
+
+
+def test_shares_the_request_pipeline():
+    server = FakeServer()
+    events = []
+    seen = []
+
+    def middleware(request, call_next):
+        seen.append((request.method, request.url))
+        return call_next(request)
+
+    async def run():
+        p = AsyncPlot(
+            "aio_plot",
+            token="aio-pipeline-token",
+            client=server.client(),
+            hooks=[events.append],
+            middleware=[middleware],
+        )
+        await p.set(name="a")
+        await p.set(name="a")
+        assert await p.name == "a"
+
+    asyncio.run(run())
+
+    # the repeated write is elided, every request passed middleware and hooks
+    assert [c[0] for c in server.calls] == ["PUT", "POST", "GET"]
+    assert [m for m, _ in seen] == ["PUT", "POST", "GET"]
+    assert [(e.method, e.status) for e in events] == [("PUT", 201), ("POST", 200), ("GET", 200)]
+
+
+def test_deadline_applies():
+    server = FakeServer()
+
+    async def run():
+        p = AsyncPlot("aio_plot", token="aio-token", client=server.client())
+        with Deadline(0):
+            await p.name
+
+    with pytest.raises(NovemTimeout):
+        asyncio.run(run())
+
+    assert server.calls == []
+
+
+def test_mail_status_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(500)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        m = AsyncMail(
+            "aio_mail", token="aio-token", client=client, create=False, retry=RetryPolicy(backoff=0, jitter=0)
+        )
+        await m.test()
+
+    with pytest.raises(NovemException):
+        asyncio.run(run())
+
+    assert calls == ["/v1/vis/mails/aio_mail/status"]
@@ -5,6 +5,7 @@ from functools import partial
 
 import pytest
 
+from novem.http import clear_caches
 from novem.utils import pretty_format
 from tests.conftest import CliExit
 
@@ -620,3 +621,27 @@ def test_plot_o(cli, requests_mock, fs):
     out, err = cli("-p", plot_name, "-r", "files/plot.ansi")
 
     assert out == plot_ansi
+
+
+def test_plot_read_no_cache(cli, requests_mock, fs):
+    clear_caches()
+    write_config(auth_req)
+
+    plot_name = "test_plot"
+    reads = []
+
+    def plot_ansi(request, context):
+        reads.append(1)
+        context.headers["ETag"] = f'"{len(reads)}"'
+        context.headers["Cache-Control"] = "max-age=60"
+        return f"version {len(reads)}\n"
+
+    requests_mock.register_uri("get", f"{api_root}vis/plots/{plot_name}/files/plot.ansi", text=plot_ansi)
+
+    # the second read is served from the cache, --no-cache goes to the api
+    assert cli("-p", plot_name, "-r", "files/plot.ansi").out == "version 1\n"
+    assert cli("-p", plot_name, "-r", "files/plot.ansi").out == "version 1\n"
+    assert cli("-p", plot_name, "-r", "files/plot.ansi", "--no-cache").out == "version 2\n"
+    assert len(reads) == 2
+
+    clear_caches()
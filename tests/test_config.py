@@ -1,10 +1,11 @@
+import configparser
 import os
 from unittest.mock import patch
 
 import pytest
 
 from novem import Plot
-from novem.utils import API_ROOT, get_config_path
+from novem.utils import API_ROOT, get_config_path, get_current_config
 
 
 def setup_fake_config(fs, token, api_root):
@@ -158,3 +159,29 @@ def test_accepts_api_root_from_kwarg_over_env(requests_mock, fs):
     p = Plot(id="foo", api_root=NOVEM_API_ROOT_TEST, create=False)
     assert p.url == "test-url"
     assert p.token == "test_token"
+
+
+def test_config_is_memoized_until_modified(fs):
+    config_path = setup_fake_config(fs, "first-token", API_ROOT)
+
+    with patch("configparser.ConfigParser.read", autospec=True, side_effect=configparser.ConfigParser.read) as read:
+        _, a = get_current_config()
+        _, b = get_current_config()
+        assert read.call_count == 1
+
+        # callers get their own copy
+        a["token"] = "changed"
+        assert b["token"] == "first-token"
+        assert get_current_config()[1]["token"] == "first-token"
+
+        # other profiles and overrides are resolved separately
+        get_current_config(api_root="https://other/v1/")
+        assert read.call_count == 2
+
+        # editing the file invalidates the cached config
+        with open(config_path) as f:
+            content = f.read()
+        with open(config_path, "w") as f:
+            f.write(content.replace("first-token", "second-token"))
+        assert get_current_config()[1]["token"] == "second-token"
+        assert read.call_count == 3
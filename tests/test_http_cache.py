@@ -0,0 +1,96 @@
+import pytest
+
+from novem import Plot
+from novem.http import ResponseCache, clear_caches
+from novem.http.cache import CacheEntry
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def etag_server(requests_mock, path, body, etag='"v1"'):
+    seen = []
+
+    def cb(request, context):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == etag:
+            context.status_code = 304
+            return b""
+        context.headers["ETag"] = etag
+        return body
+
+    requests_mock.register_uri("get", f"{url}{path}", content=cb)
+    return seen
+
+
+def test_revalidates_and_serves_304_from_cache(requests_mock):
+    seen = etag_server(requests_mock, "/files/plot.png", b"\x89PNG" * 1000)
+
+    p = Plot(id="foo", create=False, token="cache-token")
+    assert p.api_read_bytes("/files/plot.png") == b"\x89PNG" * 1000
+    assert p.api_read_bytes("/files/plot.png") == b"\x89PNG" * 1000
+
+    # other objects with the same credentials share the cache
+    assert Plot(id="foo", create=False, token="cache-token").api_read_bytes("/files/plot.png") == b"\x89PNG" * 1000
+
+    assert seen == [None, '"v1"', '"v1"']
+
+
+def test_writes_invalidate(requests_mock):
+    seen = etag_server(requests_mock, "/config/type", b"bar")
+    requests_mock.register_uri("post", f"{url}/config/type", text="")
+
+    p = Plot(id="foo", create=False, token="cache-token")
+    assert p.type == "bar"
+    p.type = "line"
+    assert p.type == "bar"
+
+    assert seen == [None, None]
+
+
+def test_tokens_do_not_share(requests_mock):
+    seen = etag_server(requests_mock, "/name", b"foo")
+
+    Plot(id="foo", create=False, token="cache-token").name
+    Plot(id="foo", create=False, token="other-token").name
+
+    assert seen == [None, None]
+
+
+def test_cache_can_be_disabled(requests_mock):
+    seen = etag_server(requests_mock, "/name", b"foo")
+
+    p = Plot(id="foo", create=False, token="cache-token", cache=False)
+    p.name
+    p.name
+
+    assert seen == [None, None]
+
+
+def test_lru_is_bounded_by_size():
+    cache = ResponseCache(max_size=100)
+
+    for i in range(5):
+        cache.put(CacheEntry(url=f"{url}/{i}", status=200, headers={}, content=b"x" * 30, etag="e"))
+    assert len(cache) == 3
+    assert cache.size == 90
+    assert cache.get(f"{url}/0") is None
+    assert cache.stats.evictions == 2
+
+    # too large to cache at all
+    cache.put(CacheEntry(url=f"{url}/big", status=200, headers={}, content=b"x" * 101, etag="e"))
+    assert cache.get(f"{url}/big") is None
+
+    # invalidation covers query variants and children
+    cache.put(CacheEntry(url=f"{url}/4?a=1", status=200, headers={}, content=b"", etag="e"))
+    cache.invalidate(f"{url}/4")
+    assert cache.get(f"{url}/4") is None
+    assert cache.get(f"{url}/4?a=1") is None
+    assert cache.get(f"{url}/3") is not None
@@ -0,0 +1,99 @@
+import gzip
+
+from novem import Plot
+from novem.http.compression import reset_negotiation
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo/data"
+payload = "a,b,c\n" + "1,2,3\n" * 1000
+
+
+def record(requests_mock, responses):
+    bodies = []
+
+    def cb(request, context):
+        status = responses.pop(0) if responses else 200
+        context.status_code = status
+        bodies.append((request.headers.get("Content-Encoding"), request.body))
+        return "{}"
+
+    requests_mock.register_uri("post", url, text=cb)
+    return bodies
+
+
+def test_compression_is_off_by_default(requests_mock):
+    bodies = record(requests_mock, [])
+
+    Plot(id="foo", create=False, token="gz-token").data = payload
+    assert bodies == [(None, payload.encode("utf-8"))]
+
+
+def test_large_bodies_are_compressed(requests_mock):
+    reset_negotiation()
+    bodies = record(requests_mock, [])
+
+    p = Plot(id="foo", create=False, token="gz-token", compression="gzip", compression_threshold=1024)
+    p.data = payload
+    p.api_write("/data", "small")
+
+    assert bodies[0][0] == "gzip"
+    assert gzip.decompress(bodies[0][1]) == payload.encode("utf-8")
+    assert len(bodies[0][1]) < len(payload)
+
+    # below the threshold we send the body as is
+    assert bodies[1] == (None, b"small")
+
+
+def test_unsupported_compression_falls_back(requests_mock):
+    reset_negotiation()
+    bodies = record(requests_mock, [415])
+
+    p = Plot(id="foo", create=False, token="gz-token", compression="gzip", compression_threshold=1024)
+    p.data = payload
+
+    assert [b[0] for b in bodies] == ["gzip", None]
+    assert bodies[1][1] == payload.encode("utf-8")
+
+    # the rejection is remembered for the api root
+    p = Plot(id="foo", create=False, token="gz-token", compression="gzip", compression_threshold=1024)
+    p.data = payload
+    assert [b[0] for b in bodies] == ["gzip", None, None]
+
+    reset_negotiation()
+
+
+def test_unsupported_media_type_keeps_compression(requests_mock):
+    reset_negotiation()
+    bodies = record(requests_mock, [415, 415])
+
+    p = Plot(id="foo", create=False, token="gz-token", compression="gzip", compression_threshold=1024)
+    p.api_write("/data", payload)
+
+    # the server refused the body either way, gzip was not the problem
+    assert [b[0] for b in bodies] == ["gzip", None]
+
+    p.data = payload
+    assert [b[0] for b in bodies] == ["gzip", None, "gzip"]
+
+    reset_negotiation()
+
+
+def test_accepted_encodings_are_trusted(requests_mock):
+    reset_negotiation()
+    bodies = []
+
+    def cb(request, context):
+        bodies.append(request.headers.get("Content-Encoding"))
+        context.status_code = 415
+        context.headers["Accept-Encoding"] = "gzip"
+        return "{}"
+
+    requests_mock.register_uri("post", url, text=cb)
+
+    p = Plot(id="foo", create=False, token="gz-token", compression="gzip", compression_threshold=1024)
+    p.api_write("/data", payload)
+
+    # gzip is accepted, so the 415 is about the body and not resent
+    assert bodies == ["gzip"]
+
+    reset_negotiation()
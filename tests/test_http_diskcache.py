@@ -0,0 +1,149 @@
+import os
+import threading
+
+import pytest
+
+from novem import Plot
+from novem.http import DiskCache, clear_caches
+from novem.http.cache import CacheEntry
+from novem.http.diskcache import default_disk_cache_path
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+@pytest.fixture
+def db(tmp_path):
+    clear_caches()
+    yield str(tmp_path / "cache.sqlite")
+    clear_caches()
+
+
+def new_process():
+    # forget everything kept in memory, as if a new process started
+    clear_caches()
+    from novem.http import diskcache
+
+    diskcache._disk_caches.clear()
+
+
+def test_ttl_serves_across_processes(requests_mock, db):
+    requests_mock.register_uri("get", f"{API_ROOT}u/demo/p/", text="[]")
+
+    for _ in range(3):
+        new_process()
+        p = Plot(id="foo", create=False, token="disk-token", disk_cache=db, cache_ttl=60)
+        assert p.read("u/demo/p/") == "[]"
+
+    assert requests_mock.call_count == 1
+
+
+def test_revalidates_across_processes(requests_mock, db):
+    seen = []
+
+    def cb(request, context):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            context.status_code = 304
+            return ""
+        context.headers["ETag"] = '"v1"'
+        return "bar"
+
+    requests_mock.register_uri("get", f"{url}/config/type", text=cb)
+    requests_mock.register_uri("post", f"{url}/config/type", text="")
+
+    for _ in range(2):
+        new_process()
+        assert Plot(id="foo", create=False, token="disk-token", disk_cache=db).type == "bar"
+
+    assert seen == [None, '"v1"']
+
+    # writes invalidate the persisted entry as well
+    new_process()
+    p = Plot(id="foo", create=False, token="disk-token", disk_cache=db)
+    p.type = "line"
+    new_process()
+    Plot(id="foo", create=False, token="disk-token", disk_cache=db).type
+
+    assert seen == [None, '"v1"', None]
+
+
+def test_scoped_and_bounded(db):
+    a = DiskCache(db, "a:1", max_size=1000)
+    b = DiskCache(db, "b:1", max_size=1000)
+
+    a.put(CacheEntry(url=f"{url}/x", status=200, headers={}, content=b"a", etag="e"))
+    assert b.get(f"{url}/x") is None
+    assert a.get(f"{url}/x").content == b"a"
+
+    for i in range(20):
+        b.put(CacheEntry(url=f"{url}/{i}", status=200, headers={}, content=b"x" * 100, etag="e"))
+
+    # the oldest entries are evicted once we pass the size limit
+    assert a.get(f"{url}/x") is None
+    assert b.get(f"{url}/19") is not None
+    assert len(b) < 10
+
+
+def test_size_is_not_summed_on_every_put(db):
+    cache = DiskCache(db, "scope", max_size=1000)
+    cache.put(CacheEntry(url=f"{url}/0", status=200, headers={}, content=b"x" * 100, etag="e"))
+
+    statements = []
+    cache._conn().set_trace_callback(statements.append)
+
+    for i in range(1, 9):
+        cache.put(CacheEntry(url=f"{url}/{i}", status=200, headers={}, content=b"x" * 100, etag="e"))
+    assert not [s for s in statements if "SUM(size)" in s]
+
+    # passing the limit sums up the real size and evicts
+    for i in range(9, 12):
+        cache.put(CacheEntry(url=f"{url}/{i}", status=200, headers={}, content=b"x" * 100, etag="e"))
+    assert [s for s in statements if "SUM(size)" in s]
+    assert cache.get(f"{url}/0") is None
+    assert cache.get(f"{url}/11") is not None
+
+
+def test_concurrent_writers(db):
+    errors = []
+
+    def work(i):
+        try:
+            cache = DiskCache(db, "scope")
+            for j in range(20):
+                cache.put(CacheEntry(url=f"{url}/{i}/{j}", status=200, headers={}, content=b"x", etag="e"))
+                cache.get(f"{url}/{i}/{j}")
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(DiskCache(db, "scope")) == 160
+
+
+def test_cli_cache_clear(cli, fs):
+    path = default_disk_cache_path()
+    fs.create_file(path)
+
+    out, _ = cli("--cache-clear")
+    assert "cleared" in out
+    assert not os.path.exists(path)
+
+    out, _ = cli("--cache-clear")
+    assert "No response cache" in out
+
+
+def test_no_cache_bypasses_caches(requests_mock, db):
+    requests_mock.register_uri("get", f"{url}/name", text="foo", headers={"ETag": '"v1"'})
+
+    p = Plot(id="foo", create=False, token="disk-token", disk_cache=db, cache_ttl=60, no_cache=True)
+    p.name
+    p.name
+
+    assert requests_mock.call_count == 2
+    assert not os.path.exists(db)
@@ -0,0 +1,74 @@
+from novem import Mail, Plot
+from novem.http import write_stats
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+def posts(requests_mock):
+    return [r.path for r in requests_mock.request_history if r.method == "POST"]
+
+
+def test_unchanged_writes_are_skipped(requests_mock):
+    requests_mock.register_uri("post", f"{url}/name", text="")
+    requests_mock.register_uri("post", f"{url}/config/type", text="")
+
+    before = write_stats()
+
+    p = Plot("foo", token="elide-token")
+    for _ in range(3):
+        p.name = "sales"
+        p.type = "bar"
+    p.name = "revenue"
+    p.name = "revenue"
+    p.api_write("/name", "revenue", force=True)
+
+    assert (
+        posts(requests_mock)
+        == ["/v1/vis/plots/foo/name", "/v1/vis/plots/foo/config/type"] + ["/v1/vis/plots/foo/name"] * 2
+    )
+    assert (p._writes.stats.written, p._writes.stats.elided) == (4, 5)
+
+    after = write_stats()
+    assert after.elided - before.elided == 5
+
+
+def test_reads_and_deletes_reset(requests_mock):
+    requests_mock.register_uri("post", f"{url}/name", text="")
+    requests_mock.register_uri("get", f"{url}/name", text="changed elsewhere")
+    requests_mock.register_uri("delete", f"{url}/name", text="")
+
+    p = Plot("foo", token="elide-token")
+    p.name = "sales"
+    p.name
+    p.name = "sales"
+    p.api_delete("/name")
+    p.name = "sales"
+
+    assert len(posts(requests_mock)) == 3
+
+
+def test_disabled_and_actions(requests_mock):
+    requests_mock.register_uri("post", f"{url}/name", text="")
+    requests_mock.register_uri("post", f"{API_ROOT}vis/mails/m/status", text="")
+
+    p = Plot("foo", token="elide-token", elide_writes=False)
+    p.name = "sales"
+    p.name = "sales"
+
+    m = Mail("m", token="elide-token")
+    m._send()
+    m._send()
+
+    assert len(posts(requests_mock)) == 4
+
+
+def test_persisted_between_processes(requests_mock, tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    requests_mock.register_uri("post", f"{url}/name", text="")
+
+    Plot("foo", token="elide-token", persist_writes=db).name = "sales"
+    Plot("foo", token="elide-token", persist_writes=db).name = "sales"
+    Plot("foo", token="other-token", persist_writes=db).name = "sales"
+
+    assert len(posts(requests_mock)) == 2
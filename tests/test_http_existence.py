@@ -0,0 +1,165 @@
+import pytest
+
+from novem import Plot
+from novem.exceptions import Novem404
+from novem.http import KnownSet, clear_caches, clear_known
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    clear_caches()
+    clear_known()
+    yield
+    clear_caches()
+    clear_known()
+
+
+def methods(requests_mock):
+    return [(r.method, r.path) for r in requests_mock.request_history]
+
+
+def test_constructor_does_not_create(requests_mock):
+    requests_mock.register_uri("post", f"{url}/name", text="")
+
+    p = Plot(id="foo", token="known-token")
+    p.name = "a"
+    p.name = "b"
+
+    assert methods(requests_mock) == [("POST", "/v1/vis/plots/foo/name")] * 2
+
+
+def test_missing_object_is_created_on_404(requests_mock):
+    created = []
+
+    def post(request, context):
+        context.status_code = 200 if created else 404
+        return ""
+
+    def put(request, context):
+        created.append(1)
+        context.status_code = 201
+        return ""
+
+    requests_mock.register_uri("post", f"{url}/name", text=post)
+    requests_mock.register_uri("put", url, text=put)
+    requests_mock.register_uri("get", f"{url}/missing", status_code=404, text="")
+
+    p = Plot(id="foo", token="known-token")
+    p.name = "a"
+
+    assert [m for m, _ in methods(requests_mock)] == ["POST", "PUT", "POST"]
+
+    # known to exist now, so a genuine 404 does not create it again, not
+    # even from a new instance
+    with pytest.raises(Novem404):
+        Plot(id="foo", token="known-token").api_read("/missing")
+
+    assert [m for m, _ in methods(requests_mock)] == ["POST", "PUT", "POST", "GET"]
+
+
+def test_create_false_never_creates(requests_mock):
+    requests_mock.register_uri("get", f"{url}/name", status_code=404, text="")
+
+    with pytest.raises(Novem404):
+        Plot(id="foo", token="known-token", create=False).name
+
+    assert requests_mock.call_count == 1
+
+
+def test_exists(requests_mock):
+    requests_mock.register_uri("head", url, status_code=200)
+    requests_mock.register_uri("head", f"{API_ROOT}vis/plots/bar", status_code=404)
+
+    assert Plot(id="foo", token="known-token").exists()
+    assert not Plot(id="bar", token="known-token").exists()
+
+
+def test_shares_create_first(requests_mock):
+    requests_mock.register_uri("get", f"{url}/shared", status_code=404, json={"message": "not found"})
+    requests_mock.register_uri("put", url, status_code=201)
+    requests_mock.register_uri("put", f"{url}/shared/public", status_code=201)
+
+    p = Plot(id="foo", token="known-token")
+    p.shared = "public"
+
+    assert [m for m, _ in methods(requests_mock)] == ["GET", "PUT", "PUT"]
+
+
+def test_known_persisted_with_disk_cache(requests_mock, tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    requests_mock.register_uri("put", url, status_code=201)
+    requests_mock.register_uri("get", f"{url}/missing", status_code=404, text="")
+
+    Plot(id="foo", token="known-token", disk_cache=db).api_create("")
+
+    # a new process knows that foo exists
+    clear_known()
+    with pytest.raises(Novem404):
+        Plot(id="foo", token="known-token", disk_cache=db).api_read("/missing")
+
+    assert [m for m, _ in methods(requests_mock)] == ["PUT", "GET"]
+
+
+def test_stale_known_entry_is_created_again(requests_mock, tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    created = []
+
+    def post(request, context):
+        context.status_code = 200 if len(created) > 1 else 404
+        return ""
+
+    def put(request, context):
+        created.append(1)
+        context.status_code = 201
+        return ""
+
+    requests_mock.register_uri("put", url, text=put)
+    requests_mock.register_uri("post", f"{url}/name", text=post)
+    requests_mock.register_uri("head", url, status_code=404)
+
+    Plot(id="foo", token="known-token", disk_cache=db).api_create("")
+
+    # foo was deleted elsewhere, the persisted known entry is stale
+    clear_known()
+    Plot(id="foo", token="known-token", disk_cache=db).name = "a"
+
+    assert [m for m, _ in methods(requests_mock)] == ["PUT", "POST", "HEAD", "PUT", "POST"]
+
+    # creating again is still off limits with create=False
+    created.clear()
+    with pytest.raises(Novem404):
+        Plot(id="foo", token="known-token", disk_cache=db, create=False).name = "b"
+
+    assert [m for m, _ in methods(requests_mock)][5:] == ["POST"]
+
+
+def test_missing_path_of_known_object_is_not_created(requests_mock):
+    requests_mock.register_uri("put", url, status_code=201)
+    requests_mock.register_uri("head", url, status_code=200)
+    requests_mock.register_uri("post", f"{url}/mistyped", status_code=404, json={"message": "missing"})
+
+    p = Plot(id="foo", token="known-token")
+    p.api_create("")
+
+    # the object is there, so the 404 is about the path
+    with pytest.raises(Novem404):
+        p.api_write("/mistyped", "x")
+
+    assert [m for m, _ in methods(requests_mock)] == ["PUT", "POST", "HEAD"]
+
+
+def test_known_set_discards_children():
+    known = KnownSet()
+    for u in ["a/orgs/x", "a/orgs/x/groups/y", "a/orgs/xy", "a/orgs/z"]:
+        known.add(u)
+
+    known.discard("a/orgs/x/")
+    assert "a/orgs/x" not in known
+    assert "a/orgs/x/groups/y" not in known
+    assert "a/orgs/xy" in known and "a/orgs/z" in known
+
+    known.discard("a/orgs")
+    assert len(known) == 0 and not known._children
@@ -0,0 +1,114 @@
+import pytest
+import requests
+
+from novem import Plot
+from novem.http import RequestStats, RetryPolicy, TransportResponse, add_hook, path_template, remove_hook
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+def test_path_template():
+    assert path_template(API_ROOT, f"{url}/config/type") == "vis/plots/{id}/config/type"
+    assert path_template(API_ROOT, f"{API_ROOT}users/bob/vis/grids/g1/?a=1") == "users/{user}/vis/grids/{id}"
+    assert path_template(API_ROOT, f"{API_ROOT}admin/orgs/acme/groups/dev/roles") == (
+        "admin/orgs/{org}/groups/{group}/roles"
+    )
+
+
+def test_events_report_calls(requests_mock):
+    events = []
+    requests_mock.register_uri("post", f"{url}/name", text="")
+    requests_mock.register_uri("get", f"{url}/name", [{"status_code": 503, "text": ""}, {"text": "hello"}])
+
+    p = Plot(id="foo", create=False, token="ins-token", hooks=[events.append], retry=RetryPolicy(backoff=0, jitter=0))
+    p.name = "abc"
+    assert p.name == "hello"
+
+    assert [(e.method, e.path, e.status) for e in events] == [
+        ("POST", "vis/plots/{id}/name", 200),
+        ("GET", "vis/plots/{id}/name", 200),
+    ]
+    assert events[0].bytes_sent == 3
+    assert events[1].bytes_received == 5
+    assert events[1].retries == 1
+    assert [e.cache for e in events] == [None, "miss"]
+    assert all(e.total >= 0 for e in events)
+
+
+def test_events_report_errors(requests_mock):
+    events = []
+    requests_mock.register_uri("get", f"{url}/name", exc=requests.exceptions.ConnectionError)
+
+    p = Plot(id="foo", create=False, token="ins-token", hooks=[events.append], retry=RetryPolicy(retries=0))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        p.name
+
+    assert events[0].status is None
+    assert isinstance(events[0].error, requests.exceptions.ConnectionError)
+
+
+def test_failing_hooks_are_logged(requests_mock, caplog):
+    events = []
+    requests_mock.register_uri("get", f"{url}/name", text="hello")
+    requests_mock.register_uri("get", f"{url}/config/type", exc=requests.exceptions.ConnectionError)
+
+    def broken(event):
+        raise ValueError("broken hook")
+
+    p = Plot(id="foo", create=False, token="ins-token", hooks=[broken, events.append], retry=RetryPolicy(retries=0))
+    assert p.name == "hello"
+
+    # the original error is raised, not the one of the hook
+    with pytest.raises(requests.exceptions.ConnectionError):
+        p.type
+
+    assert len(events) == 2
+    assert len([r for r in caplog.records if "request hook" in r.getMessage()]) == 2
+
+
+def test_stats_aggregate_per_endpoint(requests_mock):
+    requests_mock.register_uri("post", f"{url}/config/type", text="")
+    requests_mock.register_uri("post", f"{url}/name", status_code=500, text="{}")
+
+    def cache(request, call_next):
+        if request.method == "GET":
+            request.context["cache"] = "hit"
+            return TransportResponse(200, {}, b"bar")
+        return call_next(request)
+
+    stats = RequestStats()
+    add_hook(stats)
+    try:
+        for id in ["a", "foo", "foo"]:
+            p = Plot(id=id, create=False, token="ins-token", middleware=[cache], retry=RetryPolicy(retries=0))
+            p.type
+            if id == "foo":
+                p.type = "bar"
+        p.api_write("/name", "x")
+    finally:
+        remove_hook(stats)
+
+    summary = dict(stats.summary())
+    assert summary["GET vis/plots/{id}/config/type"].count == 3
+    assert summary["GET vis/plots/{id}/config/type"].cache_hits == 3
+    assert summary["POST vis/plots/{id}/config/type"].count == 2
+    assert summary["POST vis/plots/{id}/name"].errors == 1
+
+    st = summary["POST vis/plots/{id}/config/type"]
+    assert 0 <= st.percentile(50) <= st.percentile(99)
+    assert "POST vis/plots/{id}/config/type" in stats.report()
+
+
+def test_opentelemetry_propagates_context(requests_mock):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+
+    from novem.http import OpenTelemetryMiddleware
+
+    requests_mock.register_uri("get", f"{url}/name", text="x")
+    tracer = TracerProvider().get_tracer("test")
+
+    Plot(id="foo", create=False, token="ins-token", middleware=[OpenTelemetryMiddleware(tracer)]).name
+
+    assert "traceparent" in requests_mock.last_request.headers
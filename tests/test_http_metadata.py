@@ -0,0 +1,58 @@
+from novem import Job, Plot, Repo
+from novem.http import clear_metadata
+from novem.mail import VisSection
+from novem.utils import API_ROOT
+
+
+def test_shortname_read_once(requests_mock):
+    requests_mock.register_uri("get", f"{API_ROOT}vis/plots/p1/shortname", text="ABCDEF\n")
+    requests_mock.register_uri("get", f"{API_ROOT}vis/plots/p1/url", text="https://novem.io/p/ABCDEF")
+
+    plt = Plot("p1", token="meta-token")
+    for _ in range(40):
+        VisSection(plt)
+    assert Plot("p1", token="meta-token").shortname == "ABCDEF"
+    assert plt.url == plt.url
+
+    assert requests_mock.call_count == 2
+
+
+def test_metadata_dropped_on_delete(requests_mock):
+    requests_mock.register_uri("get", f"{API_ROOT}vis/plots/p1/shortname", [{"text": "A"}, {"text": "B"}])
+    requests_mock.register_uri("delete", f"{API_ROOT}vis/plots/p1", text="")
+
+    p = Plot("p1", token="meta-token")
+    assert p.shortname == "A"
+    p.api_delete("")
+    assert p.shortname == "B"
+
+
+def test_whoami_per_token(requests_mock, tmp_path):
+    requests_mock.register_uri("get", f"{API_ROOT}whoami", text="bob")
+
+    j = Job("j1", token="meta-token")
+    assert j.ref("tag:v1") == "/bob/j1:tag:v1"
+    assert Job("j2", token="meta-token").ref("tag:v1") == "/bob/j2:tag:v1"
+    assert requests_mock.call_count == 1
+
+    # persisted with the disk cache, surviving a new process
+    db = str(tmp_path / "cache.sqlite")
+    Job("j1", token="disk-token", disk_cache=db).ref("x")
+    clear_metadata()
+    Job("j1", token="disk-token", disk_cache=db).ref("x")
+    assert requests_mock.call_count == 2
+
+
+def test_job_and_repo_metadata_read_once(requests_mock):
+    requests_mock.register_uri("get", f"{API_ROOT}jobs/j1/url", text="https://novem.io/j/ABC\n")
+    requests_mock.register_uri("get", f"{API_ROOT}jobs/j1/shortname", text="ABC\n")
+    requests_mock.register_uri("get", f"{API_ROOT}repos/r1/url", text="https://novem.io/r/DEF\n")
+    requests_mock.register_uri("get", f"{API_ROOT}repos/r1/shortname", text="DEF\n")
+
+    for _ in range(3):
+        j = Job("j1", token="meta-token")
+        assert (j.url, j.shortname) == ("https://novem.io/j/ABC", "ABC")
+        r = Repo("r1", token="meta-token")
+        assert (r.url, r.shortname) == ("https://novem.io/r/DEF", "DEF")
+
+    assert requests_mock.call_count == 4
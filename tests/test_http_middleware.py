@@ -0,0 +1,42 @@
+from novem import Job, Plot
+from novem.http import TransportResponse, add_middleware, remove_middleware
+from novem.utils import API_ROOT
+
+
+def test_middleware_order_and_modification(requests_mock):
+    seen = []
+    requests_mock.register_uri("post", f"{API_ROOT}vis/plots/foo/name", text="")
+
+    def outer(request, call_next):
+        seen.append("outer")
+        request.headers["X-Test"] = "1"
+        r = call_next(request)
+        seen.append("outer done")
+        return r
+
+    def inner(request, call_next):
+        seen.append(f"inner {request.method} {request.headers['X-Test']}")
+        return call_next(request)
+
+    add_middleware(outer)
+    try:
+        p = Plot(id="foo", create=False, token="mw-token", middleware=[inner])
+        p.name = "x"
+    finally:
+        remove_middleware(outer)
+
+    assert seen == ["outer", "inner POST 1", "outer done"]
+    assert requests_mock.last_request.headers["X-Test"] == "1"
+
+
+def test_middleware_can_answer_requests(requests_mock):
+    def cached(request, call_next):
+        if request.method == "GET":
+            return TransportResponse(200, {}, b"from cache", url=request.url)
+        return call_next(request)
+
+    # applies to all resource types through the same pipeline
+    assert Plot(id="foo", create=False, token="mw-token", middleware=[cached]).name == "from cache"
+    assert Job(id="foo", create=False, token="mw-token", middleware=[cached]).name == "from cache"
+
+    assert requests_mock.call_count == 0
@@ -0,0 +1,94 @@
+from novem import Grid, Plot
+from novem.api_ref import NovemAPI
+from novem.http import SessionPool, configure_pool
+from novem.http.pool import DEFAULT_IDLE_TIMEOUT, DEFAULT_POOL_SIZE, _pool
+from novem.utils import API_ROOT, get_config_path
+
+
+def test_objects_share_session():
+    p1 = Plot(id="p1", create=False, token="pool-token")
+    p2 = Plot(id="p2", create=False, token="pool-token")
+    g = Grid(id="g1", create=False, token="pool-token")
+
+    assert p1._transport.session is p2._transport.session
+    assert p1._transport.session is g._transport.session
+    assert p1._transport.session.headers["Authorization"] == "Bearer pool-token"
+
+
+def test_sessions_keyed_by_settings():
+    a = Plot(id="p1", create=False, token="pool-token-a")
+    b = Plot(id="p1", create=False, token="pool-token-b")
+    c = Plot(id="p1", create=False, token="pool-token-a", ignore_ssl=True)
+    d = Plot(id="p1", create=False, token="pool-token-a", is_cli=True)
+
+    assert a._transport.session is not b._transport.session
+    assert a._transport.session is not c._transport.session
+    assert a._transport.session is not d._transport.session
+    assert c._transport.session.verify is False
+    assert d._transport.session.headers["User-Agent"].startswith("NovemCli/")
+
+
+def test_idle_sessions_are_evicted():
+    pool = SessionPool(idle_timeout=0)
+
+    s1 = pool.get(API_ROOT, "tok")
+    assert len(pool) == 1
+
+    # an idle timeout of zero evicts the previous session on the next lookup
+    s2 = pool.get(API_ROOT, "other")
+    assert len(pool) == 1
+    assert pool.evict_idle() == 1
+    assert len(pool) == 0
+    assert s1 is not s2
+
+    pool.configure(idle_timeout=300)
+    assert pool.get(API_ROOT, "tok") is pool.get(API_ROOT, "tok")
+
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_create_token_uses_pool_without_auth(requests_mock):
+    novem = NovemAPI(api_root=API_ROOT, token="pool-token")
+
+    def verify(request, context):
+        assert "Authorization" not in request.headers
+        assert request.headers["User-Agent"].startswith("NovemLib/")
+        return {"token": "new", "token_name": "name"}
+
+    requests_mock.register_uri("post", f"{API_ROOT}token", json=verify)
+
+    assert novem.create_token({"username": "a", "password": "b"})["token"] == "new"
+
+
+def test_pool_settings_from_profile(fs):
+    config_dir, config_path = get_config_path()
+    fs.create_file(
+        config_path,
+        contents=f"""\
+[general]
+api_root = {API_ROOT}
+profile = demo
+
+[profile:demo]
+username = demo
+token = pool-token
+pool_size = 32
+pool_idle_timeout = 60
+
+[app:cli]
+version = 0.5.0
+""",
+    )
+
+    try:
+        p = Plot(id="foo", create=False)
+        assert (_pool.pool_size, _pool.idle_timeout) == (32, 60.0)
+        adapter = p._transport.session.get_adapter(API_ROOT)
+        assert adapter._pool_maxsize == 32
+
+        # object kwargs take precedence over the profile
+        Plot(id="foo", create=False, pool_size=4)
+        assert (_pool.pool_size, _pool.idle_timeout) == (4, 60.0)
+    finally:
+        configure_pool(pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT)
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from novem import Plot
+from novem.http import RateLimiter, get_limiter
+from novem.utils import API_ROOT
+
+
+def test_token_bucket_limits_rate():
+    limiter = RateLimiter(rate=50, burst=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+
+    # first token is free, the next five need 1/50th of a second each
+    assert time.monotonic() - start >= 0.09
+
+
+def test_max_in_flight():
+    limiter = RateLimiter(max_in_flight=2)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def worker():
+        with limiter.slot():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max(peak) == 2
+
+
+def test_shared_bucket_between_limiters(tmp_path):
+    # two limiters on the same lock path behave like two processes
+    path = str(tmp_path / "limiter")
+    a = RateLimiter(rate=10, burst=1, lock_path=path)
+    b = RateLimiter(rate=10, burst=1, lock_path=path)
+
+    start = time.monotonic()
+    a.wait()
+    b.wait()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_shared_slots_between_limiters(tmp_path):
+    path = str(tmp_path / "limiter")
+    a = RateLimiter(max_in_flight=1, lock_path=path)
+    b = RateLimiter(max_in_flight=1, lock_path=path)
+
+    acquired = threading.Event()
+
+    def other():
+        with b.slot():
+            acquired.set()
+
+    with a.slot():
+        t = threading.Thread(target=other)
+        t.start()
+        assert not acquired.wait(0.05)
+
+    assert acquired.wait(1)
+    t.join()
+
+
+def test_limiters_are_shared_per_api_root(requests_mock):
+    assert get_limiter(API_ROOT) is None
+
+    p1 = Plot(id="foo", create=False, token="limit-token", rate_limit=100)
+    p2 = Plot(id="bar", create=False, token="limit-token", rate_limit=100)
+    assert p1._limiter is not None
+    assert p1._limiter is p2._limiter
+
+    requests_mock.register_uri("get", f"{API_ROOT}vis/plots/foo/name", text="name")
+    assert p1.name == "name"
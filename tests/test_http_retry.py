@@ -0,0 +1,138 @@
+import pytest
+import requests
+
+from novem import Mail, Plot
+from novem.http import NO_RETRY, RetryPolicy
+from novem.http.retry import parse_retry_after
+from novem.utils import API_ROOT, get_config_path
+
+fast = RetryPolicy(backoff=0, jitter=0)
+
+
+def test_reads_are_retried(requests_mock):
+    url = f"{API_ROOT}vis/plots/foo/config/type"
+    requests_mock.register_uri(
+        "get",
+        url,
+        [
+            {"status_code": 503, "text": "unavailable"},
+            {"status_code": 502, "text": "bad gateway"},
+            {"status_code": 200, "text": "bar"},
+        ],
+    )
+
+    p = Plot(id="foo", create=False, token="retry-token", retry=fast)
+    assert p.type == "bar"
+    assert requests_mock.call_count == 3
+
+
+def test_value_writes_are_retried(requests_mock):
+    url = f"{API_ROOT}vis/plots/foo/name"
+    requests_mock.register_uri("post", url, [{"status_code": 500, "json": {}}, {"status_code": 200}])
+
+    # writing a whole value is idempotent, even though it is a POST
+    p = Plot(id="foo", create=False, token="retry-token", retry=fast)
+    p.name = "x"
+    assert requests_mock.call_count == 2
+
+
+def test_action_writes_are_not_retried(requests_mock):
+    url = f"{API_ROOT}vis/mails/foo/status"
+    requests_mock.register_uri("post", url, [{"status_code": 500, "json": {}}, {"status_code": 200}])
+
+    # the server may have sent the mail before failing
+    m = Mail(id="foo", create=False, token="retry-token", retry=fast)
+    m.api_write("/status", "sending")
+    assert requests_mock.call_count == 1
+
+
+def test_raw_writes_only_retried_on_429(requests_mock):
+    url = f"{API_ROOT}vis/plots/foo/name"
+    requests_mock.register_uri("post", url, [{"status_code": 500, "json": {}}, {"status_code": 200}])
+
+    p = Plot(id="foo", create=False, token="retry-token", retry=fast)
+    p.write("vis/plots/foo/name", "x")
+    assert requests_mock.call_count == 1
+
+    requests_mock.reset()
+    requests_mock.register_uri(
+        "post",
+        url,
+        [{"status_code": 429, "headers": {"Retry-After": "0"}, "json": {}}, {"status_code": 200}],
+    )
+    p.write("vis/plots/foo/name", "x")
+    assert requests_mock.call_count == 2
+
+
+def test_retries_can_be_disabled(requests_mock):
+    url = f"{API_ROOT}vis/plots/foo/name"
+    requests_mock.register_uri("get", url, [{"status_code": 503}, {"status_code": 200, "text": "ok"}])
+
+    p = Plot(id="foo", create=False, token="retry-token", retry=NO_RETRY)
+    p.name
+    assert requests_mock.call_count == 1
+
+
+def test_policy_gives_up_after_retries():
+    sleeps = []
+    calls = []
+
+    def send():
+        calls.append(1)
+        raise requests.ConnectionError("nope")
+
+    with pytest.raises(requests.ConnectionError):
+        RetryPolicy(retries=2, backoff=1, jitter=0).execute("GET", send, sleep=sleeps.append)
+
+    assert len(calls) == 3
+    assert sleeps == [1, 2]
+
+
+def test_policy_respects_max_time():
+    sleeps = []
+    r = requests.Response()
+    r.status_code = 503
+    r.headers["Retry-After"] = "120"
+
+    res = RetryPolicy(max_time=60).execute("GET", lambda: r, sleep=sleeps.append)
+    assert res is r
+    assert sleeps == []
+
+
+def test_retry_after_parsing():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("garbage") is None
+
+
+def test_policy_from_profile(fs):
+    config_dir, config_path = get_config_path()
+    fs.create_file(
+        config_path,
+        contents=f"""\
+[general]
+api_root = {API_ROOT}
+profile = demo
+
+[profile:demo]
+username = demo
+token = retry-token
+retries = 5
+retry_backoff = 0.1
+retry_methods = GET, POST
+
+[app:cli]
+version = 0.5.0
+""",
+    )
+
+    p = Plot(id="foo", create=False)
+    assert p._retry.retries == 5
+    assert p._retry.backoff == 0.1
+    assert p._retry.methods == frozenset({"GET", "POST"})
+
+    # object kwargs take precedence over the profile
+    p = Plot(id="foo", create=False, retries=1)
+    assert p._retry.retries == 1
+    assert p._retry.backoff == 0.1
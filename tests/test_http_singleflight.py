@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from novem import Plot
+from novem.http import Singleflight, clear_caches, get_group
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def test_threads_share_one_call(requests_mock):
+    def cb(request, context):
+        time.sleep(0.2)
+        return "bar"
+
+    requests_mock.register_uri("get", f"{url}/config/type", text=cb)
+
+    group = get_group(API_ROOT, "flight-token")
+    before = group.stats.deduplicated
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def work():
+        p = Plot(id="foo", create=False, token="flight-token")
+        barrier.wait()
+        results.append(p.type)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["bar"] * 8
+    assert requests_mock.call_count < 8
+    assert group.stats.deduplicated - before == 8 - requests_mock.call_count
+
+
+def test_errors_are_shared_and_not_remembered():
+    group = Singleflight()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        group.do("k", fail)
+    assert group.do("k", lambda: 1) == 1
+    assert group.stats.calls == 2
+    assert group.stats.deduplicated == 0
+
+
+def test_coalescing_can_be_disabled(requests_mock):
+    requests_mock.register_uri("get", f"{url}/name", text="foo")
+
+    p = Plot(id="foo", create=False, token="flight-token", coalesce=False, cache=False)
+    p.name
+    p.name
+
+    assert requests_mock.call_count == 2
+
+
+def test_async_tasks_share_one_call():
+    httpx = pytest.importorskip("httpx")
+    from novem.aio import AsyncPlot
+
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text="bar")
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        p = AsyncPlot("foo", token="aflight-token", client=client)
+        return await asyncio.gather(*[p.api_read("/config/type") for _ in range(10)])
+
+    group = get_group(API_ROOT, "aflight-token")
+    before = group.stats.deduplicated
+
+    assert asyncio.run(run()) == ["bar"] * 10
+    assert len(calls) == 1
+    assert group.stats.deduplicated - before == 9
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+import requests
+
+from novem import Plot
+from novem.exceptions import NovemTimeout
+from novem.http import Deadline, Timeout, current_deadline
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+def capture_timeouts(requests_mock, method, path, seen):
+    def cb(request, context):
+        seen.append(request.timeout)
+        return ""
+
+    requests_mock.register_uri(method, f"{url}{path}", text=cb)
+
+
+def test_default_object_and_call_timeouts(requests_mock):
+    seen = []
+    capture_timeouts(requests_mock, "get", "/name", seen)
+
+    Plot(id="foo", create=False, token="tmo-token").name
+    Plot(id="foo", create=False, token="tmo-token", connect_timeout=1, read_timeout=2).name
+    Plot(id="foo", create=False, token="tmo-token", timeout=3).api_read("/name", timeout=(4, 5))
+
+    assert seen == [(10.0, 120.0), (1.0, 2.0), (4, 5)]
+
+
+def test_deadline_clamps_timeouts(requests_mock):
+    seen = []
+    capture_timeouts(requests_mock, "post", "/name", seen)
+
+    p = Plot(id="foo", create=False, token="tmo-token")
+    with Deadline(5):
+        p.name = "x"
+
+    connect, read = seen[0]
+    assert 0 < connect <= 5
+    assert 0 < read <= 5
+
+
+def test_expired_deadline_fails_fast(requests_mock):
+    requests_mock.register_uri("post", f"{url}/config/type", text="")
+
+    p = Plot(id="foo", create=False, token="tmo-token")
+    p.freeze()
+    p.type = "bar"
+
+    with pytest.raises(NovemTimeout):
+        p.run(deadline=0)
+
+    assert requests_mock.call_count == 0
+    assert current_deadline() is None
+
+
+def test_request_timeouts_are_novem_exceptions(requests_mock):
+    requests_mock.register_uri("get", f"{url}/name", exc=requests.exceptions.ReadTimeout)
+
+    p = Plot(id="foo", create=False, token="tmo-token")
+    with pytest.raises(NovemTimeout):
+        p.name
+
+
+def test_nested_deadlines_only_shorten():
+    with Deadline(1) as outer:
+        with Deadline(100):
+            assert current_deadline() is outer
+        with Deadline(0.5) as inner:
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+
+
+def test_timeout_clamp():
+    d = Deadline(2)
+    time.sleep(0.01)
+    connect, read = Timeout(connect=1, read=None).clamp(d)
+    assert connect == 1
+    assert read < 2
@@ -0,0 +1,151 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+from novem import Plot
+from novem.api_ref import NovemAPI
+from novem.exceptions import Novem404, NovemTimeout
+from novem.http import ASGITransport, HTTP2Transport, RequestsTransport, WSGITransport, get_transport
+from novem.utils import API_ROOT
+
+
+class Store(object):
+    """
+    Tiny in-memory version of the plot api
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.seen = []
+
+    def handle(self, method, path, headers, body):
+        self.seen.append((method, path, headers.get("authorization")))
+
+        if method == "PUT":
+            return 201, b""
+        if method == "POST" and path.endswith("/token"):
+            return 200, json.dumps({"token": "new"}).encode()
+        if method == "POST":
+            self.values[path] = body
+            return 200, b""
+        if method == "GET" and path in self.values:
+            return 200, self.values[path]
+
+        return 404, json.dumps({"message": path}).encode()
+
+
+def wsgi_app(store):
+    def app(environ, start_response):
+        headers = {k[5:].lower().replace("_", "-"): v for k, v in environ.items() if k.startswith("HTTP_")}
+        body = environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+        status, content = store.handle(environ["REQUEST_METHOD"], environ["PATH_INFO"], headers, body)
+        start_response(f"{status} X", [("Content-Type", "text/plain")])
+        return [content]
+
+    return app
+
+
+def asgi_app(store):
+    async def app(scope, receive, send):
+        headers = {k.decode(): v.decode() for k, v in scope["headers"]}
+        body = (await receive())["body"]
+        status, content = store.handle(scope["method"], scope["path"], headers, body)
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": content})
+
+    return app
+
+
+@pytest.mark.parametrize("make", [lambda s: WSGITransport(wsgi_app(s)), lambda s: ASGITransport(asgi_app(s))])
+def test_in_process_transports(make):
+    store = Store()
+    transport = make(store)
+
+    p = Plot(id="foo", token="tr-token", transport=transport)
+    p.name = "hello"
+    assert p.name == "hello"
+
+    with pytest.raises(Novem404):
+        p.api_read("/missing")
+
+    # creation is deferred, the object already exists after the first write
+    assert [x[0] for x in store.seen] == ["POST", "GET", "GET"]
+    assert store.seen[1][1] == "/v1/vis/plots/foo/name"
+    assert all(x[2] == "Bearer tr-token" for x in store.seen)
+
+    transport.close()
+
+
+def test_asgi_timeout():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await asyncio.sleep(10)
+
+    transport = ASGITransport(app)
+    with pytest.raises(requests.ReadTimeout):
+        transport.request("GET", f"{API_ROOT}whoami", timeout=(1, 0.05))
+
+    # handled like a timeout of any other transport
+    p = Plot(id="foo", token="tr-token", transport=transport)
+    with pytest.raises(NovemTimeout):
+        p.api_read("/name", timeout=0.05)
+    assert calls == ["/v1/whoami", "/v1/vis/plots/foo/name"]
+
+    transport.close()
+
+
+def test_token_request_drops_authorization():
+    store = Store()
+    api = NovemAPI(token="tr-token", transport=WSGITransport(wsgi_app(store)))
+
+    assert api.create_token({"username": "x"}) == {"token": "new"}
+
+    assert store.seen == [("POST", "/v1/token", None)]
+
+
+def test_http2_transport():
+    httpx = pytest.importorskip("httpx")
+
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.headers.get("authorization"), request.content))
+        if request.method == "GET":
+            return httpx.Response(200, text="bar")
+        return httpx.Response(200)
+
+    transport = HTTP2Transport(client=httpx.Client(transport=httpx.MockTransport(handler)))
+    p = Plot(id="foo", token="tr-token", transport=transport)
+    p.type = "bar"
+
+    assert p.type == "bar"
+    assert seen == [
+        ("POST", "Bearer tr-token", b"bar"),
+        ("GET", "Bearer tr-token", b""),
+    ]
+
+
+def test_http2_errors_map_to_requests():
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request):
+        raise httpx.ConnectError("down")
+
+    transport = HTTP2Transport(client=httpx.Client(transport=httpx.MockTransport(handler)))
+    with pytest.raises(requests.ConnectionError):
+        transport.request("GET", f"{API_ROOT}whoami")
+
+
+def test_get_transport():
+    assert isinstance(get_transport(None, API_ROOT, "t"), RequestsTransport)
+    assert isinstance(get_transport("requests", API_ROOT, "t"), RequestsTransport)
+
+    wsgi = WSGITransport(wsgi_app(Store()))
+    assert get_transport(wsgi, API_ROOT, "t") is wsgi
+
+    with pytest.raises(ValueError):
+        get_transport("carrier-pigeon", API_ROOT, "t")
@@ -62,7 +62,6 @@ def test_job_properties(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "name_read": False,
         "name_write": False,
         "description_read": False,
@@ -177,7 +176,6 @@ def test_job_config(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "type_read": False,
         "type_write": False,
         "extract_read": False,
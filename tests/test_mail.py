@@ -541,7 +541,6 @@ def test_all_mail_attribs(requests_mock):
     summary_val = "summary test value"
 
     gcheck = {
-        "create": False,
         "theme": False,
         "subject": False,
         "template": False,
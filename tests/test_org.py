@@ -20,7 +20,6 @@ def test_org_profile_prop(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "desc": False,
         "name": False,
         "is_open": False,
@@ -150,7 +149,6 @@ def test_org_profile_dict(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "desc": False,
         "name": False,
         "is_open": False,
@@ -22,7 +22,6 @@ def test_org_group_profile_prop(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "desc": False,
         "name": False,
         "is_open": False,
@@ -189,7 +188,6 @@ def test_org_group_profile_dict(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "desc": False,
         "name": False,
         "is_open": False,
@@ -36,7 +36,6 @@ def test_plot(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "type": False,
         "desc": False,
         "name": False,
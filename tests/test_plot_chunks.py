@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from novem import Plot
+from novem.exceptions import NovemException
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+def frames(n=3, rows=4):
+    return [
+        pd.DataFrame({"a": range(i * rows, (i + 1) * rows), "b": 0.5}, index=range(i * rows, (i + 1) * rows))
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def server(requests_mock):
+    received = {}
+
+    def post(request, context):
+        received["encoding"] = request.headers.get("Transfer-Encoding")
+        received["chunks"] = [bytes(c) for c in request.body]
+        return ""
+
+    requests_mock.register_uri("put", url, status_code=201)
+    requests_mock.register_uri("post", f"{url}/data", text=post)
+    return received
+
+
+def test_chunks_are_streamed(server, requests_mock):
+    parts = frames()
+
+    events = []
+    Plot("foo", token="chunk-token", hooks=[events.append]).set_data_chunks(iter(parts))
+
+    body = b"".join(server["chunks"])
+    assert server["encoding"] == "chunked"
+    assert body == pd.concat(parts).to_csv().encode("utf-8")
+    assert body.count(b",a,b") == 1
+
+    # created first, as the body can't be sent twice
+    assert [r.method for r in requests_mock.request_history] == ["PUT", "POST"]
+    assert events[-1].bytes_sent == len(body)
+
+
+def test_one_chunk_in_memory(server, requests_mock):
+    pulled = []
+
+    def source():
+        for part in frames():
+            pulled.append(1)
+            yield part
+
+    def post(request, context):
+        # every chunk is produced as it is sent
+        for i, _ in enumerate(request.body):
+            assert len(pulled) == i + 1
+        return ""
+
+    requests_mock.register_uri("post", f"{url}/data", text=post)
+    Plot("foo", token="chunk-token", create=False).set_data_chunks(source())
+    assert len(pulled) == 3
+
+
+def test_partitions(server):
+    parts = frames()
+
+    class Partition(object):
+        def __init__(self, df):
+            self.df = df
+
+        def compute(self):
+            return self.df
+
+    class Partitioned(object):
+        npartitions = len(parts)
+        partitions = [Partition(p) for p in parts]
+
+    Plot("foo", token="chunk-token", create=False).set_data_chunks(Partitioned(), float_precision=2)
+
+    assert b"".join(server["chunks"]) == pd.concat(parts).to_csv(float_format="%.2f").encode("utf-8")
+
+
+def test_mismatched_chunks(server):
+    parts = frames(2)
+    parts[1] = parts[1].rename(columns={"b": "c"})
+
+    with pytest.raises(ValueError):
+        Plot("foo", token="chunk-token", create=False).set_data_chunks(parts)
+
+
+def test_frozen():
+    p = Plot("foo", token="chunk-token")
+    p.freeze()
+
+    with pytest.raises(NovemException):
+        p.set_data_chunks(frames())
@@ -38,7 +38,6 @@ def test_plot(requests_mock):
     # need to verify that assertions are called
 
     gcheck = {
-        "create": False,
         "type": False,
         "desc": False,
         "name": False,
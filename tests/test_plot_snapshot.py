@@ -0,0 +1,78 @@
+import json
+
+from novem import Plot
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+def node(name, type="file"):
+    return {"name": name, "type": type, "permissions": ["r", "w"]}
+
+
+def register_tree(requests_mock):
+    requests_mock.register_uri(
+        "get",
+        f"{url}/",
+        text=json.dumps([node("name"), node("data"), node("config", "dir"), node("files", "dir")]),
+    )
+    requests_mock.register_uri(
+        "get",
+        f"{url}/config/",
+        text=json.dumps([node("type"), node("title"), node("legend", "dir"), node("colors", "dir")]),
+    )
+    requests_mock.register_uri("get", f"{url}/config/legend/", text=json.dumps([node("position")]))
+    requests_mock.register_uri("get", f"{url}/config/colors/", text=json.dumps([node("colors")]))
+
+    for path, value in [
+        ("/name", "sales"),
+        ("/config/type", "bar\n"),
+        ("/config/title", "Sales"),
+        ("/config/legend/position", "top"),
+        ("/config/colors/colors", "S 0 bg blue"),
+    ]:
+        requests_mock.register_uri("get", f"{url}{path}", text=value)
+
+
+def test_snapshot_serves_reads(requests_mock):
+    register_tree(requests_mock)
+    requests_mock.register_uri("post", f"{url}/config/title", text="")
+
+    p = Plot("foo", token="snap-token", cache=False)
+    with p.snapshot():
+        fetched = requests_mock.call_count
+
+        assert p.name == "sales"
+        assert p.type == "bar"
+        assert p.title == "Sales"
+        assert p.config.legend.position == "top"
+        assert str(p.colors) == "S 0 bg blue"
+
+        # writes update the snapshot
+        p.title = "Revenue"
+        assert p.title == "Revenue"
+
+        assert requests_mock.call_count == fetched + 1
+
+    # data and the files folder are never fetched
+    paths = [r.path for r in requests_mock.request_history]
+    assert "/v1/vis/plots/foo/data" not in paths
+    assert "/v1/vis/plots/foo/files/" not in paths
+
+    # back to reading the api
+    p.name
+    assert requests_mock.call_count == fetched + 2
+
+
+def test_prefetch_paths(requests_mock):
+    register_tree(requests_mock)
+
+    p = Plot("foo", token="snap-token", cache=False)
+    p.prefetch(["/config/type", "/name"])
+    assert requests_mock.call_count == 2
+
+    p.freeze()
+    p.name = "pending"
+    assert p.name == "pending"
+    assert p.type == "bar"
+    assert requests_mock.call_count == 2
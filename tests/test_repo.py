@@ -100,7 +100,6 @@ def test_repo_properties(requests_mock):
     api_root = config["general"]["api_root"]
 
     gcheck = {
-        "create": False,
         "name_read": False,
         "name_write": False,
         "description_read": False,
@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+
+import novem.serialize.arrow as arrow
+from novem import Plot
+from novem.serialize.arrow import ARROW, PARQUET, parse_accept_post, reset_negotiation
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo/data"
+
+
+@pytest.fixture
+def binary(monkeypatch):
+    # pretend pyarrow is installed, encoding is replaced where it matters
+    reset_negotiation()
+    monkeypatch.setattr(arrow, "pa", object())
+    yield
+    reset_negotiation()
+
+
+def test_parse_accept_post():
+    assert parse_accept_post(None) == set()
+    assert parse_accept_post("text/csv, Application/Vnd.Apache.Parquet;q=0.5,") == {"text/csv", PARQUET}
+
+
+def test_negotiation(binary, requests_mock):
+    requests_mock.register_uri("options", url, headers={"Accept-Post": f"text/csv, {PARQUET}"})
+
+    assert Plot("foo", token="known-token")._data_media_type() == PARQUET
+
+    # asked once per api_root
+    assert Plot("bar", token="known-token")._data_media_type() == PARQUET
+    assert requests_mock.call_count == 1
+
+
+def test_csv_only_server(binary, requests_mock):
+    requests_mock.register_uri("options", url, status_code=405)
+
+    assert Plot("foo", token="known-token")._data_media_type() is None
+
+    # remembered
+    assert Plot("foo", token="known-token")._data_media_type() is None
+    assert requests_mock.call_count == 1
+
+
+@pytest.mark.parametrize("status", [404, 503])
+def test_failed_probe_is_not_cached(binary, requests_mock, status):
+    requests_mock.register_uri("options", url, status_code=status)
+
+    assert Plot("foo", token="known-token")._data_media_type() is None
+
+    # e.g. the plot has been created since, asked again
+    calls = requests_mock.call_count
+    requests_mock.register_uri("options", url, headers={"Accept-Post": PARQUET})
+    assert Plot("foo", token="known-token")._data_media_type() == PARQUET
+    assert Plot("foo", token="known-token")._data_media_type() == PARQUET
+    assert requests_mock.call_count == calls + 1
+
+
+def test_data_format_setting(binary, requests_mock):
+    assert Plot("foo", token="known-token", data_format="csv")._data_media_type() is None
+    assert Plot("foo", token="known-token", data_format="arrow")._data_media_type() == ARROW
+    assert requests_mock.call_count == 0
+
+    with pytest.raises(ValueError):
+        Plot("foo", token="known-token", data_format="xml")
+
+
+def test_unsupported_media_type_falls_back_to_csv(binary, requests_mock, monkeypatch):
+    monkeypatch.setattr("novem.vis.plot.to_table", lambda data: data)
+    monkeypatch.setattr("novem.vis.plot.encode_table", lambda table, media_type: b"columnar")
+
+    def post(request, context):
+        context.status_code = 415 if request.headers["Content-type"] == ARROW else 200
+        return ""
+
+    requests_mock.register_uri("options", url, headers={"Accept-Post": ARROW})
+    requests_mock.register_uri("post", url, text=post)
+
+    df = pd.DataFrame({"a": [1, 2]})
+    Plot("foo", token="known-token")(df)
+    assert [r.body for r in requests_mock.request_history[1:]] == [b"columnar", b",a\n0,1\n1,2\n"]
+
+    # the server is known not to take arrow now
+    Plot("foo", token="known-token")(df.assign(a=[3, 4]))
+    assert requests_mock.last_request.headers["Content-type"] == "text/plain"
+    assert requests_mock.call_count == 4
+
+
+def test_arrow_round_trip():
+    pa = pytest.importorskip("pyarrow")
+
+    df = pd.DataFrame({"a": [1.5, 2.5], "b": ["x", "y"]})
+    data = arrow.encode_table(arrow.to_table(df), ARROW)
+
+    assert pa.ipc.open_stream(data).read_all().to_pandas().equals(df)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from novem import Plot
+from novem.serialize import serialize_csv, to_csv_bytes
+from novem.utils import API_ROOT
+
+
+def mixed_frame(n=200):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        {
+            "float": rng.normal(size=n) * 10.0 ** rng.integers(-20, 20, n),
+            "float32": rng.normal(size=n).astype("float32"),
+            "int": rng.integers(-5, 5, n),
+            "bool": rng.integers(0, 2, n).astype(bool),
+            "text": rng.choice(["a", "b,c", 'x"y', "new\nline", None, ""], n),
+            "object": rng.choice(np.array([1, "x", 2.5, None, True], dtype=object), n),
+            "seconds": pd.to_datetime(rng.integers(0, 10**9, n), unit="s"),
+            "dates": pd.to_datetime(rng.integers(0, 10**4, n) * 86400, unit="s"),
+            "millis": pd.to_datetime(rng.integers(0, 10**12, n), unit="ms"),
+            "nanos": pd.to_datetime(rng.integers(0, 10**18, n), unit="ns"),
+        }
+    )
+    df.loc[::7, "float"] = np.nan
+    df.loc[::5, "seconds"] = pd.NaT
+    df.loc[::3, "dates"] = pd.NaT
+    return df
+
+
+def test_matches_to_csv():
+    df = mixed_frame()
+    assert to_csv_bytes(df) == df.to_csv().encode("utf-8")
+
+    # a datetime index and named labels
+    ix = df.set_index("seconds")
+    ix.columns.name = "cols"
+    assert to_csv_bytes(ix) == ix.to_csv().encode("utf-8")
+
+    # labels that need quoting
+    odd = pd.DataFrame({"a,b": [1.5], 3: [2]})
+    assert to_csv_bytes(odd) == odd.to_csv().encode("utf-8")
+
+    # missing labels are left empty, a bare carriage return is only quoted
+    # if it is part of the line terminator
+    missing = pd.DataFrame([[1, "x\ry", 2]], columns=[np.nan, "cr", None])
+    assert to_csv_bytes(missing) == missing.to_csv().encode("utf-8")
+
+    empty = pd.DataFrame({"a": []})
+    assert to_csv_bytes(empty) == empty.to_csv().encode("utf-8")
+
+
+def test_chunks(monkeypatch):
+    import novem.serialize.csv as module
+
+    df = mixed_frame(50)
+    monkeypatch.setattr(module, "CHUNK_ROWS", 7)
+    assert to_csv_bytes(df) == df.to_csv().encode("utf-8")
+
+
+def test_fallback_to_pandas():
+    df = pd.DataFrame({"a": [1.25, None], "c": pd.Categorical(["q", "r"])})
+    assert to_csv_bytes(df) == df.to_csv().encode("utf-8")
+
+    multi = df.set_index(["a", "c"], append=True)
+    assert to_csv_bytes(multi) == multi.to_csv().encode("utf-8")
+
+    # per column precision also applies when pandas does the work
+    assert to_csv_bytes(df, {"a": 1}) == b",a,c\n0,1.2,q\n1,,r\n"
+
+
+def test_float_precision():
+    df = pd.DataFrame({"a": [1.234, np.nan], "b": [2.0, 3.14159]})
+
+    assert to_csv_bytes(df, 2) == df.to_csv(float_format="%.2f").encode("utf-8")
+    assert to_csv_bytes(df, {"b": 1}) == b",a,b\n0,1.234,2.0\n1,,3.1\n"
+
+
+def test_serialize_csv():
+    class Frame(object):
+        def to_csv(self):
+            return "a,b\n1,2\n"
+
+    assert serialize_csv("a\n1\n") == b"a\n1\n"
+    assert serialize_csv(Frame()) == b"a,b\n1,2\n"
+    assert serialize_csv(3) == b"3"
+
+
+def test_plot_sends_serialized_bytes(requests_mock):
+    url = f"{API_ROOT}vis/plots/foo/data"
+    requests_mock.register_uri("post", url, text="")
+
+    df = pd.DataFrame({"x": [0.5, 1.0 / 3.0]})
+    Plot("foo", token="known-token")(df, float_precision={"x": 3})
+
+    assert requests_mock.last_request.body == b",x\n0,0.500\n1,0.333\n"
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from novem import Plot
+from novem.serialize.fingerprint import fingerprint
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+def test_fingerprint():
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": ["x", "y"]})
+    same = fingerprint(df)
+
+    assert fingerprint(df.copy()) == same
+    assert fingerprint(df, 2) != same
+    assert fingerprint(df.assign(a=[1.0, 3.0])) != same
+    assert fingerprint(df.astype({"a": "float32"})) != same
+    assert fingerprint(df.rename(columns={"b": "c"})) != same
+    assert fingerprint(df.set_axis(["r", "s"])) != same
+
+    assert fingerprint("a,b\n1,2\n") is None
+    assert fingerprint(pd.DataFrame({"a": [[1], [2]]})) is None
+
+
+def test_unchanged_frames_are_not_serialized(requests_mock, monkeypatch):
+    serialized = []
+
+    def serialize(data, precision=None, columns=None):
+        serialized.append(1)
+        return data.to_csv().encode("utf-8")
+
+    monkeypatch.setattr("novem.vis.plot.serialize_csv", serialize)
+    requests_mock.register_uri("post", f"{url}/data", text="")
+    requests_mock.register_uri("get", f"{url}/data", text="edited elsewhere")
+
+    df = pd.DataFrame({"a": [1, 2]})
+    p = Plot("foo", token="fingerprint-token")
+    p(df)
+    p(df)
+    Plot("foo", token="fingerprint-token")(df)
+    assert (len(serialized), requests_mock.call_count) == (2, 2)
+
+    # changed in place
+    df.loc[0, "a"] = 5
+    p(df)
+    p(df)
+    assert (len(serialized), requests_mock.call_count) == (3, 3)
+
+    # reading something else from the server resets it
+    p.data
+    p(df)
+    assert (len(serialized), requests_mock.call_count) == (4, 5)
+
+
+def test_persisted_fingerprints(requests_mock, tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    requests_mock.register_uri("post", f"{url}/data", text="")
+
+    df = pd.DataFrame({"a": [1, 2]})
+    Plot("foo", token="fingerprint-token", persist_writes=db)(df)
+    Plot("foo", token="fingerprint-token", persist_writes=db)(df)
+
+    assert requests_mock.call_count == 1
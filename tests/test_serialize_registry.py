@@ -0,0 +1,87 @@
+import sys
+import types
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import novem.serialize.registry as registry
+from novem import Plot
+from novem.serialize import get_serializer, register, serialize_csv, unregister
+from novem.utils import API_ROOT
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(registry, "_serializers", dict(registry._serializers))
+    monkeypatch.setattr(registry, "_lazy", list(registry._lazy))
+
+
+def test_numpy():
+    arr = np.array([[1.5, 2.0], [np.nan, 4.25]])
+
+    assert serialize_csv(arr, columns=["a", "b"]) == b"a,b\n1.5,2.0\n,4.25\n"
+    assert serialize_csv(arr, {"b": 1}, ["a", "b"]) == b"a,b\n1.5,2.0\n,4.2\n"
+    assert serialize_csv(arr, {1: 1}) == b"0,1\n1.5,2.0\n,4.2\n"
+
+    rec = np.array([(1, "x,y"), (2, "z")], dtype=[("n", "i8"), ("s", "U3")])
+    assert serialize_csv(rec) == b'n,s\n1,"x,y"\n2,z\n'
+
+    with pytest.raises(ValueError):
+        serialize_csv(arr, columns=["a"])
+
+
+def test_records():
+    Row = namedtuple("Row", ["city", "temp"])
+
+    assert serialize_csv([{"a": 1, "b": None}, {"b": 2.5, "c": "q"}]) == b"a,b,c\n1,,\n,2.5,q\n"
+    assert serialize_csv([Row("Oslo", 3.14159), Row("Bergen", None)], 2) == b"city,temp\nOslo,3.14\nBergen,\n"
+    assert serialize_csv([(1, 2), (3,)], columns=["x", "y"]) == b"x,y\n1,2\n3,\n"
+
+    # same as pandas would write them, less the index
+    records = [{"a": 0.1, "b": True, "c": 'say "hi"'}]
+    assert serialize_csv(records) == pd.DataFrame(records).to_csv(index=False).encode("utf-8")
+
+    # other lists aren't tables, they are written as before
+    assert serialize_csv([1, 2, 3]) == b"[1, 2, 3]"
+    assert serialize_csv(["a,b", "1,2"]) == b"['a,b', '1,2']"
+
+
+def test_register():
+    class Frame(object):
+        def __init__(self, rows):
+            self.rows = rows
+
+    class SubFrame(Frame):
+        pass
+
+    def serialize(data, float_precision=None, columns=None):
+        return "".join(f"{r}\n" for r in data.rows).encode("utf-8")
+
+    register(Frame, serialize)
+    assert get_serializer(SubFrame([])) is serialize
+    assert serialize_csv(SubFrame(["a", 1])) == b"a\n1\n"
+
+    unregister(Frame)
+    assert get_serializer(Frame([])) is None
+
+
+def test_optional_packages_resolved_on_import(monkeypatch):
+    class DataFrame(object):
+        def write_csv(self, buf, float_precision=None):
+            buf.write(f"a\n{float_precision}\n".encode("utf-8"))
+
+    polars = types.ModuleType("polars")
+    polars.DataFrame = DataFrame
+    monkeypatch.setitem(sys.modules, "polars", polars)
+
+    assert serialize_csv(DataFrame(), 3) == b"a\n3\n"
+
+
+def test_plot_columns(requests_mock):
+    requests_mock.register_uri("post", f"{API_ROOT}vis/plots/foo/data", text="")
+
+    Plot("foo", token="registry-token")(np.eye(2, dtype=int), columns=["x", "y"])
+
+    assert requests_mock.last_request.body == b"x,y\n1,0\n0,1\n"
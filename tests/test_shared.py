@@ -4,7 +4,10 @@ import os
 from functools import partial
 from unittest.mock import MagicMock
 
+from novem import Plot
+from novem.group.roles import Roles
 from novem.shared import NovemShare
+from novem.utils import API_ROOT
 
 
 class MockGroup:
@@ -321,8 +324,10 @@ def test_share_with_group_and_claim():
     # Test with a mix of strings, Groups and Claims
     api_calls.clear()
 
-    # Update the current shares for the test
+    # Update the current shares for the test, the share keeps a snapshot so
+    # it has to be told about changes made behind its back
     current_shares.clear()
+    share.refresh()
 
     share.set(["public", group1, claim1, group2])
 
@@ -374,3 +379,67 @@ def test_share_with_group_and_claim():
     api_calls.clear()
     share.set([None])
     assert len(api_calls) == 0, "API calls should not be made for None objects"
+
+
+def test_share_snapshot():
+    api = MagicMock()
+    share_data = ["public"]
+    reads = []
+
+    def mock_read(path):
+        reads.append(path)
+        return json.dumps([{"name": s} for s in share_data])
+
+    api.read = mock_read
+
+    share = NovemShare(api, "test/path")
+
+    # all accessors share one read
+    assert len(share) == 1
+    assert list(share) == ["public"]
+    assert share[0] == "public"
+    assert str(share) == "public"
+    assert share == ["public"]
+    assert len(reads) == 1
+
+    # our own changes are applied locally, set diffs against the snapshot
+    share += "@bob"
+    share.set(["@bob", "+org~group"])
+    assert share.get() == ["+org~group", "@bob"]
+    assert len(reads) == 1
+
+    # refresh reads the api again, as does an expired snapshot
+    share_data[:] = ["public"]
+    assert share.refresh() == ["public"]
+    share.ttl = 0
+    share.get()
+    assert len(reads) == 3
+
+
+def test_share_refused_change_invalidates(requests_mock):
+    url = f"{API_ROOT}vis/plots/foo/shared"
+    requests_mock.register_uri("get", url, text=json.dumps([{"name": "public"}]))
+    requests_mock.register_uri("put", f"{url}/@bob", status_code=400, json={"message": "bad share"})
+    requests_mock.register_uri("delete", f"{url}/public", status_code=409, json={"message": "conflict"})
+
+    p = Plot(id="foo", token="share-token", create=False, cache=False)
+    assert p.shared.get() == ["public"]
+
+    # the server refused both changes, so the snapshot is read again
+    p.shared += "@bob"
+    assert p.shared.get() == ["public"]
+    p.shared -= "public"
+    assert p.shared.get() == ["public"]
+
+    assert [r.method for r in requests_mock.request_history] == ["GET", "PUT", "GET", "DELETE", "GET"]
+
+
+def test_roles_refused_change_invalidates():
+    api = MagicMock()
+    api.api_read.return_value = json.dumps([{"name": "alice"}])
+    api.api_create.return_value = False
+
+    roles = Roles(api, "members")
+    roles += "bob"
+    assert roles.get() == ["alice"]
+    assert api.api_read.call_count == 2
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from novem import Plot, timeline
+from novem.utils import API_ROOT
+
+url = f"{API_ROOT}vis/plots/foo"
+
+
+@pytest.fixture
+def recording():
+    tl = timeline.enable()
+    yield tl
+    timeline.disable()
+
+
+def test_disabled_by_default():
+    assert not timeline.enabled()
+    with timeline.span("nothing"):
+        pass
+
+
+def test_library_phases_and_requests(recording, requests_mock):
+    requests_mock.register_uri("post", f"{url}/data", text="")
+    requests_mock.register_uri("get", f"{url}/name", text="foo")
+
+    p = Plot(id="foo", create=False, token="tl-token")
+    p.data = "a,b\n1,2\n"
+    p.name
+
+    events = [(e["name"], e["cat"]) for e in recording.to_json()["traceEvents"]]
+    for ev in [
+        ("get_current_config", "phase"),
+        ("_set_data", "phase"),
+        ("api_write", "phase"),
+        ("POST vis/plots/{id}/data", "http"),
+        ("api_read", "phase"),
+        ("GET vis/plots/{id}/name", "http"),
+    ]:
+        assert ev in events
+
+    # the request lies within the api call
+    write = next(e for e in recording.events if e["name"] == "api_write")
+    post = next(e for e in recording.events if e["cat"] == "http")
+    assert write["ts"] <= post["ts"] and post["ts"] + post["dur"] <= write["ts"] + write["dur"] + 1
+
+
+@pytest.mark.parametrize(
+    "args, path",
+    [
+        (["--trace", "/trace.json", "--version"], "/trace.json"),
+        (["--trace=/trace.json", "--version"], "/trace.json"),
+        (["--version", "--trace"], timeline.default_trace_path()),
+    ],
+)
+def test_cli_trace_option(cli, args, path):
+    try:
+        cli(*args)
+        written = timeline._path
+        tl = timeline.disable()
+    finally:
+        timeline.disable()
+
+    assert written == path
+    names = [e["name"] for e in tl.to_json()["traceEvents"]]
+    assert names == ["run_cli_wrapped", "setup"]
+
+
+def test_write_chrome_trace(recording, tmp_path):
+    with timeline.span("outer", size=3):
+        with timeline.span("inner"):
+            pass
+
+    recording.write(str(tmp_path / "trace.json"))
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+
+    assert [(e["name"], e["ph"]) for e in events] == [("outer", "X"), ("inner", "X")]
+    assert events[0]["args"] == {"size": 3}
+    assert events[0]["dur"] >= events[1]["dur"]
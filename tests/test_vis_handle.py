@@ -0,0 +1,90 @@
+import sys
+
+import pytest
+
+from novem import Grid, Plot, VisHandle
+from novem.api_ref import NovemAPI, NovemException
+from novem.utils import API_ROOT
+from novem.vis.handle import delete_many, read_many, write_many
+
+
+def test_handle_is_small():
+    h = VisHandle("@bob~sales", "grid")
+
+    assert (h.id, h.user, h.type) == ("sales", "bob", "grid")
+    assert h.path == "users/bob/vis/grids/sales"
+    assert not hasattr(h, "__dict__")
+    assert sys.getsizeof(h) < 100
+
+    assert h == VisHandle("sales", "grid", user="bob")
+    assert len({h, VisHandle("sales", "grid", user="bob"), VisHandle("sales")}) == 2
+
+    with pytest.raises(ValueError):
+        VisHandle("x", "doc")
+
+    with pytest.raises(ValueError):
+        VisHandle("")
+
+
+def test_promote(requests_mock):
+    requests_mock.register_uri("get", f"{API_ROOT}vis/plots/sales/name", text="Sales")
+
+    p = VisHandle("sales").promote(token="handle-token")
+    assert isinstance(p, Plot)
+    assert p.name == "Sales"
+
+    g = VisHandle("@bob~sales", "grid").promote(token="handle-token")
+    assert isinstance(g, Grid)
+    assert g.user == "bob"
+
+    # no requests until the objects are used
+    assert requests_mock.call_count == 1
+
+
+def test_bulk_operations(requests_mock):
+    handles = [VisHandle(f"p{i}") for i in range(20)]
+
+    for i in range(20):
+        requests_mock.register_uri("get", f"{API_ROOT}vis/plots/p{i}/name", text=f"plot {i}")
+        requests_mock.register_uri("post", f"{API_ROOT}vis/plots/p{i}/name", text="")
+        requests_mock.register_uri("delete", f"{API_ROOT}vis/plots/p{i}", text="")
+    requests_mock.register_uri("get", f"{API_ROOT}vis/plots/p0/name", status_code=404, text="")
+
+    names = read_many(handles, "/name", token="handle-token")
+    assert names[handles[0]] is None
+    assert names[handles[5]] == "plot 5"
+
+    write_many(handles, "/name", "renamed", token="handle-token")
+    assert requests_mock.last_request.text == "renamed"
+
+    assert all(delete_many(handles, token="handle-token").values())
+
+    with pytest.raises(NovemException):
+        write_many([VisHandle("@bob~p1")], "/name", "x", token="handle-token")
+
+
+def test_bulk_writes_are_elided(requests_mock, tmp_path):
+    handles = [VisHandle("p1"), VisHandle("m1", "mail")]
+    requests_mock.register_uri("post", f"{API_ROOT}vis/plots/p1/name", text="")
+    requests_mock.register_uri("post", f"{API_ROOT}vis/mails/m1/name", text="")
+    requests_mock.register_uri("post", f"{API_ROOT}vis/mails/m1/status", status_code=500, text="")
+
+    db = str(tmp_path / "writes.db")
+    write_many(handles, "/name", "renamed", token="handle-token", persist_writes=db)
+    write_many(handles[:1], "/name", "renamed", token="handle-token", persist_writes=db)
+    assert requests_mock.call_count == 2
+
+    # sending a mail is neither skipped nor retried
+    with pytest.raises(NovemException):
+        write_many(handles[1:], "/status", "sending", token="handle-token", persist_writes=db)
+    assert requests_mock.call_count == 3
+
+
+def test_bulk_delete_forgets_metadata(requests_mock):
+    requests_mock.register_uri("delete", f"{API_ROOT}vis/plots/p1", text="")
+
+    metadata = NovemAPI(token="handle-token")._metadata
+    metadata.put(f"{API_ROOT}vis/plots/p1/config/type", "bar")
+
+    assert delete_many([VisHandle("p1")], token="handle-token") == {VisHandle("p1"): True}
+    assert metadata.get(f"{API_ROOT}vis/plots/p1/config/type") is None